@@ -0,0 +1,113 @@
+# services/alert_engine.py
+import threading
+import time
+from collections import Counter
+
+from sliding_window import WindowCounter
+
+
+class AlertRule:
+    __slots__ = ("title", "metric", "when", "describe", "fields")
+
+    def __init__(self, title, metric, when, describe, **fields):
+        self.title = title
+        self.metric = metric
+        self.when = when          # (sample, engine) -> bool
+        self.describe = describe  # (sample, engine) -> description text
+        self.fields = fields      # severity, location, assigned_to, estimated_resolution
+
+
+class AlertEngine:
+    """
+    Declarative alert rules evaluated as samples are ingested.
+
+    Ingestion calls `observe(metric, sample)`; only the rules registered for that
+    metric run, against the sample plus any rolling counters they read through
+    the engine (`engine.counters[name].total(window)`). Titles with an active
+    alert are cached in memory: the cache is loaded from the DB once, grows
+    when a rule fires and shrinks via `resolved()`. Alerts resolved by another
+    process (a web worker that isn't the scheduler leader) are picked up by
+    `invalidate()`, which the periodic alert sync calls when it sees them.
+    """
+
+    def __init__(self, app, db, alert_model):
+        self.app = app
+        self.db = db
+        self.Alert = alert_model
+        self.rules = {}      # metric -> [AlertRule]
+        self.counters = {}   # name -> WindowCounter
+        self.listeners = []  # called with each new Alert row, inside an app context
+        self._active = None  # title -> number of active alerts
+        self._lock = threading.RLock()
+        self.stats = {"evaluations": 0, "fired": 0, "suppressed": 0, "last_fired_at": None}
+
+    # ----------------- registration -----------------
+    def rule(self, title, metric, when, describe, **fields):
+        self.rules.setdefault(metric, []).append(AlertRule(title, metric, when, describe, **fields))
+
+    def counter(self, name, windows):
+        """Named sliding-window counter (ring buffer of per-minute buckets) for rules to read."""
+        if name not in self.counters:
+            self.counters[name] = WindowCounter(windows)
+        return self.counters[name]
+
+    # ----------------- ingestion side -----------------
+    def observe(self, metric, sample):
+        """Evaluate the rules for `metric` against one sample; returns the titles that fired."""
+        fired = []
+        with self._lock:
+            for rule in self.rules.get(metric, ()):
+                self.stats["evaluations"] += 1
+                try:
+                    if not rule.when(sample, self):
+                        continue
+                    if self._active_counts()[rule.title]:
+                        self.stats["suppressed"] += 1
+                        continue
+                    self._raise(rule, rule.describe(sample, self))
+                    fired.append(rule.title)
+                except Exception as e:
+                    print(f"Alert rule '{rule.title}' failed:", e)
+        return fired
+
+    def resolved(self, title):
+        """Call after an active alert with `title` was resolved."""
+        with self._lock:
+            active = self._active_counts()
+            if active[title] > 0:
+                active[title] -= 1
+
+    def active_titles(self):
+        with self._lock:
+            return {title for title, n in self._active_counts().items() if n > 0}
+
+    def reload_active(self):
+        with self._lock:
+            self._active = None
+            return self.active_titles()
+
+    def invalidate(self):
+        """Drop the active-title cache; the next evaluation reloads it from the DB."""
+        with self._lock:
+            self._active = None
+
+    # ----------------- internals -----------------
+    def _active_counts(self):
+        if self._active is None:
+            with self.app.app_context():
+                rows = (self.db.session.query(self.Alert.title, self.db.func.count(self.Alert.id))
+                        .filter(self.Alert.status == "active").group_by(self.Alert.title).all())
+            self._active = Counter(dict(rows))
+        return self._active
+
+    def _raise(self, rule, description):
+        with self.app.app_context():
+            alert = self.Alert(title=rule.title, description=description, status="active", **rule.fields)
+            self.db.session.add(alert)
+            self.db.session.commit()
+            for listener in self.listeners:
+                listener(alert)
+        self._active[rule.title] += 1
+        self.stats["fired"] += 1
+        self.stats["last_fired_at"] = time.time()
+        print(f"SUCCESS: New alert '{rule.title}' generated!")
@@ -0,0 +1,44 @@
+# services/benchmarks/bench_batch_forecast.py
+"""
+Scaling of forecast_batch() with worker count.
+
+Run from BackEnd/services:  python benchmarks/bench_batch_forecast.py [--series 16] [--workers 1 2 4 8]
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from forecasting_service import forecast_batch, generate_synthetic_data
+
+METRICS = ["electricity", "water", "aqi", "complaints"]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--series", type=int, default=16)
+    parser.add_argument("--hours", type=int, default=24 * 60)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, os.cpu_count() or 1])
+    args = parser.parse_args()
+
+    series = [(f"zone-{i // len(METRICS)}:{METRICS[i % len(METRICS)]}", generate_synthetic_data(hours=args.hours))
+              for i in range(args.series)]
+
+    print(f"{args.series} series x {args.hours} points, {os.cpu_count()} CPUs")
+    print(f"{'workers':>8} {'wall s':>8} {'speedup':>8} {'mean fit s':>11}")
+    baseline = None
+    for workers in sorted(set(args.workers)):
+        start = time.perf_counter()
+        results = forecast_batch(series, max_workers=workers)
+        wall = time.perf_counter() - start
+        baseline = baseline or wall
+        fits = [r["timing"]["fit_seconds"] for r in results.values()]
+        errors = sum("error" in r for r in results.values())
+        print(f"{workers:>8} {wall:>8.2f} {baseline / wall:>7.2f}x {sum(fits) / len(fits):>11.2f}"
+              + (f"  ({errors} failed)" if errors else ""))
+
+
+if __name__ == "__main__":
+    main()
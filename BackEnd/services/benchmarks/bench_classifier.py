@@ -0,0 +1,79 @@
+# services/benchmarks/bench_classifier.py
+"""
+Compare the vectorized KeywordClassifier against the old per-row DataFrame.apply path.
+
+Run from BackEnd/services:  python benchmarks/bench_classifier.py [--rows 10000 100000 1000000]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dataGen import SAMPLE_FEEDBACK
+from text_classifier import KeywordClassifier, POSITIVE_WORDS, NEGATIVE_WORDS, TOPIC_KEYWORDS
+
+
+# Reference implementations, as they used to live in main.py
+def assign_sentiment(text):
+    text_lower = str(text).lower()
+    if any(word in text_lower for word in POSITIVE_WORDS):
+        return "positive"
+    if any(word in text_lower for word in NEGATIVE_WORDS):
+        return "negative"
+    return "neutral"
+
+
+def assign_topic(text):
+    text = str(text).lower()
+    for topic, keywords in TOPIC_KEYWORDS.items():
+        if any(keyword in text for keyword in keywords):
+            return topic
+    return "General"
+
+
+def make_texts(rows, unique_share):
+    """Feedback column where roughly `unique_share` of rows are one-off texts."""
+    rnd = random.Random(42)
+    texts = []
+    for i in range(rows):
+        text = rnd.choice(SAMPLE_FEEDBACK)
+        if rnd.random() < unique_share:
+            text = f"{text} (ticket #{i})"
+        texts.append(text)
+    return pd.Series(texts)
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--unique-share", type=float, default=0.05)
+    args = parser.parse_args()
+
+    print(f"{'rows':>9} {'task':>9} {'apply s':>9} {'cold s':>9} {'warm s':>9} {'speedup':>8}")
+    for rows in args.rows:
+        texts = make_texts(rows, args.unique_share)
+        for name, reference, rules, default in [
+            ("sentiment", assign_sentiment, {"positive": POSITIVE_WORDS, "negative": NEGATIVE_WORDS}, "neutral"),
+            ("topic", assign_topic, TOPIC_KEYWORDS, "General"),
+        ]:
+            clf = KeywordClassifier(rules, default, max_cache=rows + 1)
+            expected, t_apply = timed(lambda: texts.apply(reference))
+            cold, t_cold = timed(lambda: clf.classify(texts))
+            warm, t_warm = timed(lambda: clf.classify(texts))
+            assert expected.equals(cold) and expected.equals(warm), f"{name}: labels differ from apply()"
+            print(f"{rows:>9} {name:>9} {t_apply:>9.3f} {t_cold:>9.3f} {t_warm:>9.3f} {t_apply / t_cold:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
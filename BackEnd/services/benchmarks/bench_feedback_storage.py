@@ -0,0 +1,108 @@
+# services/benchmarks/bench_feedback_storage.py
+"""
+Feedback load time and memory: CSV (parse + classify) vs the day-partitioned
+Arrow archive (memory-mapped, precomputed clean_text/sentiment/topic).
+
+Each case runs in a fresh interpreter: "cold" is the first load in that
+process, "warm" a second load with a new store once the files are in the page
+cache. RSS is the peak resident-set growth over the post-import baseline.
+
+Run from BackEnd/services:  python benchmarks/bench_feedback_storage.py [--rows 1000000]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pandas as pd
+
+from columnar import PartitionedArchive
+from dataGen import SAMPLE_FEEDBACK
+from feedback_store import FeedbackStore, enrich_feedback
+
+WINDOW_DAYS = 7
+WINDOW_COLUMNS = ["timestamp", "sentiment", "topic"]
+
+
+def write_csv(path, rows, days=365, seed=0):
+    rng = np.random.default_rng(seed)
+    now = pd.Timestamp(datetime.now()).floor("s")
+    stamps = now - pd.to_timedelta(rng.uniform(0, days * 86400, rows), unit="s")
+    pd.DataFrame({
+        "id": np.arange(1, rows + 1),
+        "text": rng.choice(SAMPLE_FEEDBACK, rows),
+        "timestamp": stamps.strftime("%Y-%m-%d %H:%M:%S"),
+    }).to_csv(path, index=False)
+
+
+def load(case, csv_path, archive_dir):
+    start = datetime.now() - timedelta(days=WINDOW_DAYS)
+    if case == "csv full":
+        return FeedbackStore(csv_path).snapshot()
+    if case == "arrow full":
+        return FeedbackStore(csv_path, archive=PartitionedArchive(archive_dir)).snapshot()
+    if case == f"csv {WINDOW_DAYS}d window":
+        df = enrich_feedback(pd.read_csv(csv_path, usecols=["text", "timestamp"]))
+        return df.loc[df["timestamp"] >= start, WINDOW_COLUMNS]
+    if case == f"arrow {WINDOW_DAYS}d window":
+        df = PartitionedArchive(archive_dir).read(WINDOW_COLUMNS, start=start)
+        return df[df["timestamp"] >= start]
+    raise ValueError(case)
+
+
+def peak_rss_mib():
+    """VmHWM (Linux): unlike ru_maxrss it is not inherited from the parent across exec."""
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith("VmHWM:"):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+
+def child(case, csv_path, archive_dir):
+    """Runs in its own interpreter; prints one JSON line."""
+    base = peak_rss_mib()
+    t0 = time.perf_counter()
+    rows = len(load(case, csv_path, archive_dir))
+    cold = time.perf_counter() - t0
+    rss = peak_rss_mib() - base
+    t0 = time.perf_counter()
+    load(case, csv_path, archive_dir)
+    warm = time.perf_counter() - t0
+    print(json.dumps({"rows": rows, "cold": cold, "warm": warm, "rss": rss}))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--child", nargs=3, metavar=("CASE", "CSV", "ARCHIVE"))
+    args = parser.parse_args()
+    if args.child:
+        return child(*args.child)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path, archive_dir = os.path.join(tmp, "feedback.csv"), os.path.join(tmp, "archive")
+        write_csv(csv_path, args.rows)
+        t0 = time.perf_counter()
+        FeedbackStore(csv_path, archive=PartitionedArchive(archive_dir)).refresh()
+        print(f"{args.rows} rows: CSV {os.path.getsize(csv_path) / 2**20:.0f} MiB, "
+              f"archive built in {time.perf_counter() - t0:.1f}s "
+              f"({len(PartitionedArchive(archive_dir).partitions())} day partitions)")
+
+        print(f"{'case':>20} {'rows':>9} {'cold s':>8} {'warm s':>8} {'RSS MiB':>8}")
+        for case in ["csv full", "arrow full", f"csv {WINDOW_DAYS}d window", f"arrow {WINDOW_DAYS}d window"]:
+            out = subprocess.run([sys.executable, os.path.abspath(__file__), "--child", case, csv_path, archive_dir],
+                                 capture_output=True, text=True, check=True).stdout
+            r = json.loads(out.strip().splitlines()[-1])
+            print(f"{case:>20} {r['rows']:>9} {r['cold']:>8.3f} {r['warm']:>8.3f} {r['rss']:>8.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+# services/benchmarks/bench_forecast_engines.py
+"""
+Fit time, predict time and holdout MAPE for each forecasting engine.
+
+Run from BackEnd/services:  python benchmarks/bench_forecast_engines.py [--points 1000 10000 100000]
+SARIMAX is skipped above --sarimax-max-points, where a single fit takes minutes.
+"""
+import argparse
+import os
+import sys
+import warnings
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from forecasting_service import (FORECAST_ENGINES, fit_predict, evaluate, generate_synthetic_data,
+                                 prepare_series, split_train_test)
+
+import pandas as pd
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--points", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    parser.add_argument("--sarimax-max-points", type=int, default=5_000)
+    parser.add_argument("--steps", type=int, default=48)
+    args = parser.parse_args()
+    warnings.simplefilter("ignore")
+
+    print(f"{'points':>8} {'engine':>15} {'fit s':>9} {'predict s':>10} {'MAPE %':>8}")
+    for points in args.points:
+        y = prepare_series(generate_synthetic_data(hours=points))
+        train, test = split_train_test(y)
+        for name in FORECAST_ENGINES:
+            if name == "sarimax" and points > args.sarimax_max_points:
+                print(f"{points:>8} {name:>15} {'skipped':>9}")
+                continue
+            _, (mean, _, _), fit_s, predict_s = fit_predict(name, train, max(len(test), args.steps))
+            mape = evaluate(test, pd.Series(mean[:len(test)], index=test.index))["mape"]
+            print(f"{points:>8} {name:>15} {fit_s:>9.3f} {predict_s:>10.4f} {mape:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+# services/benchmarks/bench_import_time.py
+"""
+Cold import time of the preprocessing module and the Flask app module.
+
+Each import runs in a fresh interpreter (`python -X importtime`) several times;
+the table shows the median total and the largest self-contained dependencies,
+and checks that nltk is no longer imported (no corpus download on import).
+
+Run from BackEnd/services:  python benchmarks/bench_import_time.py [--repeat 5]
+"""
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+
+SERVICES = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|(\s*)(\S+)")
+
+
+def import_once(module, env):
+    code = f"import sys; import {module}; print('nltk' in sys.modules)"
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", code], cwd=SERVICES, env=env,
+                          capture_output=True, text=True, check=True)
+    children = {}
+    total = 0
+    for line in proc.stderr.splitlines():
+        m = LINE.match(line)
+        if not m:
+            continue
+        cumulative, depth, name = int(m.group(2)), (len(m.group(3)) - 1) // 2, m.group(4)
+        if depth == 0:
+            total += cumulative
+        elif depth == 1:  # direct imports of a top-level module (children are printed before their parent)
+            children[name] = children.get(name, 0) + cumulative
+    return total / 1e6, children, proc.stdout.strip().splitlines()[-1] == "True"
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--modules", nargs="*", default=["stopwords", "preprocess", "main"])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        env = dict(os.environ, DATABASE_URL=f"sqlite:///{os.path.join(tmp, 'bench.db')}")
+        print(f"{'module':>12} {'median s':>9} {'nltk':>5}  heaviest direct dependencies")
+        for module in args.modules:
+            runs = [import_once(module, env) for _ in range(args.repeat)]
+            _, children, nltk_loaded = runs[-1]
+            heaviest = sorted(children.items(), key=lambda kv: kv[1], reverse=True)[:4]
+            print(f"{module:>12} {statistics.median(r[0] for r in runs):>9.3f} {str(nltk_loaded):>5}  "
+                  + ", ".join(f"{name} {us / 1e3:.0f}ms" for name, us in heaviest))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+# services/benchmarks/bench_ingest_buffer.py
+"""
+Per-row commit vs. the batched IngestionBuffer, on a scratch SQLite file.
+
+Run from BackEnd/services:  python benchmarks/bench_ingest_buffer.py [--rows 20000]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask
+
+from ingest_buffer import IngestionBuffer
+from model.models import db, WaterData
+
+
+def make_app(path):
+    app = Flask(__name__)
+    app.config["SQLALCHEMY_DATABASE_URI"] = f"sqlite:///{path}"
+    db.init_app(app)
+    with app.app_context():
+        db.create_all()
+    return app
+
+
+def per_row(app, rows):
+    start = time.perf_counter()
+    with app.app_context():
+        for i in range(rows):
+            db.session.add(WaterData(timestamp=datetime.utcnow(), usage=2.5, condition="Normal range"))
+            db.session.commit()
+    return time.perf_counter() - start, None
+
+
+def buffered(app, rows, batch):
+    buffer = IngestionBuffer(app, db, max_batch=batch, flush_interval=0.5)
+    start = time.perf_counter()
+    for i in range(rows):
+        buffer.enqueue(WaterData, timestamp=datetime.utcnow(), usage=2.5, condition="Normal range")
+    enqueued = time.perf_counter() - start
+    buffer.flush()
+    elapsed = time.perf_counter() - start
+    buffer.close()
+    return elapsed, (enqueued, buffer.stats())
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=20_000)
+    parser.add_argument("--batch", type=int, default=500)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for name in ("per-row commit", "write-behind buffer"):
+            app = make_app(os.path.join(tmp, f"{name.split()[0]}.db"))
+            if name == "per-row commit":
+                elapsed, extra = per_row(app, args.rows)
+            else:
+                elapsed, extra = buffered(app, args.rows, args.batch)
+            print(f"{name:>20}: {args.rows / elapsed:>10.0f} rows/s ({elapsed:.2f}s)")
+            if extra:
+                enqueued, stats = extra
+                print(f"{'':>20}  producer done after {enqueued:.2f}s; {stats['flushes']} flushes, "
+                      f"avg {stats['avg_flush_seconds'] * 1000:.1f} ms, max {stats['flush_seconds_max'] * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
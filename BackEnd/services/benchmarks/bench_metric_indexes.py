@@ -0,0 +1,103 @@
+# services/benchmarks/bench_metric_indexes.py
+"""
+Alert-check and latest-value query cost as metric history grows.
+
+Seeds a scratch SQLite DB in steps up to --rows (default 10M, split between
+WaterData and ComplaintData, plus --alerts Alert rows) and, at each step,
+times the queries check_for_alerts() issues with the model indexes and with
+the same SQL forced to ignore them (SQLite NOT INDEXED).
+
+Run from BackEnd/services:  python benchmarks/bench_metric_indexes.py [--rows 10000000]
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask
+from sqlalchemy import text
+
+import migrations
+from model.models import db, Alert, ComplaintData, WaterData
+
+TITLES = ["High Air Pollution", "High Traffic Congestion", "High Complaint Volume",
+          "Power Grid Strain", "High Water Consumption", "Spike in Negative Sentiment"]
+
+
+def seed(n, start, end_time, chunk=50_000):
+    """Insert n rows into each of WaterData/ComplaintData, timestamps spaced back from end_time."""
+    done = 0
+    while done < n:
+        size = min(chunk, n - done)
+        stamps = [end_time - timedelta(seconds=(start + done + i) * 7) for i in range(size)]
+        db.session.execute(WaterData.__table__.insert(),
+                           [{"timestamp": t, "usage": 2.5, "condition": "Normal range"} for t in stamps])
+        db.session.execute(ComplaintData.__table__.insert(),
+                           [{"timestamp": t, "category": "Roads", "description": "x", "status": "Open"} for t in stamps])
+        db.session.commit()
+        done += size
+
+
+def timed(fn, repeat=20):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=10_000_000)
+    parser.add_argument("--steps", type=int, default=4)
+    parser.add_argument("--alerts", type=int, default=100_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        app = Flask(__name__)
+        app.config["SQLALCHEMY_DATABASE_URI"] = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+        db.init_app(app)
+        with app.app_context():
+            db.create_all()
+            migrations.upgrade(db)
+            now = datetime.utcnow()
+            db.session.execute(Alert.__table__.insert(), [
+                {"title": random.choice(TITLES), "severity": "warning",
+                 "status": random.choice(["resolved"] * 9 + ["active"]), "timestamp": now}
+                for _ in range(args.alerts)])
+            db.session.commit()
+
+            per_table = args.rows // 2
+            checkpoints = sorted({max(1, per_table // 10 ** i) for i in range(args.steps)})
+            one_hour_ago = now - timedelta(hours=1)
+            queries = {
+                "latest water": (
+                    lambda: WaterData.query.order_by(WaterData.timestamp.desc()).first(),
+                    "SELECT * FROM water_data NOT INDEXED ORDER BY timestamp DESC LIMIT 1"),
+                "complaints/hour": (
+                    lambda: ComplaintData.query.filter(ComplaintData.timestamp >= one_hour_ago).count(),
+                    "SELECT count(*) FROM complaint_data NOT INDEXED WHERE timestamp >= :t"),
+                "active alert dedup": (
+                    lambda: Alert.query.filter_by(title="Power Grid Strain", status="active").first(),
+                    "SELECT * FROM alert NOT INDEXED WHERE title = 'Power Grid Strain' AND status = 'active' LIMIT 1"),
+            }
+
+            print(f"{'rows/table':>11} {'query':>20} {'indexed ms':>11} {'unindexed ms':>13}")
+            seeded = 0
+            for target in checkpoints:
+                seed(target - seeded, seeded, now)
+                seeded = target
+                for name, (orm_query, raw_sql) in queries.items():
+                    indexed = timed(orm_query)
+                    unindexed = timed(lambda: db.session.execute(text(raw_sql), {"t": one_hour_ago}).fetchall(), repeat=3)
+                    print(f"{seeded:>11} {name:>20} {indexed:>11.3f} {unindexed:>13.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+# services/benchmarks/bench_metrics.py
+"""
+Cost of the instrumentation layer: a @metrics.timed call with metrics off and
+on, a bare Histogram.observe, one Flask request with and without the request /
+DB hooks, and rendering /api/metrics once series exist.
+
+Run from BackEnd/services:  python benchmarks/bench_metrics.py [--calls 200000 --requests 5000]
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask
+
+import metrics
+
+
+def per_call(fn, n):
+    t0 = time.perf_counter()
+    for _ in range(n):
+        fn()
+    return (time.perf_counter() - t0) / n
+
+
+def request_app(instrumented):
+    app = Flask(__name__)
+    if instrumented:
+        metrics.instrument_flask(app)
+
+    @app.route("/api/ping/<int:n>")
+    def ping(n):
+        return {"n": n}
+
+    return app.test_client()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--calls", type=int, default=200_000)
+    parser.add_argument("--requests", type=int, default=5_000)
+    args = parser.parse_args()
+
+    def noop():
+        return None
+
+    timed_noop = metrics.timed("bench_noop")(noop)
+    histogram = metrics.REGISTRY.histogram("bench_seconds", "benchmark", ("label",))
+
+    base = per_call(noop, args.calls)
+    metrics.REGISTRY.enabled = False
+    off = per_call(timed_noop, args.calls)
+    metrics.REGISTRY.enabled = True
+    on = per_call(timed_noop, args.calls)
+    observe = per_call(lambda: histogram.observe(0.003, "x"), args.calls)
+    print(f"plain call            {base * 1e9:8.0f} ns")
+    print(f"@timed, metrics off   {off * 1e9:8.0f} ns  (+{(off - base) * 1e9:.0f} ns)")
+    print(f"@timed, metrics on    {on * 1e9:8.0f} ns  (+{(on - base) * 1e9:.0f} ns)")
+    print(f"Histogram.observe     {observe * 1e9:8.0f} ns")
+
+    plain, hooked = request_app(False), request_app(True)
+    r_plain = per_call(lambda: plain.get("/api/ping/1"), args.requests)
+    r_hooked = per_call(lambda: hooked.get("/api/ping/1"), args.requests)
+    print(f"Flask request         {r_plain * 1e6:8.1f} us without hooks, {r_hooked * 1e6:.1f} us with "
+          f"(+{(r_hooked - r_plain) / r_plain * 100:.1f}%)")
+
+    t0 = time.perf_counter()
+    text = metrics.REGISTRY.render()
+    print(f"render                {(time.perf_counter() - t0) * 1e3:8.2f} ms for {len(text.splitlines())} lines")
+
+
+if __name__ == "__main__":
+    main()
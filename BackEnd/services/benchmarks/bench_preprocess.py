@@ -0,0 +1,100 @@
+# services/benchmarks/bench_preprocess.py
+"""
+preprocess.py throughput and peak memory: the old whole-file path
+(read_csv + Series.apply(clean_text) + to_csv) vs streaming preprocess_file()
+in-process and with a process pool. Each case runs in a fresh interpreter;
+RSS is the peak resident-set growth (VmHWM) over the post-import baseline.
+
+Run from BackEnd/services:  python benchmarks/bench_preprocess.py [--rows 1000000]
+"""
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pandas as pd
+
+WORDS = ("the road near our colony is not fixed and garbage was never collected by them "
+         "street lights are broken again http://example.com/report please do something now!! "
+         "buses run late, it's been weeks of noise from the construction site at night").split()
+
+
+def write_csv(path, rows, seed=0):
+    rng = np.random.default_rng(seed)
+    lengths = rng.integers(4, 30, rows)
+    words = np.array(WORDS)[rng.integers(0, len(WORDS), lengths.sum())]
+    bounds = np.concatenate([[0], np.cumsum(lengths)])
+    texts = [" ".join(words[bounds[i]:bounds[i + 1]]) for i in range(rows)]
+    pd.DataFrame({"id": np.arange(rows), "text": texts}).to_csv(path, index=False)
+
+
+def legacy_clean_text(text, stop_words):
+    """clean_text as it was before the streaming rewrite (reference)."""
+    text = re.sub(r"http\S+", "", text)
+    text = re.sub(r"[^a-zA-Z\s]", "", text)
+    text = text.lower()
+    return " ".join(w for w in text.split() if w not in stop_words)
+
+
+def peak_rss_mib():
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith("VmHWM:"):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+
+def child(case, src, dst, chunksize, workers):
+    import preprocess
+    import stopwords
+
+    base = peak_rss_mib()
+    t0 = time.perf_counter()
+    if case == "whole file + apply":
+        df = pd.read_csv(src)
+        df["clean_text"] = df["text"].apply(legacy_clean_text, stop_words=stopwords.get())
+        df.to_csv(dst, index=False)
+    else:
+        preprocess.preprocess_file(src, dst, chunksize=chunksize, workers=workers, resume=False)
+    print(json.dumps({"seconds": time.perf_counter() - t0, "rss": peak_rss_mib() - base}))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--chunksize", type=int, default=100_000)
+    parser.add_argument("--workers", type=int, default=min(4, os.cpu_count() or 1))
+    parser.add_argument("--child", nargs=5, metavar=("CASE", "SRC", "DST", "CHUNKSIZE", "WORKERS"))
+    args = parser.parse_args()
+    if args.child:
+        case, src, dst, chunksize, workers = args.child
+        return child(case, src, dst, int(chunksize), int(workers))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        src = os.path.join(tmp, "feedback.csv")
+        write_csv(src, args.rows)
+        print(f"{args.rows} rows, {os.path.getsize(src) / 2**20:.0f} MiB, chunksize {args.chunksize}")
+        print(f"{'case':>24} {'seconds':>8} {'rows/s':>10} {'RSS MiB':>8}")
+        cases = [("whole file + apply", 0), ("streaming", 0), (f"streaming, {args.workers} procs", args.workers)]
+        outputs = []
+        for case, workers in cases:
+            dst = os.path.join(tmp, f"out-{workers}-{len(outputs)}.csv")
+            out = subprocess.run([sys.executable, os.path.abspath(__file__), "--child", case, src, dst,
+                                  str(args.chunksize), str(workers)], capture_output=True, text=True, check=True).stdout
+            r = json.loads(out.strip().splitlines()[-1])
+            outputs.append(dst)
+            print(f"{case:>24} {r['seconds']:>8.2f} {args.rows / r['seconds']:>10.0f} {r['rss']:>8.0f}")
+
+        with open(outputs[0], "rb") as a, open(outputs[1], "rb") as b:
+            assert a.read() == b.read(), "streaming output differs from the whole-file output"
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+# services/benchmarks/bench_sliding_window.py
+"""
+Cost per event and per query of the ring-buffer WindowCounter (1h / 24h / 7d
+windows of one-minute buckets) as the stream grows, next to the old way of
+answering the same question: boolean masks over a DataFrame of the last 7 days
+(what check_for_alerts did for the sentiment rule). The counter's per-event
+and per-query cost should stay flat (sparse streams also pay for stepping over
+empty minutes); the mask scan grows with the data held.
+
+Run from BackEnd/services:  python benchmarks/bench_sliding_window.py [--events 1000000 3000000]
+"""
+import argparse
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pandas as pd
+
+from sliding_window import WindowCounter
+
+WINDOWS = [timedelta(hours=1), timedelta(days=1), timedelta(days=7)]
+START = datetime(2026, 1, 1)
+
+
+def event_times(n, days, seed=0):
+    """n event times spread over `days`, in order, with some jitter/out-of-order arrivals."""
+    rng = np.random.default_rng(seed)
+    offsets = np.sort(rng.uniform(0, days * 86400, n)) - rng.exponential(30, n)
+    return [START + timedelta(seconds=float(s)) for s in offsets]
+
+
+def bench_counter(times, query_every):
+    counter = WindowCounter(WINDOWS)
+    add_seconds = query_seconds = 0.0
+    queries = 0
+    for start in range(0, len(times), query_every):
+        batch = times[start:start + query_every]
+        t0 = time.perf_counter()
+        for at in batch:
+            counter.add(at)
+        t1 = time.perf_counter()
+        counter.totals(batch[-1])
+        add_seconds += t1 - t0
+        query_seconds += time.perf_counter() - t1
+        queries += 1
+    return add_seconds / len(times), query_seconds / queries, counter.totals(times[-1])
+
+
+def bench_masks(times, repeat=5):
+    """Old approach: four boolean masks over everything in the last 7 days."""
+    now = times[-1]
+    df = pd.DataFrame({"timestamp": pd.to_datetime(times), "negative": np.arange(len(times)) % 3 == 0})
+    df = df[df["timestamp"] >= now - timedelta(days=7)]
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        day = df["timestamp"] >= now - timedelta(days=1)
+        week = df["timestamp"] >= now - timedelta(days=7)
+        _ = (day & df["negative"]).sum(), day.sum(), (week & df["negative"]).sum(), week.sum()
+    return (time.perf_counter() - t0) / repeat, len(df)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--events", type=int, nargs="*", default=[10_000, 100_000, 1_000_000, 3_000_000])
+    parser.add_argument("--days", type=int, default=30, help="time span the events are spread over")
+    parser.add_argument("--query-every", type=int, default=1000, help="events between window queries")
+    args = parser.parse_args()
+
+    print(f"{'events':>10} {'ns/add':>8} {'us/query':>9} {'held (7d)':>10} {'mask scan ms':>13}  windows 1h/24h/7d")
+    for n in args.events:
+        times = event_times(n, args.days)
+        per_add, per_query, totals = bench_counter(times, args.query_every)
+        mask_seconds, held = bench_masks(times)
+        print(f"{n:>10} {per_add * 1e9:>8.0f} {per_query * 1e6:>9.1f} {held:>10} {mask_seconds * 1e3:>13.1f}  "
+              + "/".join(str(totals[w]) for w in WINDOWS))
+
+
+if __name__ == "__main__":
+    main()
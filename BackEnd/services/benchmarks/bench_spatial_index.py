@@ -0,0 +1,77 @@
+# services/benchmarks/bench_spatial_index.py
+"""
+Point -> zone attribution: ZoneIndex (KD-tree on the unit sphere) vs a
+brute-force vectorized argmin over every zone (haversine, in chunks), for
+a batch of points and several zone counts; plus radius queries. Results of
+the two nearest-zone paths are checked to agree.
+
+Run from BackEnd/services:  python benchmarks/bench_spatial_index.py [--points 1000000 --zones 100 1000 5000]
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from spatial_index import EARTH_RADIUS_KM, ZoneIndex
+
+CITY = (28.61, 77.21)  # Delhi; points and zones within ~30 km
+
+
+def random_points(n, rng, spread=0.3):
+    return CITY[0] + rng.uniform(-spread, spread, n), CITY[1] + rng.uniform(-spread, spread, n)
+
+
+def brute_force(zone_lats, zone_lons, lats, lons, chunk):
+    zlat, zlon = np.radians(zone_lats)[None, :], np.radians(zone_lons)[None, :]
+    out = np.empty(len(lats), dtype=np.int64)
+    for start in range(0, len(lats), chunk):
+        plat = np.radians(lats[start:start + chunk])[:, None]
+        plon = np.radians(lons[start:start + chunk])[:, None]
+        h = np.sin((zlat - plat) / 2) ** 2 + np.cos(plat) * np.cos(zlat) * np.sin((zlon - plon) / 2) ** 2
+        out[start:start + chunk] = np.argmin(h, axis=1)
+    return out
+
+
+def timed(fn):
+    t0 = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - t0
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--points", type=int, default=1_000_000)
+    parser.add_argument("--zones", type=int, nargs="*", default=[100, 1000, 5000])
+    parser.add_argument("--brute-points", type=int, default=50_000, help="points for the (slow) brute-force baseline")
+    parser.add_argument("--radius-km", type=float, default=2.0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    lats, lons = random_points(args.points, rng)
+    print(f"{args.points} points; brute force timed on {args.brute_points} and scaled")
+    print(f"{'zones':>6} {'build ms':>9} {'index k pts/s':>14} {'brute k pts/s':>14} {'speedup':>8} "
+          f"{'radius q/s':>11} {'avg hits':>9}")
+    for n in args.zones:
+        zone_lats, zone_lons = random_points(n, rng, spread=0.25)
+        index, build = timed(lambda: ZoneIndex(np.arange(n), zone_lats, zone_lons))
+        assigned, index_seconds = timed(lambda: index.assign(lats, lons))
+
+        m = min(args.brute_points, args.points)
+        chunk = max(1, 20_000_000 // n)  # keep the distance matrix around 160 MB
+        expected, brute_seconds = timed(lambda: brute_force(zone_lats, zone_lons, lats[:m], lons[:m], chunk))
+        assert np.array_equal(assigned[:m], expected), "KD-tree and brute force disagree"
+
+        q = 10_000
+        hits, radius_seconds = timed(lambda: index.within_many(lats[:q], lons[:q], args.radius_km))
+        index_rate, brute_rate = args.points / index_seconds, m / brute_seconds
+        print(f"{n:>6} {build * 1e3:>9.1f} {index_rate / 1e3:>14.0f} {brute_rate / 1e3:>14.1f} "
+              f"{index_rate / brute_rate:>7.0f}x {q / radius_seconds:>11.0f} {np.mean([len(h) for h in hits]):>9.1f}")
+    print(f"(earth radius {EARTH_RADIUS_KM} km; radius queries at {args.radius_km} km)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+# services/columnar.py
+import json
+import os
+import shutil
+import threading
+import uuid
+from datetime import date, datetime
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.ipc as ipc
+import pyarrow.parquet as pq
+
+FORMATS = {"arrow": ".arrow", "parquet": ".parquet"}
+MANIFEST = "_manifest.json"
+
+
+def _day(value):
+    if value is None:
+        return None
+    if isinstance(value, str):
+        return value[:10]
+    if isinstance(value, datetime):
+        value = value.date()
+    return value.isoformat() if isinstance(value, date) else pd.Timestamp(value).date().isoformat()
+
+
+class PartitionedArchive:
+    """
+    Columnar files partitioned by day: <root>/date=YYYY-MM-DD/part-*.arrow|.parquet.
+
+    Arrow IPC (the default) is written uncompressed so reads memory-map the files
+    and only touch the columns asked for; Parquet is the compact choice for cold
+    exports. `read()` skips whole partitions outside [start, end] by directory
+    name and passes `columns` down to the file readers. A small JSON manifest
+    next to the partitions lets callers record what the archive was built from.
+    """
+
+    def __init__(self, root, fmt="arrow"):
+        if fmt not in FORMATS:
+            raise ValueError(f"Unknown format '{fmt}' (expected one of {list(FORMATS)})")
+        self.root = root
+        self.fmt = fmt
+        self._lock = threading.Lock()
+
+    # ----------------- writes -----------------
+    def write(self, df, time_column="timestamp"):
+        """Append `df` as one new part file per day it spans. Returns the files written."""
+        if df.empty:
+            return []
+        days = pd.to_datetime(df[time_column]).dt.strftime("%Y-%m-%d")
+        written = []
+        with self._lock:
+            for day, part in df.groupby(days.values, sort=True):
+                written.append(self._write_part(day, pa.Table.from_pandas(part, preserve_index=False)))
+        return written
+
+    def rewrite(self, df, time_column="timestamp", manifest=None):
+        """Replace the whole archive with `df` (built aside, then swapped in)."""
+        staging = PartitionedArchive(f"{self.root}.tmp-{uuid.uuid4().hex[:8]}", self.fmt)
+        staging.write(df, time_column)
+        os.makedirs(staging.root, exist_ok=True)
+        if manifest is not None:
+            staging.write_manifest(manifest)
+        with self._lock:
+            old = f"{self.root}.old-{uuid.uuid4().hex[:8]}"
+            if os.path.exists(self.root):
+                os.replace(self.root, old)
+            os.replace(staging.root, self.root)
+        shutil.rmtree(old, ignore_errors=True)
+
+    def _write_part(self, day, table):
+        directory = os.path.join(self.root, f"date={day}")
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f"part-{uuid.uuid4().hex}{FORMATS[self.fmt]}")
+        tmp = path + ".tmp"
+        if self.fmt == "arrow":
+            with pa.OSFile(tmp, "wb") as sink, ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+        else:
+            pq.write_table(table, tmp)
+        os.replace(tmp, path)  # readers never see a half-written part
+        return path
+
+    # ----------------- reads -----------------
+    def partitions(self, start=None, end=None):
+        """Day partitions (YYYY-MM-DD) present, optionally limited to [start, end]."""
+        if not os.path.isdir(self.root):
+            return []
+        lo, hi = _day(start), _day(end)
+        days = sorted(name[5:] for name in os.listdir(self.root) if name.startswith("date="))
+        return [d for d in days if (lo is None or d >= lo) and (hi is None or d <= hi)]
+
+    def read_table(self, columns=None, start=None, end=None):
+        """pyarrow.Table of the selected columns for partitions in [start, end], or None if there are none."""
+        tables = []
+        for day in self.partitions(start, end):
+            directory = os.path.join(self.root, f"date={day}")
+            for name in sorted(os.listdir(directory)):
+                path = os.path.join(directory, name)
+                if name.endswith(".arrow"):
+                    table = ipc.open_file(pa.memory_map(path, "r")).read_all()
+                    tables.append(table.select(columns) if columns else table)
+                elif name.endswith(".parquet"):
+                    tables.append(pq.read_table(path, columns=columns, memory_map=True))
+        if not tables:
+            return None
+        return pa.concat_tables(tables, promote_options="default")
+
+    def read(self, columns=None, start=None, end=None):
+        """Same as read_table(), as a pandas DataFrame (empty, with `columns`, when nothing matches)."""
+        table = self.read_table(columns, start, end)
+        return pd.DataFrame(columns=columns or []) if table is None else table.to_pandas()
+
+    # ----------------- manifest -----------------
+    def read_manifest(self):
+        try:
+            with open(os.path.join(self.root, MANIFEST)) as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def write_manifest(self, manifest):
+        os.makedirs(self.root, exist_ok=True)
+        path = os.path.join(self.root, MANIFEST)
+        with open(path + ".tmp", "w") as f:
+            json.dump(manifest, f)
+        os.replace(path + ".tmp", path)
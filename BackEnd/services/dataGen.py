@@ -1,3 +1,4 @@
+import os
 import pandas as pd
 import random
 from datetime import datetime, timedelta
@@ -27,6 +28,7 @@ SAMPLE_FEEDBACK = [
 NUM_RECORDS = 500  # How many rows of data to create
 DAYS_RANGE = 30    # How many days back the data should go
 OUTPUT_FILENAME = "feedback_synthetic.csv" # The name of the new file
+OUTPUT_ARCHIVE_DIR = os.getenv("FEEDBACK_ARCHIVE_DIR")  # also build the columnar archive the server restores from
 
 def generate_synthetic_data():
     """Creates a DataFrame with realistic feedback data over a date range."""
@@ -56,5 +58,13 @@ def generate_synthetic_data():
     
     print(f"Successfully created '{OUTPUT_FILENAME}' with {len(df)} records.")
 
+    if OUTPUT_ARCHIVE_DIR:
+        from columnar import PartitionedArchive
+        from feedback_store import FeedbackStore
+
+        # parses + classifies once and writes day partitions with clean_text/sentiment/topic
+        FeedbackStore(OUTPUT_FILENAME, archive=PartitionedArchive(OUTPUT_ARCHIVE_DIR)).refresh()
+        print(f"Wrote columnar archive to '{OUTPUT_ARCHIVE_DIR}'.")
+
 if __name__ == "__main__":
     generate_synthetic_data()
\ No newline at end of file
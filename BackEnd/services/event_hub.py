@@ -0,0 +1,93 @@
+# services/event_hub.py
+import json
+import os
+import threading
+import time
+from collections import deque
+
+
+class EventHub:
+    """
+    Bounded in-memory fan-out of server events (alert changes, fresh metric
+    snapshots) to any number of SSE / long-poll clients.
+
+    `publish()` serializes an event once and appends it to a ring of the last
+    `max_events`; clients never get their own queue, they just read the ring from
+    their last-seen id and sleep on one shared condition, so publishing costs
+    the same however many viewers are connected. Ids are "<epoch>:<seq>", where
+    the epoch names this process (pid and start time): every web worker has its
+    own ring, so a cursor minted by another worker or an older process, or one
+    that fell out of the ring, gets `reset` and should reload the full lists
+    once, then carry on with deltas.
+    """
+
+    def __init__(self, max_events=1000):
+        self._events = deque(maxlen=max_events)  # (id, event, data, sse frame)
+        self._cond = threading.Condition()
+        self.epoch = f"{os.getpid()}.{int(time.time() * 1000)}"
+        self._seq = 0
+        self._first_seq = 1  # oldest seq still resumable
+        self.counters = {"published": 0, "clients": 0, "resets": 0}
+
+    @property
+    def last_id(self):
+        return f"{self.epoch}:{self._seq}"
+
+    def publish(self, event, data):
+        with self._cond:
+            self._seq += 1
+            event_id = self.last_id
+            payload = json.dumps(data, default=str)
+            self._events.append((event_id, event, data, f"id: {event_id}\nevent: {event}\ndata: {payload}\n\n"))
+            self._first_seq = self._seq - len(self._events) + 1
+            self.counters["published"] += 1
+            self._cond.notify_all()
+        return event_id
+
+    def since(self, last_id):
+        """(events after cursor `last_id`, reset) where reset means the cursor can't be resumed."""
+        with self._cond:
+            return self._since(self._parse(last_id))
+
+    def wait(self, last_id, timeout):
+        """Like since(), but blocks up to `timeout` seconds for something newer than `last_id`."""
+        seq = self._parse(last_id)
+        with self._cond:
+            if seq is not None:
+                self._cond.wait_for(lambda: self._seq != seq, timeout)
+            return self._since(seq)
+
+    def stream(self, last_id=None, heartbeat=15.0):
+        """Generator of SSE frames, starting after `last_id` (None = only new events)."""
+        with self._cond:
+            self.counters["clients"] += 1
+            cursor = self.last_id if last_id is None else last_id
+        try:
+            while True:
+                events, reset = self.wait(cursor, heartbeat)
+                if reset:
+                    cursor = self.last_id
+                    yield f"id: {cursor}\nevent: reset\ndata: {{}}\n\n"
+                elif events:
+                    cursor = events[-1][0]
+                    yield "".join(frame for _, _, _, frame in events)
+                else:
+                    yield ": keepalive\n\n"  # also how a gone client is noticed
+        finally:
+            with self._cond:
+                self.counters["clients"] -= 1
+
+    def _parse(self, last_id):
+        """Sequence number of a cursor from this process's id space, else None."""
+        epoch, _, seq = str(last_id).rpartition(":")
+        return int(seq) if epoch == self.epoch and seq.isdigit() else None
+
+    def _since(self, seq):
+        if seq == self._seq:
+            return [], False
+        if seq is None or seq > self._seq or seq < self._first_seq - 1:
+            self.counters["resets"] += 1
+            return [], True
+        # seqs are consecutive in the ring, so the first wanted one is at a known offset
+        start = seq + 1 - self._first_seq
+        return [self._events[i] for i in range(start, len(self._events))], False
@@ -0,0 +1,221 @@
+# services/feedback_store.py
+import os
+import threading
+from datetime import datetime
+from io import BytesIO
+
+import numpy as np
+import pandas as pd
+
+from text_classifier import sentiment_classifier, topic_classifier
+
+FEEDBACK_COLUMNS = ["text", "timestamp", "clean_text", "sentiment", "topic"]
+ROW_COLUMN = "_row"  # CSV row position, kept in the archive to restore file order across day partitions
+
+
+def enrich_feedback(df):
+    """Add clean_text / sentiment / topic / parsed timestamps to a batch of raw feedback rows."""
+    if "text" not in df.columns:
+        df["text"] = ""
+    if "timestamp" not in df.columns:
+        df["timestamp"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+    df["clean_text"] = df["text"].astype(str).str.lower().str.replace(r'[^\w\s]', '', regex=True)
+    df["sentiment"] = sentiment_classifier.classify(df["text"])
+    df["topic"] = topic_classifier.classify(df["text"])
+
+    try:
+        df["timestamp"] = pd.to_datetime(df["timestamp"])
+    except Exception:
+        df["timestamp"] = pd.to_datetime(datetime.now())
+    return df
+
+
+class FeedbackStore:
+    """
+    Process-wide cache of the feedback CSV.
+
+    The file is parsed once; later calls stat() it and, if it only grew, parse
+    just the appended tail and enrich those rows. A shrink, rewrite or header
+    change triggers a full reload. Callers get a shallow copy, so adding or
+    reassigning columns on it never leaks back into the cached frame.
+
+    With an `archive` (columnar.PartitionedArchive), enriched rows are also
+    persisted there, and a cold start restores from it (memory-mapped, no
+    re-classification) as long as the CSV prefix it was built from is unchanged.
+    """
+
+    def __init__(self, file_path, archive=None):
+        self.file_path = file_path
+        self.archive = archive
+        self._archived = False  # archive holds exactly self._df (set by a restore or a successful write)
+        self._lock = threading.Lock()
+        self._df = pd.DataFrame(columns=FEEDBACK_COLUMNS)
+        self._header = None
+        self._offset = 0        # byte offset just past the last fully parsed line
+        self._last_line = b""   # bytes of the last parsed line, to detect in-place rewrites
+        self._signature = None  # (inode, mtime_ns, size) of the last stat
+        self.generation = 0     # bumped on every full reload
+
+    # ----------------- public API -----------------
+    def snapshot(self):
+        """Return a read-only view of the current feedback frame."""
+        return self.versioned_snapshot()[1]
+
+    def versioned_snapshot(self):
+        """Return (generation, view); rows of one generation only ever get appended to."""
+        self.refresh()
+        with self._lock:
+            return self.generation, self._df.copy(deep=False)
+
+    def refresh(self):
+        with self._lock:
+            try:
+                st = os.stat(self.file_path)
+            except FileNotFoundError:
+                if self._signature is not None:
+                    self._reset(pd.DataFrame(columns=FEEDBACK_COLUMNS))
+                return
+
+            signature = (st.st_ino, st.st_mtime_ns, st.st_size)
+            if signature == self._signature:
+                return
+
+            same_file = self._signature is not None and self._signature[0] == st.st_ino
+            if same_file and st.st_size >= self._offset and self._prefix_unchanged():
+                self._append_tail()
+            else:
+                self._full_load()
+            self._signature = signature
+
+    def window(self, start, columns=None):
+        """Rows with timestamp >= start, in file order; read from the archive's day partitions when there is one."""
+        self.refresh()
+        if not self._archived or self._signature is None:
+            df = self.snapshot()
+            df = df[df["timestamp"] >= start]
+            return df[columns] if columns else df
+
+        wanted = None if columns is None else list(dict.fromkeys(list(columns) + ["timestamp", ROW_COLUMN]))
+        with self._lock:
+            rows = len(self._df)
+        df = self.archive.read(wanted, start=start)
+        if df.empty:
+            return pd.DataFrame(columns=columns or FEEDBACK_COLUMNS)
+        df = df[(df["timestamp"] >= start) & (df[ROW_COLUMN] < rows)].sort_values(ROW_COLUMN, kind="stable")
+        df = df.drop(columns=ROW_COLUMN).reset_index(drop=True)
+        return df[columns] if columns else df
+
+    def __len__(self):
+        return len(self._df)
+
+    # ----------------- internals -----------------
+    def _reset(self, df):
+        self._df = df
+        self._header = None
+        self._offset = 0
+        self._last_line = b""
+        self._signature = None
+        self.generation += 1
+
+    def _prefix_unchanged(self):
+        """True if the header and the last parsed line are still where we left them."""
+        with open(self.file_path, "rb") as f:
+            if f.readline() != self._header:
+                return False
+            f.seek(self._offset - len(self._last_line))
+            return f.read(len(self._last_line)) == self._last_line
+
+    def _remember_last_line(self, chunk):
+        self._last_line = chunk[chunk.rfind(b"\n", 0, len(chunk) - 1) + 1:]
+
+    def _full_load(self):
+        if self._restore_from_archive():
+            self.generation += 1
+            self._append_tail()
+            return
+
+        with open(self.file_path, "rb") as f:
+            self._header = f.readline()
+            body = f.read()
+        complete = body.rfind(b"\n") + 1
+        self._offset = len(self._header) + complete
+        self._remember_last_line(self._header + body[:complete])
+
+        if not self._header.strip():
+            df = pd.DataFrame(columns=FEEDBACK_COLUMNS)
+        else:
+            df = self._parse(self._header + body[:complete])
+        self._df = df.reset_index(drop=True)
+        self.generation += 1
+        self._save_to_archive(self._df, 0)
+
+    def _append_tail(self):
+        with open(self.file_path, "rb") as f:
+            f.seek(self._offset)
+            tail = f.read()
+        complete = tail.rfind(b"\n") + 1
+        if complete == 0:
+            return  # only a partially written line so far
+
+        new_rows = self._parse(self._header + tail[:complete])
+        self._offset += complete
+        self._remember_last_line(tail[:complete])
+        if new_rows.empty:
+            return
+        self._save_to_archive(new_rows, len(self._df))
+        self._df = pd.concat([self._df, new_rows], ignore_index=True)
+
+    # ----------------- archive -----------------
+    def _manifest(self, rows):
+        return {"header": self._header.hex(), "offset": self._offset, "last_line": self._last_line.hex(), "rows": rows}
+
+    def _save_to_archive(self, rows, first_row):
+        if self.archive is None or (first_row and not self._archived):
+            return  # appends only extend an archive that is in sync; the next full load rebuilds it
+        self._archived = False
+        try:
+            rows = rows.assign(**{ROW_COLUMN: np.arange(first_row, first_row + len(rows))})
+            if first_row == 0:
+                self.archive.rewrite(rows, manifest=self._manifest(len(rows)))
+            else:
+                self.archive.write(rows)
+                self.archive.write_manifest(self._manifest(first_row + len(rows)))
+            self._archived = True
+        except Exception as e:
+            print("Feedback archive write failed:", e)
+
+    def _restore_from_archive(self):
+        """Load the enriched frame from the archive if it still matches the head of the CSV."""
+        if self.archive is None:
+            return False
+        manifest = self.archive.read_manifest()
+        if not manifest:
+            return False
+        header, last_line = bytes.fromhex(manifest["header"]), bytes.fromhex(manifest["last_line"])
+        with open(self.file_path, "rb") as f:
+            if f.readline() != header:
+                return False
+            f.seek(max(manifest["offset"] - len(last_line), 0))
+            if f.read(len(last_line)) != last_line:
+                return False
+
+        table = self.archive.read_table()
+        if table is None:
+            if manifest["rows"]:
+                return False
+            df = pd.DataFrame(columns=FEEDBACK_COLUMNS)
+        else:
+            df = table.to_pandas()
+            if len(df) != manifest["rows"]:
+                return False  # an append was interrupted before its manifest; rebuild from the CSV
+            df = df.sort_values(ROW_COLUMN, kind="stable").drop(columns=ROW_COLUMN).reset_index(drop=True)
+        self._df = df
+        self._header, self._last_line, self._offset = header, last_line, manifest["offset"]
+        self._archived = True
+        return True
+
+    @staticmethod
+    def _parse(raw):
+        df = pd.read_csv(BytesIO(raw))
+        return enrich_feedback(df)
@@ -0,0 +1,140 @@
+# services/forecast_registry.py
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import pandas as pd
+
+from forecasting_service import fit_and_score, prepare_series, sarimax_forecast
+
+
+class ForecastNotReady(Exception):
+    """No fitted model yet for the series; a background fit has been started."""
+
+
+class _Entry:
+    __slots__ = ("results", "stats", "forecast", "state_end", "last_timestamp",
+                 "fitted_at", "updated_at", "appended_points")
+
+    def __init__(self, results, stats, forecast, last_timestamp):
+        now = time.time()
+        self.results = results
+        self.stats = stats
+        self.forecast = forecast
+        self.state_end = results.fittedvalues.index[-1]  # last observation the state has absorbed
+        self.last_timestamp = last_timestamp       # last observation of the source series
+        self.fitted_at = now
+        self.updated_at = now
+        self.appended_points = 0
+
+
+class ForecastModelRegistry:
+    """
+    Keeps fitted SARIMAXResults per series so requests are served from a warm model.
+
+    Each series is registered with a loader returning a (datetime, value) frame.
+    Fits never run on the caller's thread: `warm()` starts them at start-up, and
+    `get()` raises ForecastNotReady (after starting one) until the first fit is
+    done. Afterwards it returns the cached forecast and, once the entry is older
+    than `refresh_after`, kicks off a background `refresh()`. A refresh appends new observations to the existing
+    state with `results.append` (no parameter re-estimation) until `refit_after`
+    has elapsed, at which point the model is re-estimated from scratch.
+    """
+
+    def __init__(self, refresh_after=15 * 60, refit_after=6 * 60 * 60, steps=48):
+        self.refresh_after = refresh_after
+        self.refit_after = refit_after
+        self.steps = steps
+        self._loaders = {}
+        self._entries = {}
+        self._locks = {}
+        self._pending = set()
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="forecast-refit")
+
+    def register(self, series_id, loader):
+        with self._lock:
+            self._loaders[series_id] = loader
+            self._locks.setdefault(series_id, threading.Lock())
+
+    # ----------------- reads -----------------
+    def get(self, series_id, last_timestamp=None):
+        """
+        Return (forecast, stats, cache_age_seconds) for a registered series.
+
+        Passing the caller's latest known timestamp triggers a background refresh
+        when it is newer than what the cached model has seen.
+        """
+        entry = self._entries.get(series_id)
+        if entry is None:
+            self.refresh_async(series_id)
+            raise ForecastNotReady(series_id)
+
+        age = time.time() - entry.updated_at
+        newer_data = last_timestamp is not None and pd.Timestamp(last_timestamp) > entry.last_timestamp
+        if age > self.refresh_after or newer_data:
+            self.refresh_async(series_id)
+        return entry.forecast, entry.stats, round(age, 1)
+
+    # ----------------- updates -----------------
+    def refresh_async(self, series_id):
+        """Schedule `refresh()` unless one is already queued for this series."""
+        with self._lock:
+            if series_id in self._pending:
+                return
+            self._pending.add(series_id)
+        self._executor.submit(self._run_refresh, series_id)
+
+    def warm(self):
+        """Start background fits of every registered series (call at start-up)."""
+        for series_id in list(self._loaders):
+            if series_id not in self._entries:
+                self.refresh_async(series_id)
+
+    def refresh_all(self):
+        """Refresh every registered series in the calling thread (for scheduler jobs)."""
+        for series_id in list(self._loaders):
+            self.refresh(series_id)
+
+    def refresh(self, series_id, df=None):
+        """Fold new data into the cached model: cheap state append, or full refit when due."""
+        df = self._loaders[series_id]() if df is None else df
+        with self._locks[series_id]:
+            entry = self._entries.get(series_id)
+            if entry is None or time.time() - entry.fitted_at > self.refit_after:
+                return self._fit(series_id, df)
+
+            y = prepare_series(df)
+            new_obs = y[y.index > entry.state_end]
+            if new_obs.empty:
+                entry.updated_at = time.time()
+                return entry
+            if new_obs.index[0] != entry.state_end + y.index.freq:
+                # gap or misaligned series: the state cannot simply be extended
+                return self._fit(series_id, df)
+
+            results = entry.results.append(new_obs, refit=False)
+            updated = _Entry(results, dict(entry.stats), sarimax_forecast(results, self.steps), y.index[-1])
+            updated.fitted_at = entry.fitted_at
+            updated.appended_points = entry.appended_points + len(new_obs)
+            updated.stats["last_updated"] = datetime.now().isoformat()
+            updated.stats["appended_points"] = updated.appended_points
+            self._entries[series_id] = updated
+            return updated
+
+    def _run_refresh(self, series_id):
+        try:
+            self.refresh(series_id)
+        except Exception as e:
+            print(f"Forecast refresh failed for {series_id}:", e)
+        finally:
+            with self._lock:
+                self._pending.discard(series_id)
+
+    def _fit(self, series_id, df):
+        results, y, stats = fit_and_score(df)
+        stats["appended_points"] = 0
+        entry = _Entry(results, stats, sarimax_forecast(results, self.steps), y.index[-1])
+        self._entries[series_id] = entry
+        return entry
@@ -1,11 +1,19 @@
 # src/services/forecasting_service.py
+import os
+import time
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
 from statsmodels.tsa.statespace.sarimax import SARIMAX
+from statsmodels.tsa.holtwinters import ExponentialSmoothing
 from sklearn.metrics import r2_score, mean_absolute_error, mean_squared_error
 from math import sqrt
 
+from metrics import timed
+
 
 def generate_synthetic_data(hours=24 * 30):  # default = 30 days of hourly data
     """
@@ -18,7 +26,7 @@ def generate_synthetic_data(hours=24 * 30):  # default = 30 days of hourly data
     - Rare anomalies (blackouts, surges)
     - Trend + noise
     """
-    rng = pd.date_range(end=pd.Timestamp.now(), periods=hours, freq="H")
+    rng = pd.date_range(end=pd.Timestamp.now().floor("h"), periods=hours, freq="h")
 
     # -----------------------------
     # Base daily cycle (0–24h, peaks ~18–22h)
@@ -58,10 +66,11 @@ def generate_synthetic_data(hours=24 * 30):  # default = 30 days of hourly data
     return pd.DataFrame({"datetime": rng, "value": values})
 
 
-def build_forecast(df):
+def prepare_series(df):
     """
     df must have columns: datetime, value
     If df is empty or flat (all zeros), synthetic data will be generated.
+    Returns an hourly float Series indexed by datetime.
     """
     # If no data or flat, generate synthetic
     if df.empty or df["value"].sum() == 0:
@@ -72,19 +81,21 @@ def build_forecast(df):
     df = df.sort_values("datetime")
 
     # Set hourly frequency, fill missing timestamps
-    df = df.set_index("datetime").asfreq("H")
+    df = df.set_index("datetime").asfreq("h")
 
     # Handle NaN values
     df["value"] = df["value"].interpolate(method="time")
-    df["value"] = df["value"].fillna(method="bfill").fillna(method="ffill")
+    df["value"] = df["value"].bfill().ffill()
+
+    return df["value"].astype(float)
+
+
+def split_train_test(y):
+    test_hours = min(24 * 7, len(y) // 4)  # up to 1 week for test
+    return y[:-test_hours], y[-test_hours:]
 
-    # Split into train/test
-    test_hours = min(24 * 7, len(df) // 4)  # up to 1 week for test
-    y = df["value"].astype(float)
-    train = y[:-test_hours]
-    test = y[-test_hours:]
 
-    # Fit SARIMAX
+def fit_sarimax(train):
     model = SARIMAX(
         train,
         order=(1, 1, 1),
@@ -92,13 +103,11 @@ def build_forecast(df):
         enforce_stationarity=False,
         enforce_invertibility=False,
     )
-    res = model.fit(disp=False)
+    return model.fit(disp=False)
 
-    # Predictions for test set
-    pred_test = res.get_prediction(start=test.index[0], end=test.index[-1])
-    y_pred = pred_test.predicted_mean
 
-    # Metrics
+def evaluate(test, y_pred):
+    """Holdout metrics (r2/mae/rmse/mape) for a forecast of the test window."""
     r2 = r2_score(test, y_pred) if not test.empty else 0
     mae = mean_absolute_error(test, y_pred) if not test.empty else 0
     rmse = sqrt(mean_squared_error(test, y_pred)) if not test.empty else 0
@@ -107,34 +116,305 @@ def build_forecast(df):
         if not test.empty and not all(test == 0)
         else 0
     )
+    return {"r2": r2, "mae": mae, "rmse": rmse, "mape": mape}
+
 
-    # Forecast next 48h
-    fc_res = res.get_forecast(steps=48)
+def sarimax_forecast(res, steps=48):
+    """Forecast points for the `steps` hours after the end of the results' data."""
+    fc_res = res.get_forecast(steps=steps)
     fc_mean = fc_res.predicted_mean
     fc_ci = fc_res.conf_int(alpha=0.05)
+    return forecast_points(fc_mean.index, fc_mean, fc_ci.iloc[:, 0], fc_ci.iloc[:, 1])
 
+
+def forecast_points(index, mean, lower, upper):
     forecast = []
-    for ts, val, low, up in zip(fc_mean.index, fc_mean, fc_ci.iloc[:, 0], fc_ci.iloc[:, 1]):
+    for ts, val, low, up in zip(index, mean, lower, upper):
         level = "High" if val > 70 else "Medium" if val > 40 else "Low"
         forecast.append(
             {
                 "timestamp": ts.isoformat(),
-                "value": round(val, 2),
-                "lower": round(low, 2),
-                "upper": round(up, 2),
+                "value": round(float(val), 2),
+                "lower": round(float(low), 2),
+                "upper": round(float(up), 2),
                 "level": level,
             }
         )
+    return forecast
+
 
-    stats = {
-        "method": "SARIMAX",
-        "accuracy_r2": round(r2 * 100, 2),
-        "mae": round(mae, 2),
-        "rmse": round(rmse, 2),
-        "mape": round(mape, 2),
-        "training_points": len(train),
-        "test_points": len(test),
+def build_stats(metrics, train_points, test_points, method="SARIMAX"):
+    return {
+        "method": method,
+        "accuracy_r2": round(metrics["r2"] * 100, 2),
+        "mae": round(metrics["mae"], 2),
+        "rmse": round(metrics["rmse"], 2),
+        "mape": round(float(metrics["mape"]), 2),
+        "training_points": train_points,
+        "test_points": test_points,
         "last_updated": datetime.now().isoformat(),
     }
 
+
+@timed("fit_and_score")
+def fit_and_score(df):
+    """
+    Fit SARIMAX on the training split and score it on the test split; returns
+    (results, series, stats). The returned results have the test observations
+    appended (same parameters), so forecasts start after the last observation.
+    """
+    y = prepare_series(df)
+    train, test = split_train_test(y)
+
+    res = fit_sarimax(train)
+
+    # Predictions for test set
+    pred_test = res.get_prediction(start=test.index[0], end=test.index[-1])
+    metrics = evaluate(test, pred_test.predicted_mean)
+
+    return res.append(test, refit=False), y, build_stats(metrics, len(train), len(test))
+
+
+# ----------------- Forecasting engines -----------------
+# Every engine fits on the training split and predicts the hours that follow it,
+# returning (mean, lower, upper) arrays with a ~95% band. Once scored, `extend(y)`
+# brings an engine up to the end of the full series `y` (training data plus what
+# followed), so the served forecast starts after the last observation.
+def _seasonal_band(mean, sigma, season=24):
+    half = 1.96 * sigma * np.sqrt(np.arange(len(mean)) // season + 1)
+    return mean, mean - half, mean + half
+
+
+class SeasonalNaiveEngine:
+    """Repeat the last observed day."""
+    name = "Seasonal-Naive"
+
+    def __init__(self, season=24):
+        self.season = season
+
+    def fit(self, train):
+        y = train.to_numpy(dtype=float)
+        self._last = y[-self.season:]
+        diffs = y[self.season:] - y[:-self.season]
+        self._sigma = float(diffs.std()) if len(diffs) else 0.0
+        return self
+
+    def extend(self, y):
+        return self.fit(y)
+
+    def predict(self, steps):
+        mean = self._last[np.arange(steps) % len(self._last)]
+        return _seasonal_band(mean, self._sigma, self.season)
+
+
+class HoltWintersEngine:
+    """Additive trend + additive daily seasonality exponential smoothing."""
+    name = "Holt-Winters"
+
+    def __init__(self, season=24):
+        self.season = season
+
+    def fit(self, train):
+        self._res = ExponentialSmoothing(
+            train.to_numpy(dtype=float), trend="add", seasonal="add", seasonal_periods=self.season
+        ).fit()
+        self._sigma = float(np.std(self._res.resid))
+        return self
+
+    def extend(self, y):
+        return self.fit(y)
+
+    def predict(self, steps):
+        return _seasonal_band(np.asarray(self._res.forecast(steps)), self._sigma, self.season)
+
+
+class RidgeEngine:
+    """
+    Ridge regression on hour-of-day / day-of-week one-hots, a linear trend and the
+    value one week earlier. Predictions within one lag of the training end are
+    direct; longer horizons feed predictions back in, one lag-sized block at a time.
+    """
+    name = "Ridge"
+
+    def __init__(self, alpha=1.0, lag=24 * 7):
+        self.alpha = alpha
+        self.lag = lag
+
+    def _features(self, index, t, lagged):
+        X = np.zeros((len(index), 24 + 7 + 2))
+        rows = np.arange(len(index))
+        X[rows, index.hour] = 1.0
+        X[rows, 24 + index.dayofweek] = 1.0
+        X[:, 31] = t / self._scale
+        X[:, 32] = lagged
+        return X
+
+    def fit(self, train):
+        y = train.to_numpy(dtype=float)
+        self.lag = self.lag if len(y) > 2 * self.lag else 24
+        self._scale = float(len(y))
+        t = np.arange(self.lag, len(y))
+        X = self._features(train.index[self.lag:], t, y[:-self.lag])
+        A = X.T @ X + self.alpha * np.eye(X.shape[1])
+        self._coef = np.linalg.solve(A, X.T @ y[self.lag:])
+        self._sigma = float(np.std(y[self.lag:] - X @ self._coef))
+        self._history = y
+        self._end = train.index[-1]
+        return self
+
+    def extend(self, y):
+        return self.fit(y)
+
+    def predict(self, steps):
+        index = pd.date_range(self._end + pd.Timedelta(hours=1), periods=steps, freq="h")
+        values = np.concatenate([self._history, np.empty(steps)])
+        n = len(self._history)
+        for start in range(0, steps, self.lag):
+            stop = min(start + self.lag, steps)
+            t = np.arange(n + start, n + stop)
+            X = self._features(index[start:stop], t, values[t - self.lag])
+            values[n + start:n + stop] = X @ self._coef
+        mean = values[n:]
+        return _seasonal_band(mean, self._sigma, self.lag)
+
+
+class SarimaxEngine:
+    name = "SARIMAX"
+
+    def fit(self, train):
+        self._res = fit_sarimax(train)
+        return self
+
+    def extend(self, y):
+        """Append the observations after the training data, keeping the fitted parameters."""
+        self._res = self._res.append(y.iloc[self._res.nobs:], refit=False)
+        return self
+
+    def predict(self, steps):
+        fc_res = self._res.get_forecast(steps=steps)
+        fc_ci = fc_res.conf_int(alpha=0.05)
+        return (np.asarray(fc_res.predicted_mean), fc_ci.iloc[:, 0].to_numpy(), fc_ci.iloc[:, 1].to_numpy())
+
+
+FORECAST_ENGINES = {
+    "seasonal_naive": SeasonalNaiveEngine,
+    "ridge": RidgeEngine,
+    "holt_winters": HoltWintersEngine,
+    "sarimax": SarimaxEngine,
+}
+FORECAST_METHODS = list(FORECAST_ENGINES) + ["auto"]
+# Cheapest first: `auto` walks this order and stops at the first engine within budget.
+# SARIMAX (seconds per fit) is left out, so `auto` stays cheap enough for request paths.
+AUTO_ENGINES = ["seasonal_naive", "ridge", "holt_winters"]
+AUTO_MAPE_BUDGET = 15.0  # % on the holdout week; Ridge is ~5% on the synthetic demand series
+
+
+def fit_predict(method, train, steps):
+    started = time.perf_counter()
+    engine = FORECAST_ENGINES[method]().fit(train)
+    fitted = time.perf_counter()
+    prediction = engine.predict(steps)
+    return engine, prediction, fitted - started, time.perf_counter() - fitted
+
+
+@timed("build_forecast")
+def build_forecast(df, method="sarimax", steps=48, mape_budget=AUTO_MAPE_BUDGET):
+    """
+    df must have columns: datetime, value
+    If df is empty or flat (all zeros), synthetic data will be generated.
+    method: one of FORECAST_METHODS. "auto" tries AUTO_ENGINES cheapest-first and keeps the
+    first whose holdout MAPE is within `mape_budget`, else the most accurate one tried.
+    """
+    if method not in FORECAST_METHODS:
+        raise ValueError(f"Unknown forecast method '{method}', expected one of {FORECAST_METHODS}")
+
+    y = prepare_series(df)
+    train, test = split_train_test(y)
+
+    candidates = []
+    for name in (AUTO_ENGINES if method == "auto" else [method]):
+        engine, (mean, _, _), fit_s, _ = fit_predict(name, train, len(test))
+        metrics = evaluate(test, pd.Series(mean, index=test.index))
+        candidates.append((metrics["mape"], engine, metrics, fit_s))
+        if method == "auto" and metrics["mape"] <= mape_budget:
+            break
+
+    chosen = candidates[-1]
+    if method == "auto" and chosen[0] > mape_budget:
+        chosen = min(candidates, key=lambda c: c[0])
+    _, engine, metrics, fit_s = chosen
+
+    # Forecast the `steps` hours after the last observation, from the engine brought up to date
+    started = time.perf_counter()
+    engine.extend(y)
+    extended = time.perf_counter()
+    mean, lower, upper = engine.predict(steps)
+    index = pd.date_range(y.index[-1] + pd.Timedelta(hours=1), periods=steps, freq="h")
+    forecast = forecast_points(index, mean, lower, upper)
+
+    stats = build_stats(metrics, len(train), len(test), method=engine.name)
+    stats["fit_seconds"] = round(fit_s + extended - started, 3)
+    stats["predict_seconds"] = round(time.perf_counter() - extended, 3)
+    if method == "auto":
+        stats["candidates"] = [{"method": c[1].name, "mape": round(float(c[0]), 2)} for c in candidates]
+
     return forecast, stats
+
+
+# ----------------- Batch forecasting -----------------
+def series_to_buffers(df):
+    """Pack a (datetime, value) frame into two flat arrays: int64 epoch-ns and float64 values."""
+    timestamps = pd.to_datetime(df["datetime"]).to_numpy(dtype="datetime64[ns]").view("int64")
+    values = df["value"].to_numpy(dtype="float64")
+    return np.ascontiguousarray(timestamps), np.ascontiguousarray(values)
+
+
+def buffers_to_series(timestamps, values):
+    return pd.DataFrame({"datetime": pd.to_datetime(timestamps, unit="ns"), "value": values})
+
+
+def _init_worker():
+    # One BLAS thread per process: the pool supplies the parallelism
+    from threadpoolctl import threadpool_limits
+    threadpool_limits(1)
+
+
+def _forecast_buffers(series_id, timestamps, values, method):
+    started = time.perf_counter()
+    df = buffers_to_series(timestamps, values)
+    try:
+        forecast, stats = build_forecast(df, method=method)
+        result = {"forecast": forecast, "stats": stats}
+    except Exception as e:
+        result = {"error": str(e)}
+    result["timing"] = {"fit_seconds": round(time.perf_counter() - started, 3), "pid": os.getpid()}
+    return series_id, result
+
+
+def forecast_batch(series, max_workers=None, method="sarimax"):
+    """
+    Forecast many series in parallel worker processes.
+
+    series: iterable of (series_id, DataFrame with datetime/value columns),
+    e.g. one per (zone, metric). Returns {series_id: {"forecast", "stats", "timing"}};
+    a series that fails carries an "error" entry instead of forecast/stats.
+    """
+    jobs = [(series_id, *series_to_buffers(df)) for series_id, df in series]
+    if not jobs:
+        return {}
+    max_workers = min(max_workers or os.cpu_count() or 1, len(jobs))
+
+    results = {}
+    submitted_at = {}
+    # spawn: the web process runs scheduler threads, which fork() does not play well with
+    with ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context("spawn"),
+                             initializer=_init_worker) as pool:
+        futures = []
+        for job in jobs:
+            submitted_at[job[0]] = time.perf_counter()
+            futures.append(pool.submit(_forecast_buffers, *job, method))
+        for future in as_completed(futures):
+            series_id, result = future.result()
+            result["timing"]["wall_seconds"] = round(time.perf_counter() - submitted_at[series_id], 3)
+            results[series_id] = result
+    return results
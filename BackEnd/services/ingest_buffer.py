@@ -0,0 +1,146 @@
+# services/ingest_buffer.py
+import queue
+import threading
+import time
+from collections import defaultdict
+
+_STOP = object()
+
+
+class IngestionBuffer:
+    """
+    Write-behind queue for metric rows.
+
+    Ingestion jobs `enqueue(Model, **columns)` and return immediately; a single
+    writer thread drains the queue and writes each batch with one
+    bulk_insert_mappings per model and one commit. A batch is flushed when it
+    reaches `max_batch` rows or `flush_interval` seconds after its first row.
+    When the queue is full, `enqueue` blocks up to `put_timeout` seconds and then
+    raises queue.Full, so producers slow down instead of memory growing unbounded.
+    """
+
+    def __init__(self, app, db, max_batch=500, flush_interval=2.0, max_queue=10_000, put_timeout=5.0):
+        self.app = app
+        self.db = db
+        self.max_batch = max_batch
+        self.flush_interval = flush_interval
+        self.put_timeout = put_timeout
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._thread = None
+        self._start_lock = threading.Lock()
+        self._idle = threading.Condition()
+        self._pending = 0  # enqueued but not yet written (or failed)
+        self.started_at = time.time()
+        self.counters = {"rows_written": 0, "rows_failed": 0, "flushes": 0,
+                         "flush_seconds_total": 0.0, "flush_seconds_max": 0.0, "last_flush_seconds": 0.0}
+
+    # ----------------- producer side -----------------
+    def enqueue(self, model, **values):
+        self._ensure_started()
+        with self._idle:
+            self._pending += 1
+        try:
+            self._queue.put((model, values), timeout=self.put_timeout)
+        except queue.Full:
+            self._done(1)
+            raise
+
+    def flush(self, timeout=None):
+        """Block until everything enqueued so far has been written."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._idle:
+            while self._pending:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._idle.wait(remaining)
+        return True
+
+    def close(self, timeout=10):
+        """Write out whatever is queued and stop the writer thread (registered atexit)."""
+        if self._thread is None:
+            return
+        self._queue.put(_STOP)
+        self._thread.join(timeout)
+        self._thread = None
+
+    def stats(self):
+        c = dict(self.counters)
+        elapsed = max(time.time() - self.started_at, 1e-9)
+        c["rows_per_second"] = round(c["rows_written"] / elapsed, 2)
+        c["avg_flush_seconds"] = round(c["flush_seconds_total"] / c["flushes"], 4) if c["flushes"] else 0.0
+        c["queue_depth"] = self._queue.qsize()
+        return c
+
+    # ----------------- writer thread -----------------
+    def _ensure_started(self):
+        if self._thread is not None:
+            return
+        with self._start_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="ingest-writer", daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        stopping = False
+        while not stopping:
+            try:
+                item = self._queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                continue
+            if item is _STOP:
+                break
+
+            batch = [item]
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.max_batch:
+                try:
+                    item = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+            self._write(batch)
+
+        # drain anything that raced in behind the stop marker
+        leftover = []
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is not _STOP:
+                leftover.append(item)
+        if leftover:
+            self._write(leftover)
+
+    def _write(self, batch):
+        by_model = defaultdict(list)
+        for model, values in batch:
+            by_model[model].append(values)
+
+        started = time.perf_counter()
+        try:
+            with self.app.app_context():
+                for model, rows in by_model.items():
+                    self.db.session.bulk_insert_mappings(model, rows)
+                self.db.session.commit()
+            self.counters["rows_written"] += len(batch)
+        except Exception as e:
+            print("Ingestion flush failed:", e)
+            self.counters["rows_failed"] += len(batch)
+        elapsed = time.perf_counter() - started
+
+        self.counters["flushes"] += 1
+        self.counters["flush_seconds_total"] += elapsed
+        self.counters["last_flush_seconds"] = round(elapsed, 4)
+        self.counters["flush_seconds_max"] = max(self.counters["flush_seconds_max"], round(elapsed, 4))
+        self._done(len(batch))
+
+    def _done(self, n):
+        with self._idle:
+            self._pending -= n
+            if self._pending <= 0:
+                self._idle.notify_all()
@@ -0,0 +1,206 @@
+# services/ingest_runner.py
+import asyncio
+import functools
+import math
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from metrics import REGISTRY
+
+# Shared with the APScheduler maintenance jobs (wrapped with metrics.timed in main)
+JOB_SECONDS = REGISTRY.histogram("scheduler_job_duration_seconds", "Scheduled job run time, retries included", ("job",))
+JOB_RUNS = REGISTRY.counter("scheduler_job_runs_total", "Ingestion job runs by outcome", ("job", "outcome"))
+JOB_MISSED = REGISTRY.counter("scheduler_job_missed_total", "Ingestion job slots skipped because a run overran", ("job",))
+
+
+class IngestJob:
+    __slots__ = ("name", "fn", "interval", "timeout", "retries", "backoff", "jitter", "run_now", "stats", "pending")
+
+    def __init__(self, name, fn, interval, timeout, retries, backoff, jitter, run_now):
+        self.name = name
+        self.fn = fn
+        self.interval = interval
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.jitter = jitter
+        self.run_now = run_now
+        self.stats = {"interval_seconds": interval, "runs": 0, "failed_runs": 0, "attempt_errors": 0, "retries": 0,
+                      "timeouts": 0, "missed": 0, "last_seconds": None, "max_seconds": 0.0, "total_seconds": 0.0,
+                      "last_run_at": None, "last_error": None}
+        self.pending = None  # pool future of a plain-function job's latest call
+
+
+class IngestionRunner:
+    """
+    Periodic ingestion jobs on one asyncio event loop, in one thread.
+
+    A job is a coroutine function (network I/O awaits on the shared HTTP client,
+    `http`, built on the loop by `client_factory`) or a plain function, which is
+    run on a small thread pool like any other blocking work passed to
+    `offload()` (DB sessions, pandas). Each job runs every `interval` seconds on
+    a fixed grid (first run right away with `run_now`), each run delayed by up
+    to `jitter` seconds so jobs sharing an interval don't hit providers in
+    lockstep. A run that takes longer than `timeout` seconds is abandoned and
+    retried up to `retries` times, waiting backoff * 2**attempt seconds
+    (jittered) in between. Abandoning cancels pending awaits (HTTP calls) but
+    cannot stop work already running on the thread pool: it finishes in the
+    background, holding one of the few pool threads until it does. So a plain
+    function is not retried while its abandoned call still runs, and its
+    slots are skipped until that call returns. A run that overruns its slot
+    doesn't queue more: the ticks it covered are skipped and counted as missed.
+    """
+
+    def __init__(self, client_factory=None, executor_workers=2):
+        self.client_factory = client_factory
+        self.http = None
+        self.jobs = {}
+        self._executor = ThreadPoolExecutor(max_workers=executor_workers, thread_name_prefix="ingest")
+        self._loop = None
+        self._thread = None
+        self._stopping = None
+        self._tasks = []
+
+    @property
+    def running(self):
+        return self._thread is not None
+
+    # ----------------- registration -----------------
+    def add(self, name, fn, interval, timeout=30.0, retries=2, backoff=2.0, jitter=None, run_now=True):
+        """Register a job; `jitter` defaults to 5% of the interval. Jobs can be added before or after `start()`."""
+        job = IngestJob(name, fn, interval, timeout, retries, backoff,
+                        interval * 0.05 if jitter is None else jitter, run_now)
+        self.jobs[name] = job
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._spawn, job)
+        return job
+
+    # ----------------- lifecycle -----------------
+    def start(self):
+        if self._thread is not None:
+            return
+        ready = threading.Event()
+        self._thread = threading.Thread(target=self._run_loop, args=(ready,), name="ingest-loop", daemon=True)
+        self._thread.start()
+        ready.wait()
+
+    def stop(self, timeout=10):
+        """Cancel the jobs, close the HTTP client and join the loop thread (registered atexit)."""
+        if self._thread is None:
+            return
+        loop = self._loop
+        if loop is not None:
+            loop.call_soon_threadsafe(self._stopping.set)
+        self._thread.join(timeout)
+        self._thread = None
+        self._executor.shutdown(wait=False)
+
+    async def offload(self, fn, *args, **kwargs):
+        """Run blocking `fn(*args, **kwargs)` on the runner's thread pool and await its result."""
+        return await asyncio.get_running_loop().run_in_executor(self._executor, functools.partial(fn, *args, **kwargs))
+
+    def stats(self):
+        out = {}
+        for name, job in list(self.jobs.items()):
+            s = dict(job.stats)
+            total = s.pop("total_seconds")
+            s["avg_seconds"] = round(total / s["runs"], 4) if s["runs"] else None
+            out[name] = s
+        return out
+
+    # ----------------- event loop thread -----------------
+    def _run_loop(self, ready):
+        self._loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self._loop)
+        try:
+            self._loop.run_until_complete(self._main(ready))
+        except Exception as e:
+            print("Ingestion runner stopped:", e)
+        finally:
+            self._loop.close()
+            self._loop = None
+
+    async def _main(self, ready):
+        self._stopping = asyncio.Event()
+        try:
+            self.http = self.client_factory() if self.client_factory else None
+            for job in self.jobs.values():
+                self._spawn(job)
+        finally:
+            ready.set()
+        await self._stopping.wait()
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        if self.http is not None and hasattr(self.http, "aclose"):
+            await self.http.aclose()
+        self.http = None
+
+    def _spawn(self, job):
+        self._tasks.append(self._loop.create_task(self._schedule(job), name=f"ingest-{job.name}"))
+
+    async def _schedule(self, job):
+        loop = asyncio.get_running_loop()
+        next_at = loop.time() + (0 if job.run_now else job.interval)
+        jitter = 0 if job.run_now else job.jitter  # a run_now first run starts right away
+        while True:
+            await asyncio.sleep(max(0.0, next_at - loop.time()) + random.uniform(0, jitter))
+            jitter = job.jitter
+            await self._run_once(job)
+            next_at += job.interval
+            behind = loop.time() - next_at
+            if behind > 0:  # overran one or more slots: skip them rather than run back to back
+                skipped = math.ceil(behind / job.interval)
+                job.stats["missed"] += skipped
+                if REGISTRY.enabled:
+                    JOB_MISSED.inc(job.name, amount=skipped)
+                next_at += skipped * job.interval
+
+    def _call(self, job):
+        if asyncio.iscoroutinefunction(job.fn):
+            return job.fn()
+        job.pending = self._executor.submit(job.fn)
+        return asyncio.wrap_future(job.pending)
+
+    async def _run_once(self, job):
+        stats = job.stats
+        if job.pending is not None and not job.pending.done():
+            # an abandoned call of this job is still on the pool: running it again would duplicate its writes
+            stats["missed"] += 1
+            if REGISTRY.enabled:
+                JOB_MISSED.inc(job.name)
+            return
+        started = time.monotonic()
+        ok = False
+        for attempt in range(job.retries + 1):
+            try:
+                await asyncio.wait_for(self._call(job), job.timeout)
+                stats["last_error"] = None
+                ok = True
+                break
+            except asyncio.TimeoutError:
+                stats["timeouts"] += 1
+                error = f"timed out after {job.timeout}s"
+            except Exception as e:
+                error = f"{type(e).__name__}: {e}"
+            stats["attempt_errors"] += 1
+            stats["last_error"] = error
+            if attempt == job.retries or (job.pending is not None and not job.pending.done()):
+                stats["failed_runs"] += 1
+                print(f"Ingest job '{job.name}' failed after {attempt + 1} attempts:", error)
+                break
+            stats["retries"] += 1
+            await asyncio.sleep(job.backoff * 2 ** attempt * random.uniform(0.5, 1.5))
+
+        elapsed = time.monotonic() - started
+        stats["runs"] += 1
+        stats["last_seconds"] = round(elapsed, 4)
+        stats["max_seconds"] = max(stats["max_seconds"], round(elapsed, 4))
+        stats["total_seconds"] += elapsed
+        stats["last_run_at"] = time.time()
+        if REGISTRY.enabled:
+            JOB_SECONDS.observe(elapsed, job.name)
+            JOB_RUNS.inc(job.name, "ok" if ok else "failed")
@@ -1,11 +1,14 @@
 import os
+import atexit
+import base64
 import random
-from datetime import datetime, timedelta
-from collections import Counter
+import tempfile
+import threading
+from datetime import datetime, timedelta, timezone
+from urllib.parse import urlencode
 
 import pandas as pd
-import requests
-from flask import Flask, jsonify, request, send_from_directory
+from flask import Flask, Response, jsonify, request, send_from_directory
 from flask_cors import CORS
 from apscheduler.schedulers.background import BackgroundScheduler
 from dotenv import load_dotenv
@@ -14,14 +17,31 @@ from dotenv import load_dotenv
 load_dotenv()
 
 # ----------------- Init Flask & DB -----------------
-from model.models import db, Zone, TrafficData, ElectricityData, WaterData, ComplaintData, AirQualityData, Alert
-from forecasting_service import build_forecast, generate_synthetic_data
+from model.models import db, Zone, TrafficData, ElectricityData, WaterData, ComplaintData, AirQualityData, Alert, ZoneForecast
+from forecasting_service import build_forecast, forecast_batch, generate_synthetic_data, FORECAST_METHODS
+from forecast_registry import ForecastModelRegistry, ForecastNotReady
+from feedback_store import FeedbackStore
+from columnar import PartitionedArchive
+from upstream import UpstreamClient, AsyncUpstreamClient
+from ingest_runner import IngestionRunner, JOB_SECONDS
+from response_cache import ResponseCache
+from snapshots import SnapshotStore
+from ingest_buffer import IngestionBuffer
+from payloads import payload_rows, backfill_payload_fields
+from retention import RetentionManager, METRICS as HISTORY_METRICS, TIERS as HISTORY_TIERS
+import migrations
+from sentiment_rollup import SentimentRollup
+from alert_engine import AlertEngine
+from event_hub import EventHub
+from zone_metrics import ZoneMetrics
+from leader import FileLock
+import metrics
 
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 REACT_BUILD_DIR = os.path.join(BASE_DIR, "dist")
 
 app = Flask(__name__, static_folder=REACT_BUILD_DIR, static_url_path="/")
-CORS(app)
+CORS(app, expose_headers=["ETag", "X-Next-Cursor", "Link"])
 
 db_url = os.getenv("DATABASE_URL", "sqlite:///citypulse.db")
 if db_url.startswith("postgres://"):  # fix for psycopg2
@@ -31,11 +51,177 @@ app.config["SQLALCHEMY_DATABASE_URI"] = db_url
 app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
 db.init_app(app)
 
+# ----------------- Instrumentation -----------------
+# Prometheus text at /api/metrics when METRICS_ENABLED=1. Off, no request/DB hooks are
+# installed and instrumented code (upstream calls, jobs, @metrics.timed) skips its timers.
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "0") == "1"
+if METRICS_ENABLED:
+    metrics.REGISTRY.enabled = True
+    metrics.instrument_flask(app)
+    metrics.instrument_sqlalchemy()
+
+# Metric rows are written behind the ingestion jobs, in batches, by one writer thread
+ingest_buffer = IngestionBuffer(
+    app, db,
+    max_batch=int(os.getenv("INGEST_BATCH_SIZE", "500")),
+    flush_interval=float(os.getenv("INGEST_FLUSH_SECONDS", "2")),
+    max_queue=int(os.getenv("INGEST_QUEUE_SIZE", "10000")),
+)
+atexit.register(ingest_buffer.close)
+
+# Raw provider JSON: kept inline on the metric row, or compressed into RawPayload when set
+ARCHIVE_RAW_PAYLOADS = os.getenv("ARCHIVE_RAW_PAYLOADS", "0") == "1"
+
 # ----------------- API Keys / URLs -----------------
 TRAFFIC_API_KEY = os.getenv("TRAFFIC_API_KEY")
 ELECTRICITY_API_KEY = os.getenv("ELECTRICITY_API_KEY")
 ELECTRICITY_URL = os.getenv("ELECTRICITY_URL", "https://api.electricitymaps.com/v3/power-breakdown/latest")
 OWM_KEY = os.getenv("OWM_KEY")
+TRAFFIC_URL = os.getenv("TRAFFIC_URL", "https://api.tomtom.com/traffic/services/4/flowSegmentData/relative0/10/json")
+OWM_URL = os.getenv("OWM_URL", "http://api.openweathermap.org/data/2.5/air_pollution")
+
+# Shared pooled client for request-path upstream calls
+upstream = UpstreamClient(
+    max_connections=int(os.getenv("UPSTREAM_MAX_CONCURRENCY", "8")),
+    rate_per_host=float(os.getenv("UPSTREAM_RATE_PER_HOST", "10")),
+)
+
+# ----------------- Ingestion runner -----------------
+# Scheduled provider polling runs as coroutines on one event loop (non-blocking HTTP,
+# same per-host rate limit as `upstream`); row writes, alert rules and other blocking
+# steps go to its small executor. Started by the scheduler leader only.
+INGEST_TIMEOUT_SECONDS = float(os.getenv("INGEST_TIMEOUT_SECONDS", "30"))
+INGEST_RETRIES = int(os.getenv("INGEST_RETRIES", "2"))
+ingest_runner = IngestionRunner(
+    client_factory=lambda: AsyncUpstreamClient(
+        max_connections=int(os.getenv("UPSTREAM_MAX_CONCURRENCY", "8")), limiter=upstream.limiter
+    ),
+    executor_workers=int(os.getenv("INGEST_EXECUTOR_WORKERS", "2")),
+)
+atexit.register(ingest_runner.stop)  # runs before ingest_buffer.close (atexit is LIFO)
+
+# ----------------- Upstream response cache -----------------
+# Ad-hoc AQI lookups (arbitrary /api/air coordinates; the zone sweep refreshes its cells).
+# Traffic and electricity are only served from the ingested snapshots, never looked up ad hoc.
+# The TTL matches the air interval, so user traffic never polls the provider faster than ingestion does.
+CACHE_TTLS = {"air": 10 * 60}
+response_cache = ResponseCache(max_entries=int(os.getenv("RESPONSE_CACHE_SIZE", "1024")))
+
+def cache_key(provider, lat=None, lon=None):
+    """Provider plus lat/lon rounded to ~1 km, so nearby lookups share an entry."""
+    if lat is None:
+        return (provider,)
+    return (provider, round(float(lat), 2), round(float(lon), 2))
+
+def cached_fetch(provider, key, loader):
+    return response_cache.get(key, loader, CACHE_TTLS[provider])
+
+# ----------------- Latest snapshots -----------------
+# Written only by the ingestion jobs below; GET handlers read them without touching the DB.
+snapshots = SnapshotStore()
+
+# ----------------- Live event stream (SSE / long-poll) -----------------
+# Alert creations/resolutions and fresh metric snapshots, fanned out from one bounded buffer
+event_hub = EventHub(max_events=int(os.getenv("EVENT_BUFFER_SIZE", "1000")))
+SSE_HEARTBEAT_SECONDS = float(os.getenv("SSE_HEARTBEAT_SECONDS", "15"))
+LONG_POLL_MAX_SECONDS = 30
+
+snapshots.subscribe(lambda metric, payload: event_hub.publish("metric", {"metric": metric, "data": payload}))
+
+# ----------------- Metric history: retention & rollup tiers -----------------
+retention = RetentionManager(
+    db,
+    raw_days=int(os.getenv("RETENTION_RAW_DAYS", "7")),
+    hourly_days=int(os.getenv("RETENTION_HOURLY_DAYS", "90")),
+    archive_days=int(os.getenv("RETENTION_ARCHIVE_DAYS", "30")),
+    archive_root=os.getenv("HISTORY_ARCHIVE_DIR") or None,  # export expired raw rows to Parquet before deleting
+)
+COMPACTION_MINUTES = int(os.getenv("COMPACTION_MINUTES", "30"))
+
+def compact_history():
+    with app.app_context():
+        try:
+            result = retention.compact()
+            if result["rolled"] or result["deleted"]:
+                print(f"Compaction: {result['rolled']} rollup buckets written, {result['deleted']} expired rows deleted")
+        except Exception as e:
+            db.session.rollback()
+            print("Compaction failed:", e)
+
+# ----------------- Forecast model cache -----------------
+FORECAST_REFRESH_MINUTES = int(os.getenv("FORECAST_REFRESH_MINUTES", "15"))
+FORECAST_REFIT_HOURS = int(os.getenv("FORECAST_REFIT_HOURS", "6"))
+FORECAST_MIN_HISTORY_HOURS = int(os.getenv("FORECAST_MIN_HISTORY_HOURS", str(24 * 14)))
+
+@metrics.timed("electricity_history")
+def electricity_history():
+    """Hourly mean load over 60 days from the rollup tier; synthetic demand until enough real history exists."""
+    end = datetime.utcnow()
+    with app.app_context():
+        hourly = retention.series("electricity", end - timedelta(days=60), end, tier="hour").dropna(subset=["mean"])
+    if len(hourly) < FORECAST_MIN_HISTORY_HOURS:
+        return generate_synthetic_data(hours=24 * 60)
+    return pd.DataFrame({"datetime": hourly["bucket_start"], "value": hourly["mean"]})
+
+forecast_registry = ForecastModelRegistry(
+    refresh_after=FORECAST_REFRESH_MINUTES * 60, refit_after=FORECAST_REFIT_HOURS * 3600
+)
+forecast_registry.register("electricity", electricity_history)
+
+# ----------------- Per-zone forecasts -----------------
+# Zoned metrics are forecast per zone from the hourly rollups, all series in one
+# forecast_batch() call (worker processes), on an interval by the scheduler leader only.
+# The result is stored in ZoneForecast; followers load it in their periodic sync.
+ZONE_FORECAST_METRICS = {"air": "mean", "water": "mean", "complaints": "count"}  # metric -> rollup column
+ZONE_FORECAST_METHOD = os.getenv("ZONE_FORECAST_METHOD", "ridge")
+ZONE_FORECAST_WORKERS = int(os.getenv("ZONE_FORECAST_WORKERS", str(os.cpu_count() or 1)))
+ZONE_FORECAST_MINUTES = int(os.getenv("ZONE_FORECAST_MINUTES", "60"))
+ZONE_FORECAST_MIN_HISTORY_HOURS = int(os.getenv("ZONE_FORECAST_MIN_HISTORY_HOURS", "72"))
+zone_forecasts = {"series": None, "skipped": [], "built_at": None, "method": None}
+
+def zone_series(days=30):
+    """([(series_id, frame)], skipped ids) per zone and zoned metric; "zone:metric" ids.
+    Series with less than ZONE_FORECAST_MIN_HISTORY_HOURS of history are skipped, not padded."""
+    end = datetime.utcnow()
+    series, skipped = [], []
+    with app.app_context():
+        for metric, column in ZONE_FORECAST_METRICS.items():
+            hourly = retention.series(metric, end - timedelta(days=days), end, tier="hour").dropna(subset=["zone_id"])
+            for zone_id, rows in hourly.groupby("zone_id"):
+                values = rows.dropna(subset=[column]).set_index("bucket_start")[column]
+                if column == "count":
+                    values = values.asfreq("h", fill_value=0)  # no bucket = nothing happened that hour
+                series_id = f"{int(zone_id)}:{metric}"
+                if len(values) < ZONE_FORECAST_MIN_HISTORY_HOURS or not values.any():
+                    skipped.append(series_id)
+                    continue
+                series.append((series_id, pd.DataFrame({"datetime": values.index, "value": values.to_numpy()})))
+    return series, skipped
+
+def refresh_zone_forecasts():
+    """Leader: forecast every zone series and replace the stored batch."""
+    with app.app_context():
+        try:
+            series, skipped = zone_series()
+            results = forecast_batch(series, max_workers=ZONE_FORECAST_WORKERS, method=ZONE_FORECAST_METHOD)
+            built_at = datetime.utcnow()
+            ZoneForecast.query.delete()
+            db.session.add(ZoneForecast(built_at=built_at, method=ZONE_FORECAST_METHOD,
+                                        payload={"series": results, "skipped": skipped}))
+            db.session.commit()
+            zone_forecasts.update(series=results, skipped=skipped, built_at=built_at, method=ZONE_FORECAST_METHOD)
+        except Exception as e:
+            db.session.rollback()
+            print("Zone forecast refresh failed:", e)
+
+def load_zone_forecasts():
+    """Follower: take the leader's stored zone forecasts when they are newer than ours. Needs an app context."""
+    built_at = db.session.query(db.func.max(ZoneForecast.built_at)).scalar()
+    if built_at is None or built_at == zone_forecasts["built_at"]:
+        return
+    row = ZoneForecast.query.filter_by(built_at=built_at).first()
+    zone_forecasts.update(series=row.payload["series"], skipped=row.payload["skipped"], built_at=row.built_at,
+                          method=row.method)
 
 # ----------------- Simulated Data -----------------
 CATEGORIES = ["Roads", "Water Supply", "Electricity", "Garbage", "Public Transport", "Noise"]
@@ -50,55 +236,115 @@ SAMPLE_COMPLAINTS = [
 ]
 
 # ----------------- Scheduler -----------------
+# Ingestion, alerting and compaction must run in exactly one process. SCHEDULER_MODE:
+#   auto - the process holding SCHEDULER_LOCK_FILE is the leader; the others follow and retry the lock
+#   on   - lead, waiting for the lock if needed (the dedicated `python serve.py scheduler` process)
+#   off  - never lead (web workers when a dedicated scheduler process runs)
+# Followers only re-read what the leader wrote (snapshots, zone aggregates) from the DB. Every
+# process, the leader included, polls the alert fingerprint for changes made by the others.
 scheduler = BackgroundScheduler()
+SCHEDULER_MODE = os.getenv("SCHEDULER_MODE", "auto")
+SCHEDULER_LOCK_FILE = os.getenv("SCHEDULER_LOCK_FILE", os.path.join(tempfile.gettempdir(), "citypulse-scheduler.lock"))
+FOLLOWER_SYNC_SECONDS = int(os.getenv("FOLLOWER_SYNC_SECONDS", "15"))
+ALERT_SYNC_SECONDS = int(os.getenv("ALERT_SYNC_SECONDS", "5"))
+LEADER_RETRY_SECONDS = 30
+scheduler_lock = FileLock(SCHEDULER_LOCK_FILE)
+scheduler_role = {"role": None, "since": None}
+
+def timed_job(name, fn):
+    return metrics.timed(name, JOB_SECONDS)(fn)
+
+def add_leader_jobs():
+    # Ingestion jobs run once right away so the snapshots are populated at start-up
+    for name, job, minutes in (("traffic", ingest_traffic, 5), ("electricity", ingest_electricity, 5),
+                               ("air", ingest_air, 10), ("water", fetch_water, 3),
+                               ("complaints", fetch_complaints, 7), ("zone_air", ingest_zone_air, 10)):
+        ingest_runner.add(name, job, minutes * 60, timeout=INGEST_TIMEOUT_SECONDS, retries=INGEST_RETRIES)
+    ingest_runner.start()
+    now = datetime.now()
+    scheduler.add_job(func=timed_job("observe_feedback", observe_feedback), trigger="interval", minutes=1, next_run_time=now)
+    scheduler.add_job(func=timed_job("forecast_refresh", forecast_registry.refresh_all), trigger="interval",
+                      minutes=FORECAST_REFRESH_MINUTES, next_run_time=now)  # first fit at start-up
+    scheduler.add_job(func=timed_job("backfill_payloads", backfill_payloads))  # one-off, right away
+    scheduler.add_job(func=timed_job("zone_forecasts", refresh_zone_forecasts), trigger="interval",
+                      minutes=ZONE_FORECAST_MINUTES, next_run_time=now)
+    scheduler.add_job(func=timed_job("compact_history", compact_history), trigger="interval", minutes=COMPACTION_MINUTES)
+
+def become_leader():
+    """Take over ingestion: warm the in-memory aggregates from what is stored so far, then start the jobs."""
+    global zone_metrics
+    for job_id in ("follower-sync", "leader-retry"):
+        if scheduler.get_job(job_id):
+            scheduler.remove_job(job_id)
+    until = datetime.now()  # rows after this are counted in memory as they are ingested
+    zone_metrics = build_zone_metrics(until)
+    warm_alert_counters(until)
+    alert_engine.reload_active()
+    scheduler_role.update(role="leader", since=until)
+    add_leader_jobs()
+    print(f"Scheduler: leader (pid {os.getpid()})")
+
+def try_lead():
+    if scheduler_lock.acquire():
+        become_leader()
+
+def start_scheduler(mode=None):
+    """Start this process's scheduler role (safe to call multiple times)."""
+    if scheduler.running:
+        return
+    mode = mode or SCHEDULER_MODE
+    if mode == "on" and not scheduler_lock.acquire():
+        print("Scheduler: waiting for the current leader to exit...")
+        scheduler_lock.acquire(blocking=True)
+    scheduler.add_job(func=timed_job("alert_sync", sync_alert_changes), trigger="interval", seconds=ALERT_SYNC_SECONDS,
+                      id="alert-sync", next_run_time=datetime.now())
+    if mode == "on" or (mode == "auto" and scheduler_lock.acquire()):
+        become_leader()
+    else:
+        scheduler_role.update(role="follower", since=datetime.now())
+        forecast_registry.warm()  # followers serve forecasts too; later refreshes are driven by get()
+        scheduler.add_job(func=timed_job("follower_sync", sync_from_db), trigger="interval", seconds=FOLLOWER_SYNC_SECONDS,
+                          id="follower-sync", next_run_time=datetime.now())
+        if mode == "auto":
+            scheduler.add_job(func=try_lead, trigger="interval", seconds=LEADER_RETRY_SECONDS, id="leader-retry")
+        print(f"Scheduler: follower (pid {os.getpid()}, mode {mode})")
+    scheduler.start()
+
+def sync_from_db():
+    """Follower: pick up what the leader process ingested or built (snapshots, zone aggregates, zone forecasts)."""
+    global zone_metrics
+    try:
+        with app.app_context():
+            snapshots.rehydrate()
+            load_zone_forecasts()
+        zone_metrics = build_zone_metrics()
+    except Exception as e:
+        db.session.rollback()
+        print("Follower sync failed:", e)
 
-def start_scheduler():
-    """Start background jobs (safe to call multiple times)."""
-    if not scheduler.running:
-        scheduler.add_job(func=fetch_traffic, trigger="interval", minutes=5)
-        scheduler.add_job(func=fetch_electricity, trigger="interval", minutes=5)
-        scheduler.add_job(func=lambda: fetch_air(), trigger="interval", minutes=10)
-        scheduler.add_job(func=fetch_water, trigger="interval", minutes=3)
-        scheduler.add_job(func=fetch_complaints, trigger="interval", minutes=7)
-        scheduler.add_job(func=check_for_alerts, trigger="interval", minutes=5)
-        scheduler.start()
+def sync_alert_changes():
+    with app.app_context():
+        try:
+            sync_alerts()
+        except Exception as e:
+            db.session.rollback()
+            print("Alert sync failed:", e)
 
 # ----------------- Utility: CSV / Sentiment Loader -----------------
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 
-def load_data():
-    """Load feedback CSV with sentiment classification."""
-    file_path = os.path.join(BASE_DIR, "feedback_synthetic.csv")
-    if not os.path.exists(file_path):
-        return pd.DataFrame(columns=["text", "timestamp", "clean_text", "sentiment"])
-
-    df = pd.read_csv(file_path)
+# Optional columnar copy of the enriched feedback (day-partitioned Arrow IPC, memory-mapped reads)
+FEEDBACK_ARCHIVE_DIR = os.getenv("FEEDBACK_ARCHIVE_DIR")
+feedback_store = FeedbackStore(
+    os.path.join(BASE_DIR, "feedback_synthetic.csv"),
+    archive=PartitionedArchive(FEEDBACK_ARCHIVE_DIR) if FEEDBACK_ARCHIVE_DIR else None,
+)
+sentiment_rollup = SentimentRollup(feedback_store)
 
-    if "text" not in df.columns:
-        df["text"] = ""
-    if "timestamp" not in df.columns:
-        df["timestamp"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-
-    positive_words = ["good", "great", "excellent", "improved", "efficient", "smooth", "clean", "green", "responsive", "resolved"]
-    negative_words = ["nightmare", "terrible", "needs improvement", "slow", "delays", "potholes", "leakage", "cuts", "congestion", "garbage", "broken"]
-
-    def assign_sentiment(text):
-        text_lower = str(text).lower()
-        if any(word in text_lower for word in positive_words):
-            return "positive"
-        if any(word in text_lower for word in negative_words):
-            return "negative"
-        return "neutral"
-
-    df["clean_text"] = df["text"].astype(str).str.lower().str.replace('[^\w\s]', '', regex=True)
-    df["sentiment"] = df["text"].apply(assign_sentiment)
-
-    try:
-        df["timestamp"] = pd.to_datetime(df["timestamp"])
-    except Exception:
-        df["timestamp"] = pd.to_datetime(datetime.now())
-
-    return df
+@metrics.timed("load_data")
+def load_data():
+    """Return the cached feedback frame (with sentiment), picking up any rows appended to the CSV."""
+    return feedback_store.snapshot()
 
 # ----------------- Seeder for Zones -----------------
 def seed_zones():
@@ -116,55 +362,181 @@ def seed_zones():
         db.session.commit()
         print("Zones seeded.")
 
-# ----------------- External fetchers -----------------
-def fetch_traffic():
-    try:
-        lat, lon = 28.6139, 77.2090
-        url = f"https://api.tomtom.com/traffic/services/4/flowSegmentData/relative0/10/json?key={TRAFFIC_API_KEY}&point={lat},{lon}"
-        r = requests.get(url, timeout=10)
-        r.raise_for_status()
-        data = r.json()
-
-        fdata = data.get("flowSegmentData", {})
-        curr, free = fdata.get("currentTravelTime"), fdata.get("freeFlowTravelTime")
-        congestion_percent = round(curr / free * 100, 2) if curr and free else None
+# ----------------- Zone aggregates -----------------
+# Samples are attributed to their nearest zone at ingest; /api/zones reads the cached aggregates
+ZONE_WATER_CAPACITY_ML = float(os.getenv("ZONE_WATER_CAPACITY_ML", "2.7"))
+zone_metrics = ZoneMetrics(water_capacity_ml=ZONE_WATER_CAPACITY_ML)
+CITY_CENTER = (28.6139, 77.2090)
+ZONE_PRIORITY_WEIGHTS = {"high": 3.0}  # simulated complaints / meter readings land more often in busy zones
 
-        db.session.add(TrafficData(data=data))
-        db.session.commit()
-        return {"congestion": f"{congestion_percent}%" if congestion_percent else "unknown"}
-    except Exception as e:
-        print("Traffic API error:", e)
-        return {"error": "Traffic fetch failed"}
+_zones_changed = threading.Event()
+for _event in ("after_insert", "after_update", "after_delete"):
+    db.event.listen(Zone, _event, lambda *args: _zones_changed.set())
 
-def fetch_electricity():
-    try:
-        zone = "IN-WE"
-        headers = {"auth-token": ELECTRICITY_API_KEY}
-        r = requests.get(f"{ELECTRICITY_URL}?zone={zone}", headers=headers, timeout=10)
-        r.raise_for_status()
-        data = r.json()
-        total_load = data.get("powerConsumptionTotal")
-
-        db.session.add(ElectricityData(data=data))
-        db.session.commit()
-        return {"zone": zone, "electricity_load": f"{total_load} MW" if total_load else "unknown"}
-    except Exception as e:
-        print("Electricity API error:", e)
-        return {"error": "Electricity fetch failed"}
+def load_zones(target=None):
+    """(Re)load the zone list into the aggregates and rebuild the spatial index."""
+    _zones_changed.clear()
+    with app.app_context():
+        zones = Zone.query.all()
+        (target or zone_metrics).set_zones([{
+            "id": z.id, "name": z.name, "priority": z.priority,
+            "position": {"top": z.position_top, "left": z.position_left},
+            "latitude": z.latitude, "longitude": z.longitude,
+        } for z in zones])
+
+def refresh_zones_if_changed():
+    if _zones_changed.is_set():
+        load_zones()
+
+def zone_ref(zone_id, distance_km=None):
+    zone = zone_metrics.zones[zone_metrics.index[zone_id]]
+    ref = {"id": zone["id"], "name": zone["name"]}
+    if distance_km is not None:
+        ref["distance_km"] = round(float(distance_km), 3)
+    return ref
+
+def simulated_location():
+    """A point near a random zone (weighted by priority), or the city centre when there are no zones."""
+    zones = zone_metrics.zones
+    if not zones:
+        return CITY_CENTER
+    zone = random.choices(zones, weights=[ZONE_PRIORITY_WEIGHTS.get(z["priority"], 1.0) for z in zones])[0]
+    return zone["latitude"] + random.uniform(-0.01, 0.01), zone["longitude"] + random.uniform(-0.01, 0.01)
+
+def utc_naive(local):
+    """Naive local time -> naive UTC, the convention of every stored sample timestamp."""
+    return local.astimezone(timezone.utc).replace(tzinfo=None)
+
+def build_zone_metrics(until=None):
+    """Fresh aggregates replayed from the samples stored before `until` (local time, default now)."""
+    until_utc = utc_naive(until or datetime.now())  # stored sample timestamps are naive UTC
+    aggregates = ZoneMetrics(water_capacity_ml=ZONE_WATER_CAPACITY_ML)
+    load_zones(aggregates)
+    with app.app_context():
+        for zone_id, ts in (db.session.query(ComplaintData.zone_id, ComplaintData.timestamp)
+                            .filter(ComplaintData.timestamp >= until_utc - timedelta(hours=1), ComplaintData.timestamp < until_utc)):
+            aggregates.add_complaint(zone_id, ts.replace(tzinfo=timezone.utc).timestamp())
+        for zone_id, ts, usage in (db.session.query(WaterData.zone_id, WaterData.timestamp, WaterData.usage)
+                                   .filter(WaterData.timestamp >= until_utc - timedelta(days=1), WaterData.timestamp < until_utc)):
+            aggregates.add_water(zone_id, usage, ts.replace(tzinfo=timezone.utc).timestamp())
+        for zone_id, aqi in (db.session.query(AirQualityData.zone_id, AirQualityData.aqi)
+                             .filter(AirQualityData.zone_id.isnot(None), AirQualityData.timestamp >= until_utc - timedelta(hours=1),
+                                     AirQualityData.timestamp < until_utc)
+                             .order_by(AirQualityData.timestamp)):
+            aggregates.set_aqi(zone_id, aqi)  # newest wins
+    return aggregates
+
+async def ingest_zone_air():
+    """AQI at every zone's coordinates, one concurrent call per ~1 km cell, on the air schedule.
+    Results also refresh the /api/air lookup cache for those cells."""
+    await ingest_runner.offload(refresh_zones_if_changed)
+    cells = {}
+    for zone in zone_metrics.zones:
+        cells.setdefault(cache_key("air", zone["latitude"], zone["longitude"]), []).append(zone)
+    results = await ingest_runner.http.map(
+        lambda zones: ingest_runner.http.get_json(air_url(zones[0]["latitude"], zones[0]["longitude"])), list(cells.values())
+    )
+    errors = [r for r in results if isinstance(r, Exception)]
+    if errors and len(errors) == len(results):
+        raise errors[0]  # provider down: let the runner retry the whole job
+    await ingest_runner.offload(record_zone_air, [
+        (key, zones, parse_aqi(data)) for (key, zones), data in zip(cells.items(), results) if not isinstance(data, Exception)
+    ])
+
+def record_zone_air(cells):
+    for key, zones, aqi in cells:
+        summary = air_summary(aqi)
+        response_cache.refresh(key, lambda: summary, CACHE_TTLS["air"])
+        for zone in zones:
+            # stored too, so processes that don't ingest can rebuild per-zone AQI
+            ingest_buffer.enqueue(AirQualityData, timestamp=datetime.utcnow(), aqi=aqi,
+                                  description=summary["description"], zone_id=zone["id"], source="zone")
+            zone_metrics.set_aqi(zone["id"], aqi)
 
-def fetch_air(lat=28.6139, lon=77.2090):
+# ----------------- External fetchers -----------------
+AQI_LABELS = {1: "Good 🌿", 2: "Fair 🙂", 3: "Moderate 😐", 4: "Poor 😷", 5: "Very Poor ☠️"}
+
+def traffic_summary(curr, free):
+    congestion_percent = round(curr / free * 100, 2) if curr and free else None
+    return {"congestion": f"{congestion_percent}%" if congestion_percent else "unknown"}
+
+def electricity_summary(total_load, zone="IN-WE"):
+    if isinstance(total_load, float) and total_load.is_integer():
+        total_load = int(total_load)  # typed column is Float; keep "25000 MW", not "25000.0 MW"
+    return {"zone": zone, "electricity_load": f"{total_load} MW" if total_load else "unknown"}
+
+def air_summary(aqi):
+    return {"aqi": aqi, "description": AQI_LABELS.get(aqi, "Unknown")}
+
+def water_summary(usage, condition):
+    return {"water_usage": f"{usage} ML", "condition": condition}
+
+def complaint_summary(category, description, status, timestamp):
+    return {"category": category, "description": description, "status": status, "timestamp": timestamp.strftime("%Y-%m-%d %H:%M:%S")}
+
+# Ingestion jobs: the only code that calls providers on a schedule and writes metric rows.
+# Provider calls are awaited on ingest_runner's loop; the record_* halves run on its executor.
+# Rows are queued on ingest_buffer, so timestamps are taken here (sample time, not flush time).
+def enqueue_payload(model, data):
+    """Queue the metric row (typed fields + raw JSON or its archive row); returns the metric row's values."""
+    rows = payload_rows(model, data, datetime.utcnow(), archive=ARCHIVE_RAW_PAYLOADS)
+    for row_model, values in rows:
+        ingest_buffer.enqueue(row_model, **values)
+    return rows[0][1]
+
+async def ingest_traffic():
+    lat, lon = 28.6139, 77.2090
+    data = await ingest_runner.http.get_json(f"{TRAFFIC_URL}?key={TRAFFIC_API_KEY}&point={lat},{lon}")
+    return await ingest_runner.offload(record_traffic, data)
+
+def record_traffic(data):
+    row = enqueue_payload(TrafficData, data)
+    result = traffic_summary(row["current_travel_time"], row["free_flow_travel_time"])
+    snapshots.publish("traffic", result)
+    alert_engine.observe("traffic", row)
+    return result
+
+async def ingest_electricity(zone="IN-WE"):
+    headers = {"auth-token": ELECTRICITY_API_KEY}
+    data = await ingest_runner.http.get_json(f"{ELECTRICITY_URL}?zone={zone}", headers=headers)
+    return await ingest_runner.offload(record_electricity, data, zone)
+
+def record_electricity(data, zone):
+    row = enqueue_payload(ElectricityData, data)
+    result = electricity_summary(row["power_consumption_total"], zone)
+    snapshots.publish("electricity", result)
+    alert_engine.observe("electricity", row)
+    return result
+
+def air_url(lat, lon):
+    return f"{OWM_URL}?lat={lat}&lon={lon}&appid={OWM_KEY}"
+
+def fetch_air_payload(lat, lon):
+    """HTTP only (safe to run off the request thread); returns the raw OWM JSON."""
+    return upstream.get_json(air_url(lat, lon))
+
+def parse_aqi(data):
+    return data.get("list", [{}])[0].get("main", {}).get("aqi")
+
+async def ingest_air(lat=28.6139, lon=77.2090):
+    data = await ingest_runner.http.get_json(air_url(lat, lon))
+    return await ingest_runner.offload(record_air, lat, lon, parse_aqi(data))
+
+def record_air(lat, lon, aqi):
+    description = AQI_LABELS.get(aqi, "Unknown")
+    refresh_zones_if_changed()
+    zone_id = zone_metrics.nearest(lat, lon)
+    ingest_buffer.enqueue(AirQualityData, timestamp=datetime.utcnow(), aqi=aqi, description=description, zone_id=zone_id)
+    zone_metrics.set_aqi(zone_id, aqi)
+    result = air_summary(aqi)
+    snapshots.publish("air", result)
+    alert_engine.observe("air", {"aqi": aqi, "description": description})
+    return result
+
+def lookup_air(lat, lon):
+    """Cached, read-only AQI for arbitrary coordinates (no DB write)."""
     try:
-        url = f"http://api.openweathermap.org/data/2.5/air_pollution?lat={lat}&lon={lon}&appid={OWM_KEY}"
-        r = requests.get(url, timeout=10)
-        r.raise_for_status()
-        data = r.json()
-
-        aqi = data.get("list", [{}])[0].get("main", {}).get("aqi")
-        labels = {1: "Good 🌿", 2: "Fair 🙂", 3: "Moderate 😐", 4: "Poor 😷", 5: "Very Poor ☠️"}
-
-        db.session.add(AirQualityData(aqi=aqi, description=labels.get(aqi, "Unknown")))
-        db.session.commit()
-        return {"aqi": aqi, "description": labels.get(aqi, "Unknown")}
+        return cached_fetch("air", cache_key("air", lat, lon), lambda: air_summary(parse_aqi(fetch_air_payload(lat, lon))))
     except Exception as e:
         print("Air Quality API error:", e)
         return {"error": "Air quality fetch failed"}
@@ -177,21 +549,70 @@ def fetch_water():
     elif usage < 2.2:
         status = "Low 💧"
 
-    db.session.add(WaterData(usage=usage, condition=status))
-    db.session.commit()
-    return {"water_usage": f"{usage} ML", "condition": status}
+    refresh_zones_if_changed()
+    zone_id = zone_metrics.nearest(*simulated_location())  # simulated district meter
+    ingest_buffer.enqueue(WaterData, timestamp=datetime.utcnow(), usage=usage, condition=status, zone_id=zone_id)
+    zone_metrics.add_water(zone_id, usage)
+    result = water_summary(usage, status)
+    snapshots.publish("water", result)
+    alert_engine.observe("water", {"usage": usage, "condition": status})
+    return result
 
 def fetch_complaints():
+    refresh_zones_if_changed()
     complaints = []
     for _ in range(5):
         category, description = random.choice(CATEGORIES), random.choice(SAMPLE_COMPLAINTS)
         status = random.choice(["Open", "In Progress", "Resolved"])
-        complaint_entry = ComplaintData(category=category, description=description, status=status, timestamp=datetime.now())
-        db.session.add(complaint_entry)
-        complaints.append({"category": category, "description": description, "status": status, "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S")})
-    db.session.commit()
+        timestamp = datetime.utcnow()
+        lat, lon = simulated_location()
+        zone_id = zone_metrics.nearest(lat, lon)
+        ingest_buffer.enqueue(ComplaintData, category=category, description=description, status=status, timestamp=timestamp,
+                              latitude=lat, longitude=lon, zone_id=zone_id)
+        complaint_counter.add(timestamp)
+        zone_metrics.add_complaint(zone_id)
+        complaints.append(complaint_summary(category, description, status, timestamp))
+    result = {"count": len(complaints), "complaints": complaints}
+    snapshots.publish("complaints", result)
+    alert_engine.observe("complaints", {"last_hour": complaint_counter.total(timedelta(hours=1), now=datetime.utcnow())})
+    return result
+
+# Cold start: until a job has run in this process, serve the newest stored sample.
+def _hydrate_from(model, summarize, *criteria):
+    def hydrate():
+        row = model.query.filter(*criteria).order_by(model.timestamp.desc()).first()
+        return summarize(row) if row else None
+    return hydrate
+
+snapshots.register("traffic", _hydrate_from(TrafficData, lambda r: traffic_summary(r.current_travel_time, r.free_flow_travel_time)))
+snapshots.register("electricity", _hydrate_from(ElectricityData, lambda r: electricity_summary(r.power_consumption_total)))
+snapshots.register("air", _hydrate_from(AirQualityData, lambda r: air_summary(r.aqi),
+                                        AirQualityData.source.is_(None)))  # city centre, not the zone sweep
+snapshots.register("water", _hydrate_from(WaterData, lambda r: water_summary(r.usage, r.condition)))
+
+def _latest_complaints():
+    rows = ComplaintData.query.order_by(ComplaintData.timestamp.desc()).limit(5).all()
+    if not rows:
+        return None
+    complaints = [complaint_summary(r.category, r.description, r.status, r.timestamp) for r in reversed(rows)]
     return {"count": len(complaints), "complaints": complaints}
 
+snapshots.register("complaints", _latest_complaints)
+
+def read_snapshot(metric):
+    snapshot = snapshots.get(metric)
+    return snapshot if snapshot is not None else {"error": f"No {metric} data ingested yet"}
+
+def backfill_payloads():
+    """Fill typed traffic/electricity columns for rows ingested before they existed."""
+    with app.app_context():
+        try:
+            updated = backfill_payload_fields(db, archive=ARCHIVE_RAW_PAYLOADS)
+            if updated:
+                print(f"Backfilled typed payload fields on {updated} rows")
+        except Exception as e:
+            print("Payload backfill failed:", e)
+
 
 def seed_alerts():
     """Seed the database with a variety of realistic alerts if the table is empty."""
@@ -230,101 +651,97 @@ def seed_alerts():
             
             db.session.commit()
             print(f"{len(alert_templates)} alerts have been seeded.")
-
-# In app.py, replace your existing check_for_alerts function
-
-def check_for_alerts():
-    """
-    Checks various data sources for conditions that should trigger an alert.
-    """
+            alert_engine.reload_active()
+            alerts_changed()
+
+# ----------------- Alert rules (evaluated at ingest) -----------------
+alert_engine = AlertEngine(app, db, Alert)
+alert_engine.listeners.append(lambda alert: alerts_changed(alert))
+alert_engine.listeners.append(lambda alert: event_hub.publish("alert.created", serialize_alert(alert)))
+complaint_counter = alert_engine.counter("complaints", [timedelta(hours=1)])  # UTC, like the stored timestamps
+feedback_counter = alert_engine.counter("feedback", [timedelta(days=1), timedelta(days=7)])
+negative_feedback_counter = alert_engine.counter("feedback_negative", [timedelta(days=1), timedelta(days=7)])
+
+def traffic_congestion(sample):
+    free = sample["free_flow_travel_time"]
+    return (sample["current_travel_time"] or 0) / free if free and free > 0 else None
+
+def negative_sentiment_spike(sample):
+    """Negative share of the last 24h if it is a spike against the 7-day baseline, else None."""
+    if sample["recent_total"] <= 10 or sample["baseline_total"] <= 50:  # Ensure enough data
+        return None
+    recent_percent = sample["recent_negative"] / sample["recent_total"] * 100
+    baseline_percent = sample["baseline_negative"] / sample["baseline_total"] * 100
+    # If 10% higher than baseline and over 20%
+    return recent_percent if recent_percent > baseline_percent + 10 and recent_percent > 20 else None
+
+alert_engine.rule(
+    "High Air Pollution", "air",
+    when=lambda s, e: s["aqi"] is not None and s["aqi"] >= 4,
+    describe=lambda s, e: f"AQI levels are at {s['aqi']} ({s['description']})",
+    severity="warning", location="City-wide", assigned_to="Environmental Team", estimated_resolution="2 hours",
+)
+alert_engine.rule(
+    "High Traffic Congestion", "traffic",
+    when=lambda s, e: (traffic_congestion(s) or 0) > 1.5,  # 50% slower than normal
+    describe=lambda s, e: f"Traffic is {traffic_congestion(s):.0%} of free-flow speed.",
+    severity="urgent", location="Downtown District", assigned_to="Traffic Control", estimated_resolution="45 minutes",
+)
+alert_engine.rule(
+    "High Complaint Volume", "complaints",
+    when=lambda s, e: s["last_hour"] > 10,
+    describe=lambda s, e: f"{s['last_hour']} new complaints in the last hour.",
+    severity="warning", location="City-wide", assigned_to="Public Grievance Team", estimated_resolution="Investigating",
+)
+alert_engine.rule(
+    "Power Grid Strain", "electricity",
+    when=lambda s, e: (s["power_consumption_total"] or 0) > 25000,  # Example threshold
+    describe=lambda s, e: "Total power consumption has exceeded 25,000 MW.",
+    severity="warning", location="IN-WE Grid", assigned_to="Power Grid Team", estimated_resolution="Monitoring",
+)
+alert_engine.rule(
+    "High Water Consumption", "water",
+    when=lambda s, e: "High" in s["condition"],
+    describe=lambda s, e: f"Water usage at {s['usage']} ML, exceeding normal levels.",
+    severity="warning", location="City Water Supply", assigned_to="Water Management", estimated_resolution="1 hour",
+)
+alert_engine.rule(
+    "Spike in Negative Sentiment", "feedback",
+    when=lambda s, e: negative_sentiment_spike(s) is not None,
+    describe=lambda s, e: f"Negative sentiment is at {negative_sentiment_spike(s):.0f}% in the last 24h, a significant increase.",
+    severity="urgent", location="Public Feedback Channels", assigned_to="PR Department", estimated_resolution="Under Review",
+)
+
+def warm_alert_counters(until):
+    """Reset the complaint counter to the last hour stored before `until` (local time; when this process starts leading)."""
+    until = utc_naive(until)
     with app.app_context():
-        print(f"--- Running Alert Check at {datetime.now()} ---")
-        
-        # --- 1. Air Quality Alert ---
-        latest_aqi = AirQualityData.query.order_by(AirQualityData.timestamp.desc()).first()
-        if latest_aqi and latest_aqi.aqi and latest_aqi.aqi >= 4:
-            if not Alert.query.filter_by(title="High Air Pollution", status="active").first():
-                db.session.add(Alert(
-                    title="High Air Pollution", description=f"AQI levels are at {latest_aqi.aqi} ({latest_aqi.description})",
-                    severity="warning", location="City-wide", status="active",
-                    assigned_to="Environmental Team", estimated_resolution="2 hours"
-                ))
-                print("SUCCESS: New Air Quality Alert generated!")
-
-        # --- 2. Traffic Congestion Alert ---
-        latest_traffic = TrafficData.query.order_by(TrafficData.timestamp.desc()).first()
-        if latest_traffic and latest_traffic.data:
-            fdata = latest_traffic.data.get("flowSegmentData", {})
-            if fdata.get("freeFlowTravelTime", 0) > 0:
-                congestion = fdata.get("currentTravelTime", 0) / fdata.get("freeFlowTravelTime")
-                if congestion > 1.5: # 50% slower than normal
-                    if not Alert.query.filter_by(title="High Traffic Congestion", status="active").first():
-                        db.session.add(Alert(
-                            title="High Traffic Congestion", description=f"Traffic is {congestion:.0%} of free-flow speed.",
-                            severity="urgent", location="Downtown District", status="active",
-                            assigned_to="Traffic Control", estimated_resolution="45 minutes"
-                        ))
-                        print("SUCCESS: New Traffic Congestion Alert generated!")
-        
-        # --- 3. High Complaint Volume Alert ---
-        one_hour_ago = datetime.utcnow() - timedelta(hours=1)
-        recent_complaints_count = ComplaintData.query.filter(ComplaintData.timestamp >= one_hour_ago).count()
-        if recent_complaints_count > 10:
-             if not Alert.query.filter_by(title="High Complaint Volume", status="active").first():
-                db.session.add(Alert(
-                    title="High Complaint Volume", description=f"{recent_complaints_count} new complaints in the last hour.",
-                    severity="warning", location="City-wide", status="active",
-                    assigned_to="Public Grievance Team", estimated_resolution="Investigating"
-                ))
-                print("SUCCESS: New Complaint Volume Alert generated!")
-        
-        # --- 4. NEW: Power Grid Strain Alert ---
-        latest_power = ElectricityData.query.order_by(ElectricityData.timestamp.desc()).first()
-        if latest_power and latest_power.data and latest_power.data.get("powerConsumptionTotal", 0) > 25000: # Example threshold
-            if not Alert.query.filter_by(title="Power Grid Strain", status="active").first():
-                db.session.add(Alert(
-                    title="Power Grid Strain", description=f"Total power consumption has exceeded 25,000 MW.",
-                    severity="warning", location="IN-WE Grid", status="active",
-                    assigned_to="Power Grid Team", estimated_resolution="Monitoring"
-                ))
-                print("SUCCESS: New Power Grid Alert generated!")
-
-        # --- 5. NEW: High Water Consumption Alert ---
-        latest_water = WaterData.query.order_by(WaterData.timestamp.desc()).first()
-        if latest_water and "High" in latest_water.condition:
-            if not Alert.query.filter_by(title="High Water Consumption", status="active").first():
-                db.session.add(Alert(
-                    title="High Water Consumption", description=f"Water usage at {latest_water.usage} ML, exceeding normal levels.",
-                    severity="warning", location="City Water Supply", status="active",
-                    assigned_to="Water Management", estimated_resolution="1 hour"
-                ))
-                print("SUCCESS: New Water Usage Alert generated!")
-
-        # --- 6. NEW: Negative Sentiment Spike Alert ---
-        df = load_data()
-        if not df.empty:
-            day_ago = datetime.now() - timedelta(days=1)
-            week_ago = datetime.now() - timedelta(days=7)
-            
-            recent_neg = df[(df["timestamp"] >= day_ago) & (df["sentiment"] == "negative")].shape[0]
-            recent_total = df[df["timestamp"] >= day_ago].shape[0]
-            
-            baseline_neg = df[(df["timestamp"] >= week_ago) & (df["sentiment"] == "negative")].shape[0]
-            baseline_total = df[df["timestamp"] >= week_ago].shape[0]
-
-            if recent_total > 10 and baseline_total > 50: # Ensure enough data
-                recent_percent = (recent_neg / recent_total) * 100
-                baseline_percent = (baseline_neg / baseline_total) * 100
-                if recent_percent > (baseline_percent + 10) and recent_percent > 20: # If 10% higher than baseline and over 20%
-                    if not Alert.query.filter_by(title="Spike in Negative Sentiment", status="active").first():
-                        db.session.add(Alert(
-                            title="Spike in Negative Sentiment", description=f"Negative sentiment is at {recent_percent:.0f}% in the last 24h, a significant increase.",
-                            severity="urgent", location="Public Feedback Channels", status="active",
-                            assigned_to="PR Department", estimated_resolution="Under Review"
-                        ))
-                        print("SUCCESS: New Negative Sentiment Alert generated!")
-
-        db.session.commit()
+        stamps = [t for (t,) in db.session.query(ComplaintData.timestamp)
+                  .filter(ComplaintData.timestamp >= until - timedelta(hours=1), ComplaintData.timestamp < until)]
+    complaint_counter.clear()
+    complaint_counter.add_many(stamps)
+
+_feedback_seen = {"generation": None, "rows": 0}
+
+def observe_feedback():
+    """Count feedback rows appended since the last run, then evaluate the sentiment rule."""
+    generation, df = feedback_store.versioned_snapshot()
+    if generation != _feedback_seen["generation"]:  # file was reloaded: recount from scratch
+        feedback_counter.clear()
+        negative_feedback_counter.clear()
+        _feedback_seen.update(generation=generation, rows=0)
+    new = df.iloc[_feedback_seen["rows"]:]
+    _feedback_seen["rows"] = len(df)
+    if not new.empty:
+        feedback_counter.add_many(new["timestamp"])
+        negative_feedback_counter.add_many(new.loc[new["sentiment"] == "negative", "timestamp"])
+
+    now = datetime.now()
+    total, negative = feedback_counter.totals(now), negative_feedback_counter.totals(now)
+    alert_engine.observe("feedback", {
+        "recent_total": total[timedelta(days=1)], "recent_negative": negative[timedelta(days=1)],
+        "baseline_total": total[timedelta(days=7)], "baseline_negative": negative[timedelta(days=7)],
+    })
 
 
 # ----------------- Flask Endpoints -----------------
@@ -333,23 +750,76 @@ def check_for_alerts():
 def health():
     return {"status": "ok", "message": "CityPulse API is live 🚀"} 
 
+@app.route("/api/ingest/status")
+def ingest_status():
+    """Scheduler role of this process, per-job ingestion counters (leader only) and write-buffer stats."""
+    role = dict(scheduler_role, since=scheduler_role["since"].isoformat() if scheduler_role["since"] else None)
+    return jsonify({"scheduler": role, "jobs": ingest_runner.stats(), "buffer": ingest_buffer.stats()})
+
+@app.route("/api/metrics")
+def get_metrics():
+    """Prometheus text exposition of this process's metrics."""
+    if not METRICS_ENABLED:
+        return jsonify({"error": "Metrics are disabled (set METRICS_ENABLED=1)"}), 404
+    return Response(metrics.REGISTRY.render(), content_type="text/plain; version=0.0.4; charset=utf-8")
+
+@metrics.REGISTRY.collector
+def component_metrics():
+    """Counters the components already keep, read at scrape time."""
+    cache = response_cache.stats()
+    lookups = cache["hits"] + cache["stale_hits"] + cache["misses"]
+    buffer = ingest_buffer.stats()
+    return [
+        ("response_cache_requests_total", "counter", "Upstream response cache lookups by result",
+         [({"result": k}, cache[k]) for k in ("hits", "stale_hits", "misses", "coalesced")]),
+        ("response_cache_hit_ratio", "gauge", "Share of cache lookups served without waiting on a load",
+         [({}, (cache["hits"] + cache["stale_hits"]) / lookups if lookups else float("nan"))]),
+        ("response_cache_entries", "gauge", "Entries in the upstream response cache", [({}, cache["entries"])]),
+        ("ingest_buffer_rows_total", "counter", "Metric rows handled by the write-behind buffer",
+         [({"outcome": "written"}, buffer["rows_written"]), ({"outcome": "failed"}, buffer["rows_failed"])]),
+        ("ingest_buffer_flush_seconds_total", "counter", "Time spent writing buffered batches",
+         [({}, buffer["flush_seconds_total"])]),
+        ("ingest_buffer_queue_depth", "gauge", "Rows waiting to be written", [({}, buffer["queue_depth"])]),
+        ("snapshot_age_seconds", "gauge", "Seconds since each metric snapshot was last published",
+         [({"metric": m}, snapshots.age(m)) for m in ("traffic", "electricity", "air", "water", "complaints")
+          if snapshots.age(m) is not None]),
+        ("alert_rule_evaluations_total", "counter", "Alert rule evaluations", [({}, alert_engine.stats["evaluations"])]),
+        ("alerts_fired_total", "counter", "Alerts raised by the rule engine", [({}, alert_engine.stats["fired"])]),
+        ("event_stream_clients", "gauge", "Connected SSE / long-poll clients", [({}, event_hub.counters["clients"])]),
+        ("scheduler_leader", "gauge", "1 if this process runs the ingestion jobs",
+         [({}, 1 if scheduler_role["role"] == "leader" else 0)]),
+    ]
+
 # -- System endpoints (traffic, electricity, water, air, complaints) --
 @app.route("/api/traffic", methods=["GET"])
 def get_traffic():
-    return jsonify(fetch_traffic())
+    return jsonify(read_snapshot("traffic"))
 
 @app.route("/api/electricity", methods=["GET"])
 def get_electricity_load():
-    return jsonify(fetch_electricity())
+    return jsonify(read_snapshot("electricity"))
 
 @app.route("/api/electricity/forecast", methods=["GET"])
 def get_forecast():
-    # Generate synthetic data then run forecasting service
-    df = generate_synthetic_data(hours=24 * 60)  # example: minute-level for 24h
-    forecast, stats = build_forecast(df)
+    method = request.args.get("method", "sarimax")
+    if method not in FORECAST_METHODS:
+        return jsonify({"error": f"Unknown method '{method}'", "methods": FORECAST_METHODS}), 400
+
+    if method == "sarimax":
+        # Served from the cached SARIMAX fit; fits and refits happen in the background
+        try:
+            forecast, stats, cache_age = forecast_registry.get("electricity")
+        except ForecastNotReady:
+            warming = {"status": "warming", "message": "Forecast model is being fitted, retry shortly"}
+            return jsonify(warming), 503, {"Retry-After": "10"}
+    else:
+        # Fast-path engines (and `auto`, which never tries SARIMAX) are cheap enough to run per request
+        forecast, stats = build_forecast(electricity_history(), method=method)
+        cache_age = 0
     return jsonify({
         "forecast": forecast,
         "stats": stats,
+        "cache_age_seconds": cache_age,
         "feature_importance": [
             {"feature": "Historical Patterns", "importance": 0.85},
             {"feature": "Weather Conditions", "importance": 0.72},
@@ -360,57 +830,110 @@ def get_forecast():
         ]
     })
 
+@app.route("/api/history/<metric>", methods=["GET"])
+def get_history(metric):
+    """
+    Metric history for the last `days` (default 1); the storage tier is chosen from the window length.
+    Zoned metrics (air, water, complaints) have one point per zone and bucket; `zone` keeps one zone.
+    """
+    if metric not in HISTORY_METRICS:
+        return jsonify({"error": f"Unknown metric '{metric}'", "metrics": list(HISTORY_METRICS)}), 400
+    tier = request.args.get("tier")
+    if tier is not None and tier not in HISTORY_TIERS:
+        return jsonify({"error": f"Unknown tier '{tier}'", "tiers": HISTORY_TIERS}), 400
+    days = request.args.get("days", default=1, type=float)
+    if days <= 0:
+        return jsonify({"error": "days must be positive"}), 400
+    zone = request.args.get("zone", type=int)
+
+    end = datetime.utcnow()
+    start = end - timedelta(days=days)
+    tier = tier or retention.pick_tier(start, end)
+    frame = retention.series(metric, start, end, tier=tier)
+    if zone is not None:
+        frame = frame[frame["zone_id"] == zone]
+    frame = frame.astype(object).where(frame.notna(), None)
+    return jsonify({
+        "metric": metric,
+        "tier": tier,
+        "points": [
+            {"timestamp": row.bucket_start.isoformat(), "zone_id": None if row.zone_id is None else int(row.zone_id),
+             "min": row.min, "max": row.max, "mean": row.mean, "count": int(row.count)}
+            for row in frame.itertuples(index=False)
+        ],
+    })
+
 @app.route("/api/water", methods=["GET"])
 def get_water_usage():
-    return jsonify(fetch_water())
+    return jsonify(read_snapshot("water"))
 
 @app.route("/api/complaints", methods=["GET"])
 def get_complaints():
-    return jsonify(fetch_complaints())
+    return jsonify(read_snapshot("complaints"))
 
 @app.route("/api/air", methods=["GET"])
 def get_air_quality():
-    lat = request.args.get("lat", 28.6139)
-    lon = request.args.get("lon", 77.2090)
-    return jsonify(fetch_air(lat, lon))
+    lat = request.args.get("lat", type=float)
+    lon = request.args.get("lon", type=float)
+    if lat is None or lon is None:
+        return jsonify(read_snapshot("air"))
+    refresh_zones_if_changed()
+    result = dict(lookup_air(lat, lon))
+    zone_ids, distances = zone_metrics.spatial.nearest(lat, lon)
+    if zone_ids[0] >= 0:
+        result["zone"] = zone_ref(int(zone_ids[0]), distances[0])
+    return jsonify(result)
 
 # ----------------- Zones endpoint -----------------
 @app.route("/api/zones", methods=["GET"])
 def get_all_zones():
-    zones_from_db = Zone.query.all()
-    zone_data = []
-    for zone in zones_from_db:
-        air_data = fetch_air(lat=zone.latitude, lon=zone.longitude)
-        # Simulated metrics
-        simulated_water_usage = random.randint(60, 120)
-        simulated_complaints = random.randint(1, 5)
-        if zone.priority == "high":
-            simulated_complaints = random.randint(10, 25)
-
-        recommendations = []
-        aqi_val = air_data.get("aqi") if isinstance(air_data, dict) else None
-        if aqi_val and isinstance(aqi_val, int) and aqi_val >= 4:
-            recommendations.append("Deploy air purifiers and monitor emissions.")
-        if simulated_complaints > 15:
-            recommendations.append("Prioritize complaint resolution teams in this area.")
-        if simulated_water_usage > 100:
-            recommendations.append("Check for water leakages and promote conservation.")
-        if not recommendations:
-            recommendations.append("All systems operating within normal parameters.")
-
-        zone_info = {
-            "id": zone.id,
-            "name": zone.name,
-            "priority": zone.priority,
-            "position": {"top": zone.position_top, "left": zone.position_left},
-            "aqi": aqi_val if aqi_val is not None else 0,
-            "complaints": simulated_complaints,
-            "waterUsage": simulated_water_usage,
-            "recommendations": recommendations,
-        }
-        zone_data.append(zone_info)
-
-    return jsonify(zone_data)
+    """Per-zone AQI, last-hour complaints, water usage % and recommendations, from the ingest-time aggregates."""
+    if not zone_metrics.zones or _zones_changed.is_set():
+        load_zones()
+    return jsonify(zone_metrics.payload())
+
+@app.route("/api/zones/nearby", methods=["GET"])
+def get_nearby_zones():
+    """Zones within ?radius_km= of ?lat=&lon=, nearest first; just the nearest zone without a radius."""
+    lat = request.args.get("lat", type=float)
+    lon = request.args.get("lon", type=float)
+    radius_km = request.args.get("radius_km", type=float)
+    if lat is None or lon is None:
+        return jsonify({"error": "lat and lon are required"}), 400
+    if "radius_km" in request.args and (radius_km is None or not radius_km > 0):
+        return jsonify({"error": "radius_km must be a positive number"}), 400
+    refresh_zones_if_changed()
+    if radius_km is None:
+        zone_ids, distances = zone_metrics.spatial.nearest(lat, lon)
+        zone_ids, distances = zone_ids[zone_ids >= 0], distances[zone_ids >= 0]
+    else:
+        zone_ids, distances = zone_metrics.spatial.within(lat, lon, radius_km)
+    return jsonify([zone_ref(int(z), d) for z, d in zip(zone_ids, distances)])
+
+@app.route("/api/zones/forecast", methods=["GET"])
+def get_zone_forecasts():
+    """Per-zone forecasts of the zoned metrics (?metric= keeps one), rebuilt by the leader every ZONE_FORECAST_MINUTES."""
+    metric = request.args.get("metric")
+    if metric is not None and metric not in ZONE_FORECAST_METRICS:
+        return jsonify({"error": f"Unknown metric '{metric}'", "metrics": list(ZONE_FORECAST_METRICS)}), 400
+    if zone_forecasts["series"] is None:
+        warming = {"status": "warming", "message": "Zone forecasts are being built, retry shortly"}
+        return jsonify(warming), 503, {"Retry-After": "30"}
+    refresh_zones_if_changed()
+    items = []
+    for series_id, result in sorted(zone_forecasts["series"].items()):
+        zone_id, series_metric = series_id.split(":")
+        if metric is not None and series_metric != metric:
+            continue
+        zone_id = int(zone_id)
+        zone = zone_ref(zone_id) if zone_id in zone_metrics.index else {"id": zone_id}
+        items.append({"zone": zone, "metric": series_metric, **result})
+    return jsonify({
+        "built_at": zone_forecasts["built_at"].isoformat(),
+        "method": zone_forecasts["method"],
+        "series": items,
+        "insufficient_history": [s for s in zone_forecasts["skipped"] if metric is None or s.endswith(f":{metric}")],
+    })
 
 # ----------------- Sentiment Endpoints (summary, trend, wordcloud, topics, complaints) -----------------
 
@@ -423,20 +946,11 @@ def sentiment_summary():
     days_to_filter = request.args.get('days', 30, type=int)
     start_date = datetime.now() - timedelta(days=days_to_filter)
 
-    df = load_data()
-    if df.empty:
+    counts = sentiment_rollup.sentiment_counts(start_date)
+    total = sum(counts.values())
+    if total == 0:
         return jsonify({"positive": 0, "neutral": 0, "negative": 0, "total": 0})
 
-    # filter by timestamp
-    try:
-        df = df[df["timestamp"] >= start_date]
-    except Exception:
-        df["timestamp"] = pd.to_datetime(df["timestamp"])
-        df = df[df["timestamp"] >= start_date]
-
-    total = len(df)
-    counts = df["sentiment"].value_counts().to_dict()
-
     positive_p = round((counts.get("positive", 0) / total) * 100) if total > 0 else 0
     neutral_p = round((counts.get("neutral", 0) / total) * 100) if total > 0 else 0
     negative_p = round((counts.get("negative", 0) / total) * 100) if total > 0 else 0
@@ -454,26 +968,13 @@ def sentiment_trend():
     days_to_filter = request.args.get('days', 30, type=int)
     start_date = datetime.now() - timedelta(days=days_to_filter)
 
-    df = load_data()
-    if df.empty:
-        return jsonify({"days": [], "positive": [], "negative": [], "neutral": []})
-
-    df["timestamp"] = pd.to_datetime(df["timestamp"])
-    df = df[df["timestamp"] >= start_date]
-    df["date"] = df["timestamp"].dt.date
-
-    trend_data = df.groupby(["date", "sentiment"]).size().unstack(fill_value=0).sort_index()
-
-    # Ensure columns exist
-    for col in ['positive', 'negative', 'neutral']:
-        if col not in trend_data:
-            trend_data[col] = 0
+    trend_data = sentiment_rollup.trend(start_date)
 
     return jsonify({
-        "days": trend_data.index.astype(str).tolist(),
-        "positive": trend_data["positive"].tolist(),
-        "negative": trend_data["negative"].tolist(),
-        "neutral": trend_data["neutral"].tolist(),
+        "days": [str(day) for day, _ in trend_data],
+        "positive": [counts["positive"] for _, counts in trend_data],
+        "negative": [counts["negative"] for _, counts in trend_data],
+        "neutral": [counts["neutral"] for _, counts in trend_data],
     })
 
 @app.route("/api/sentiment/wordcloud", methods=["GET"])
@@ -485,15 +986,7 @@ def sentiment_wordcloud():
     days_to_filter = request.args.get('days', 30, type=int)
     start_date = datetime.now() - timedelta(days=days_to_filter)
 
-    df = load_data()
-    if df.empty:
-        return jsonify({"words": []})
-
-    df["timestamp"] = pd.to_datetime(df["timestamp"])
-    df = df[df["timestamp"] >= start_date]
-    words = " ".join(df["clean_text"].astype(str)).split()
-    counter = Counter(words)
-    top_words = [{"text": w, "value": c} for w, c in counter.most_common(20)]
+    top_words = [{"text": w, "value": c} for w, c in sentiment_rollup.top_words(start_date, 20)]
     return jsonify({"words": top_words})
 
 @app.route("/api/sentiment/topics", methods=["GET"])
@@ -505,36 +998,11 @@ def sentiment_topics():
     days_to_filter = request.args.get('days', 30, type=int)
     start_date = datetime.now() - timedelta(days=days_to_filter)
 
-    df = load_data()
-    if df.empty:
-        return jsonify([])
-
-    df["timestamp"] = pd.to_datetime(df["timestamp"])
-    df = df[df["timestamp"] >= start_date]
-
-    topic_keywords = {
-        "Traffic & Roads": ["traffic", "roads", "congestion", "commuting", "parking", "pothole", "potholes"],
-        "Public Services": ["waste", "garbage", "service", "lights", "street lights"],
-        "Environment": ["clean", "green", "pollution", "air", "aqi"],
-        "Public Transport": ["transport", "bus", "metro", "train"],
-        "Water & Sanitation": ["water", "leakage", "sewer"],
-    }
-
-    def assign_topic(text):
-        text = str(text).lower()
-        for topic, keywords in topic_keywords.items():
-            if any(keyword in text for keyword in keywords):
-                return topic
-        return "General"
+    topic_counts = sentiment_rollup.topics(start_date)
+    total_feedback = sum(count for _, count, _ in topic_counts)
 
-    df["topic"] = df["text"].apply(assign_topic)
     topic_summary = []
-    topic_counts = df["topic"].value_counts()
-    total_feedback = len(df)
-
-    for topic, count in topic_counts.items():
-        topic_df = df[df["topic"] == topic]
-        dominant_sentiment = topic_df["sentiment"].mode()[0] if not topic_df["sentiment"].mode().empty else "neutral"
+    for topic, count, dominant_sentiment in topic_counts:
         percentage = round((count / total_feedback) * 100) if total_feedback > 0 else 0
         topic_summary.append({
             "name": topic,
@@ -553,12 +1021,7 @@ def sentiment_sample_complaints():
     days_to_filter = request.args.get('days', 30, type=int)
     start_date = datetime.now() - timedelta(days=days_to_filter)
 
-    df = load_data()
-    if df.empty:
-        return jsonify([])
-
-    df["timestamp"] = pd.to_datetime(df["timestamp"])
-    df = df[df["timestamp"] >= start_date]
+    df = feedback_store.window(start_date, columns=["text", "clean_text", "sentiment"])
 
     # sample safely (if <5 rows, sample without replacement will error)
     sample_n = min(5, max(0, len(df)))
@@ -580,26 +1043,128 @@ def sentiment_sample_complaints():
     return jsonify(complaints_list)
 
 
+# ----------------- Alerts listing: keyset pages + ETag -----------------
+ALERTS_PAGE_SIZE = 50
+ALERTS_MAX_PAGE_SIZE = 500
+# Listing version: newest alert id + latest updated_at, kept in memory so unchanged polls get a 304
+# without a query. Both come from the rows, so every worker derives the same ETag for the same data.
+# Changes made in another process reach this one with the next alert sync: until then (at most
+# ALERT_SYNC_SECONDS) polls here can still get a 304 for the old list.
+_alerts_version = {"max_id": None, "updated_at": None}
+_alerts_version_lock = threading.Lock()
+_alerts_published = {}  # alert id -> updated_at of a change this process already published
+
+def alerts_changed(alert=None):
+    """Advance the /api/alerts version past `alert` (just inserted or updated); None = re-read from the DB."""
+    with _alerts_version_lock:
+        if alert is not None:
+            _alerts_published[alert.id] = alert.updated_at
+        if alert is None or _alerts_version["max_id"] is None:
+            _alerts_version.update(max_id=None, updated_at=None)
+            return
+        _alerts_version["max_id"] = max(_alerts_version["max_id"], alert.id)
+        if alert.updated_at and (_alerts_version["updated_at"] is None or alert.updated_at > _alerts_version["updated_at"]):
+            _alerts_version["updated_at"] = alert.updated_at
+
+def alerts_fingerprint():
+    max_id, updated_at = db.session.query(db.func.max(Alert.id), db.func.max(Alert.updated_at)).one()
+    return max_id or 0, updated_at
+
+def alerts_etag():
+    if _alerts_version["max_id"] is None:  # once per process, and after a follower sync saw changes
+        max_id, updated_at = alerts_fingerprint()
+        with _alerts_version_lock:
+            if _alerts_version["max_id"] is None:
+                _alerts_version.update(max_id=max_id, updated_at=updated_at)
+    updated_at = _alerts_version["updated_at"]
+    return f'W/"alerts-{_alerts_version["max_id"]}-{updated_at.timestamp() if updated_at else 0}"'
+
+_alerts_synced = {"max_id": None, "updated_at": None}
+
+def _published_here(alert):
+    with _alerts_version_lock:
+        return _alerts_published.pop(alert.id, None) == alert.updated_at
+
+def sync_alerts():
+    """
+    Publish alert inserts/updates made by other processes, refresh the ETag and let the
+    rule engine reload its active titles if another process changed any. Needs an app context.
+    """
+    max_id, updated_at = alerts_fingerprint()
+    seen_id, seen_updated = _alerts_synced["max_id"], _alerts_synced["updated_at"]
+    _alerts_synced.update(max_id=max_id, updated_at=updated_at)
+    if seen_id is None or (max_id, updated_at) == (seen_id, seen_updated):
+        return
+    external = False
+    for alert in Alert.query.filter(Alert.id > seen_id).order_by(Alert.id):
+        if not _published_here(alert):
+            external = True
+            event_hub.publish("alert.created", serialize_alert(alert))
+    if seen_updated is not None:
+        for alert in Alert.query.filter(Alert.id <= seen_id, Alert.updated_at > seen_updated):
+            if not _published_here(alert):
+                external = True
+                event_hub.publish("alert.resolved" if alert.status == "resolved" else "alert.updated",
+                                  serialize_alert(alert))
+    if external:
+        alert_engine.invalidate()
+    alerts_changed()
+
+def encode_alert_cursor(alert):
+    return base64.urlsafe_b64encode(f"{alert.timestamp.isoformat()}|{alert.id}".encode()).decode()
+
+def decode_alert_cursor(cursor):
+    timestamp, alert_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+    return datetime.fromisoformat(timestamp), int(alert_id)
+
 @app.route("/api/alerts", methods=["GET"])
 def get_alerts():
-    """Fetches all alerts from the database, newest first."""
-    alerts_from_db = Alert.query.order_by(Alert.timestamp.desc()).all()
-    
-    alerts_list = []
-    for alert in alerts_from_db:
-        alerts_list.append({
-            "id": alert.id,
-            "title": alert.title,
-            "description": alert.description,
-            "severity": alert.severity,
-            "timestamp": alert.timestamp.strftime("%Y-%m-%d %H:%M:%S"), # Format for consistency
-            "location": alert.location,
-            "status": alert.status,
-            "assignedTo": alert.assigned_to,
-            "estimatedResolution": alert.estimated_resolution
-        })
-        
-    return jsonify(alerts_list)
+    """
+    Alerts newest first, one keyset page at a time (ordered by timestamp, id).
+    Query params: limit (default 50), cursor (from the X-Next-Cursor header of the
+    previous page), status / severity (comma-separated), since (ISO timestamp).
+    The body stays a plain list; an ETag lets unchanged polls come back as 304.
+    """
+    etag = alerts_etag()
+    if etag in request.headers.get("If-None-Match", ""):
+        return "", 304, {"ETag": etag}
+
+    query = Alert.query
+    try:
+        limit = min(max(int(request.args.get("limit", ALERTS_PAGE_SIZE)), 1), ALERTS_MAX_PAGE_SIZE)
+        if request.args.get("since"):
+            query = query.filter(Alert.timestamp >= datetime.fromisoformat(request.args["since"]))
+        if request.args.get("cursor"):
+            ts, alert_id = decode_alert_cursor(request.args["cursor"])
+            query = query.filter(db.or_(Alert.timestamp < ts, db.and_(Alert.timestamp == ts, Alert.id < alert_id)))
+    except ValueError:
+        return jsonify({"error": "Invalid limit, since or cursor"}), 400
+    for field in ("status", "severity"):
+        if request.args.get(field):
+            query = query.filter(getattr(Alert, field).in_(request.args[field].split(",")))
+
+    page = query.order_by(Alert.timestamp.desc(), Alert.id.desc()).limit(limit + 1).all()
+    response = jsonify([serialize_alert(alert) for alert in page[:limit]])
+    response.headers["ETag"] = etag
+    if len(page) > limit:
+        cursor = encode_alert_cursor(page[limit - 1])
+        args = dict(request.args, cursor=cursor)
+        response.headers["X-Next-Cursor"] = cursor
+        response.headers["Link"] = f'<{request.path}?{urlencode(args)}>; rel="next"'
+    return response
+
+def serialize_alert(alert):
+    return {
+        "id": alert.id,
+        "title": alert.title,
+        "description": alert.description,
+        "severity": alert.severity,
+        "timestamp": alert.timestamp.strftime("%Y-%m-%d %H:%M:%S"), # Format for consistency
+        "location": alert.location,
+        "status": alert.status,
+        "assignedTo": alert.assigned_to,
+        "estimatedResolution": alert.estimated_resolution
+    }
 
 # In app.py, add this new endpoint
 
@@ -611,18 +1176,47 @@ def resolve_alert(alert_id):
         if alert is None:
             return jsonify({"error": "Alert not found"}), 404
 
+        was_active = alert.status == "active"
         alert.status = "resolved"
         alert.severity = "resolved" # Also update severity for consistent styling
         db.session.commit()
+        if was_active:
+            alert_engine.resolved(alert.title)
+        alerts_changed(alert)
         
         # Return the updated alert
-        updated_alert = {
-            "id": alert.id, "title": alert.title, "description": alert.description,
-            "severity": alert.severity, "timestamp": alert.timestamp.strftime("%Y-%m-%d %H:%M:%S"),
-            "location": alert.location, "status": alert.status, "assignedTo": alert.assigned_to,
-            "estimatedResolution": "Completed" # Update resolution text
-        }
+        updated_alert = dict(serialize_alert(alert), estimatedResolution="Completed") # Update resolution text
+        event_hub.publish("alert.resolved", updated_alert)
         return jsonify(updated_alert)
+
+# ----------------- Live updates -----------------
+def _last_event_id():
+    return request.headers.get("Last-Event-ID") or request.args.get("last_event_id") or None
+
+@app.route("/api/stream")
+def event_stream():
+    """
+    Server-Sent Events: `alert.created`, `alert.resolved` and `metric` deltas as they happen.
+    Reconnects resume after the Last-Event-ID header; an id from another worker, an
+    older process or beyond the buffer gets a `reset` event, after which the client should reload /api/alerts once.
+    """
+    stream = event_hub.stream(_last_event_id(), heartbeat=SSE_HEARTBEAT_SECONDS)
+    return Response(stream, mimetype="text/event-stream",
+                    headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+@app.route("/api/events")
+def poll_events():
+    """Long-poll fallback: events after ?last_event_id=, waiting up to ?timeout= seconds for one."""
+    last_id = _last_event_id()
+    if last_id is None:  # first call: just hand out the current cursor
+        return jsonify({"events": [], "last_event_id": event_hub.last_id, "reset": False})
+    timeout = min(request.args.get("timeout", 25, type=float), LONG_POLL_MAX_SECONDS)
+    events, reset = event_hub.wait(last_id, timeout)
+    return jsonify({
+        "events": [{"id": event_id, "event": event, "data": data} for event_id, event, data, _ in events],
+        "last_event_id": events[-1][0] if events else (event_hub.last_id if reset else last_id),
+        "reset": reset,
+    })
     
 @app.route("/", defaults={"path": ""})
 @app.route("/<path:path>")
@@ -636,11 +1230,23 @@ def serve_react(path):
         return send_from_directory(REACT_BUILD_DIR, "index.html")
 
 # ----------------- App start -----------------
+def create_app(scheduler_mode=None):
+    """
+    Entry point for every serving mode (dev server, gunicorn workers, the scheduler
+    process): schema upgrade and seeding, serialized across processes, then this
+    process's scheduler role. Returns the Flask app.
+    """
+    with FileLock(SCHEDULER_LOCK_FILE + ".init"):
+        with app.app_context():
+            db.create_all()
+            migrations.upgrade(db)
+            seed_zones()
+            seed_alerts()
+    start_scheduler(scheduler_mode)
+    return app
+
 if __name__ == "__main__":
-    with app.app_context():
-        db.create_all()
-        seed_zones()
-        seed_alerts()
-        start_scheduler()
-    app.run(debug=True)
+    create_app()
+    # No reloader: its parent process would start a second scheduler
+    app.run(debug=os.getenv("FLASK_DEBUG") == "1", use_reloader=False, threaded=True)
 
@@ -0,0 +1,243 @@
+# services/metrics.py
+import asyncio
+import bisect
+import functools
+import math
+import threading
+import time
+import traceback
+from contextlib import contextmanager
+
+# Latency buckets (seconds): sub-ms cache hits up to minute-long model fits
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names, values, extra=""):
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value):
+    if value is None or (isinstance(value, float) and math.isnan(value)):
+        return "NaN"
+    if value == math.inf:
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    type = "counter"
+
+    def __init__(self, name, help, labelnames=()):
+        self.name, self.help, self.labelnames = name, help, tuple(labelnames)
+        self._values = {}  # label values -> total
+        self._lock = threading.Lock()
+
+    def inc(self, *labels, amount=1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def samples(self):
+        with self._lock:
+            items = list(self._values.items())
+        for labels, value in items:
+            yield f"{self.name}{_labels(self.labelnames, labels)} {_number(value)}"
+
+
+class Histogram:
+    type = "histogram"
+
+    def __init__(self, name, help, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.name, self.help, self.labelnames = name, help, tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._values = {}  # label values -> [per-bucket counts (last = above every bound), sum]
+        self._lock = threading.Lock()
+
+    def observe(self, value, *labels):
+        i = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(labels)
+            if entry is None:
+                entry = self._values[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+            entry[0][i] += 1
+            entry[1] += value
+
+    @contextmanager
+    def time(self, *labels):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, *labels)
+
+    def samples(self):
+        with self._lock:
+            items = [(labels, list(counts), total) for labels, (counts, total) in self._values.items()]
+        for labels, counts, total in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), counts):
+                cumulative += count
+                le = 'le="' + _number(bound) + '"'
+                yield f"{self.name}_bucket{_labels(self.labelnames, labels, le)} {cumulative}"
+            yield f"{self.name}_sum{_labels(self.labelnames, labels)} {_number(total)}"
+            yield f"{self.name}_count{_labels(self.labelnames, labels)} {cumulative}"
+
+
+class Registry:
+    """
+    Process-local metrics, rendered in the Prometheus text format by `render()`.
+
+    Counters and histograms are updated where things happen; `collector(fn)`
+    adds values read from existing stats dicts at scrape time instead, as
+    (name, type, help, [(labels dict, value), ...]) tuples; a collector that
+    raises is logged, left out of that scrape and counted in
+    metrics_collector_errors_total. Instrumented code
+    checks `enabled` first, so with metrics off the hot paths only pay for
+    one attribute read. Each process (gunicorn worker, scheduler) has its own.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self._metrics = []
+        self._collectors = []
+        self.collector_errors = self.counter("metrics_collector_errors_total", "Collectors that raised during a scrape",
+                                             ("collector",))
+
+    def counter(self, name, help, labelnames=()):
+        return self._add(Counter(name, help, labelnames))
+
+    def histogram(self, name, help, labelnames=(), buckets=DEFAULT_BUCKETS):
+        return self._add(Histogram(name, help, labelnames, buckets))
+
+    def collector(self, fn):
+        self._collectors.append(fn)
+        return fn
+
+    def _add(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def render(self):
+        collected = []
+        for collect in self._collectors:  # first, so this scrape already counts its failures
+            name = getattr(collect, "__name__", repr(collect))
+            try:
+                collected.append(list(collect()))
+            except Exception:
+                print(f"Metrics collector '{name}' failed:\n{traceback.format_exc()}")
+                self.collector_errors.inc(name)
+
+        lines = []
+        for metric in self._metrics:
+            lines += [f"# HELP {metric.name} {metric.help}", f"# TYPE {metric.name} {metric.type}"]
+            lines.extend(metric.samples())
+        for families in collected:
+            for name, kind, help, samples in families:
+                lines += [f"# HELP {name} {help}", f"# TYPE {name} {kind}"]
+                for labels, value in samples:
+                    lines.append(f"{name}{_labels(labels.keys(), labels.values())} {_number(value)}")
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+FUNCTION_SECONDS = REGISTRY.histogram(
+    "function_duration_seconds", "Wall time of instrumented hot-path functions", ("function",)
+)
+
+
+def timed(name, histogram=FUNCTION_SECONDS):
+    """Decorator: observe each call's duration (sync or async) under `name` while metrics are enabled."""
+    def decorate(fn):
+        if asyncio.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def wrapper(*args, **kwargs):
+                if not REGISTRY.enabled:
+                    return await fn(*args, **kwargs)
+                started = time.perf_counter()
+                try:
+                    return await fn(*args, **kwargs)
+                finally:
+                    histogram.observe(time.perf_counter() - started, name)
+        else:
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                if not REGISTRY.enabled:
+                    return fn(*args, **kwargs)
+                started = time.perf_counter()
+                try:
+                    return fn(*args, **kwargs)
+                finally:
+                    histogram.observe(time.perf_counter() - started, name)
+        return wrapper
+    return decorate
+
+
+# ----------------- Flask / SQLAlchemy -----------------
+REQUEST_SECONDS = REGISTRY.histogram(
+    "http_request_duration_seconds", "Request latency by route", ("method", "route", "status")
+)
+REQUEST_DB_QUERIES = REGISTRY.histogram(
+    "http_request_db_queries", "DB statements executed per request", ("route",),
+    buckets=(0, 1, 2, 3, 5, 10, 20, 50, 100),
+)
+REQUEST_DB_SECONDS = REGISTRY.histogram("http_request_db_seconds", "DB time per request", ("route",))
+DB_QUERIES = REGISTRY.counter("db_queries_total", "DB statements executed", ("context",))
+DB_SECONDS = REGISTRY.counter("db_query_seconds_total", "Time spent in DB statements", ("context",))
+
+_request = threading.local()  # per-thread DB tally of the request being served
+
+
+def instrument_flask(app):
+    """Time every request and tally its DB statements, labelled by URL rule (not raw path)."""
+    from flask import request
+
+    @app.before_request
+    def _start_timer():
+        _request.started = time.perf_counter()
+        _request.queries, _request.db_seconds = 0, 0.0
+
+    @app.after_request
+    def _observe(response):
+        started = getattr(_request, "started", None)
+        if started is not None:
+            _request.started = None
+            route = request.url_rule.rule if request.url_rule else "unmatched"
+            REQUEST_SECONDS.observe(time.perf_counter() - started, request.method, route, str(response.status_code))
+            REQUEST_DB_QUERIES.observe(_request.queries, route)
+            REQUEST_DB_SECONDS.observe(_request.db_seconds, route)
+        return response
+
+
+def instrument_sqlalchemy():
+    """Count and time every statement on every engine, per request when one is being served."""
+    from sqlalchemy import event
+    from sqlalchemy.engine import Engine
+
+    @event.listens_for(Engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("metrics_started", []).append(time.perf_counter())
+
+    @event.listens_for(Engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["metrics_started"].pop()
+        if getattr(_request, "started", None) is not None:
+            _request.queries += 1
+            _request.db_seconds += elapsed
+            context_label = "request"
+        else:
+            context_label = "background"
+        DB_QUERIES.inc(context_label)
+        DB_SECONDS.inc(context_label, amount=elapsed)
+
+    @event.listens_for(Engine, "handle_error")
+    def _failed(exception_context):
+        conn = exception_context.connection
+        if conn is not None and conn.info.get("metrics_started"):
+            conn.info["metrics_started"].pop()
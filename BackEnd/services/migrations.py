@@ -0,0 +1,80 @@
+# services/migrations.py
+"""
+Idempotent schema upgrades for databases created before a model change.
+
+db.create_all() only creates missing tables; it never touches a table that
+already exists. upgrade() fills that gap and is safe to run on every start-up.
+"""
+from sqlalchemy import inspect, text
+
+
+def ensure_columns(engine, metadata):
+    """ALTER TABLE ... ADD COLUMN for every nullable model column the database lacks."""
+    inspector = inspect(engine)
+    quote = engine.dialect.identifier_preparer.quote
+    added = []
+    for table in metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            continue
+        existing = {col["name"] for col in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name in existing:
+                continue
+            if not column.nullable:
+                raise RuntimeError(f"Cannot add NOT NULL column {table.name}.{column.name} without a default")
+            ddl = f"ALTER TABLE {quote(table.name)} ADD COLUMN {quote(column.name)} {column.type.compile(dialect=engine.dialect)}"
+            with engine.begin() as conn:
+                conn.execute(text(ddl))
+            added.append(f"{table.name}.{column.name}")
+    return added
+
+
+def ensure_indexes(engine, metadata):
+    """Create every index declared on the models that the database does not have yet."""
+    inspector = inspect(engine)
+    created = []
+    for table in metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            continue
+        existing = {ix["name"] for ix in inspector.get_indexes(table.name)}
+        for index in table.indexes:
+            if index.name not in existing:
+                index.create(bind=engine)
+                created.append(index.name)
+    return created
+
+
+# table -> indexes replaced by a model change; ensure_indexes only ever adds
+SUPERSEDED_INDEXES = {
+    "alert": ["ix_alert_timestamp"],  # replaced by ix_alert_timestamp_id (keyset pagination)
+}
+
+
+def drop_superseded_indexes(engine):
+    """Drop indexes that an older schema created and the models no longer declare."""
+    inspector = inspect(engine)
+    quote = engine.dialect.identifier_preparer.quote
+    dropped = []
+    for table, names in SUPERSEDED_INDEXES.items():
+        if not inspector.has_table(table):
+            continue
+        existing = {ix["name"] for ix in inspector.get_indexes(table)}
+        for name in names:
+            if name in existing:
+                with engine.begin() as conn:
+                    conn.execute(text(f"DROP INDEX IF EXISTS {quote(name)}"))
+                dropped.append(name)
+    return dropped
+
+
+def upgrade(db):
+    """Bring an existing database up to the current models. Call inside an app context."""
+    added = ensure_columns(db.engine, db.metadata)
+    if added:
+        print(f"Added {len(added)} missing columns: {', '.join(added)}")
+    created = ensure_indexes(db.engine, db.metadata)
+    if created:
+        print(f"Created {len(created)} missing indexes: {', '.join(created)}")
+    dropped = drop_superseded_indexes(db.engine)
+    if dropped:
+        print(f"Dropped {len(dropped)} superseded indexes: {', '.join(dropped)}")
@@ -6,40 +6,80 @@ db = SQLAlchemy()
 # 🚗 Traffic
 class TrafficData(db.Model):
     id = db.Column(db.Integer, primary_key=True)
-    timestamp = db.Column(db.DateTime, default=datetime.utcnow)
-    data = db.Column(db.JSON)  # store full API JSON
+    timestamp = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+    current_travel_time = db.Column(db.Float)    # seconds, flowSegmentData.currentTravelTime
+    free_flow_travel_time = db.Column(db.Float)  # seconds, flowSegmentData.freeFlowTravelTime
+    data = db.Column(db.JSON(none_as_null=True))  # full API JSON (NULL when archived to RawPayload)
 
 
 # ⚡ Electricity
 class ElectricityData(db.Model):
     id = db.Column(db.Integer, primary_key=True)
-    timestamp = db.Column(db.DateTime, default=datetime.utcnow)
-    data = db.Column(db.JSON)  # store full API JSON
+    timestamp = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+    power_consumption_total = db.Column(db.Float)  # MW, powerConsumptionTotal
+    data = db.Column(db.JSON(none_as_null=True))  # full API JSON (NULL when archived to RawPayload)
+
+
+# 🗄️ Raw upstream JSON, zlib-compressed, kept out of the hot metric tables
+class RawPayload(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    source = db.Column(db.String(50), nullable=False, index=True)  # "traffic", "electricity"
+    timestamp = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+    payload = db.Column(db.LargeBinary)
 
 
 # 🌊 Water (simulated)
 class WaterData(db.Model):
     id = db.Column(db.Integer, primary_key=True)
-    timestamp = db.Column(db.DateTime, default=datetime.utcnow)
+    timestamp = db.Column(db.DateTime, default=datetime.utcnow, index=True)
     usage = db.Column(db.Float)       # e.g. 2.5 ML
     condition = db.Column(db.String(50))  # e.g. "High ⚠️", "Normal", "Low 💧"
+    zone_id = db.Column(db.Integer)   # nearest Zone to the reporting meter
 
 
 # 📢 Complaints (simulated)
 class ComplaintData(db.Model):   
     id = db.Column(db.Integer, primary_key=True)
-    timestamp = db.Column(db.DateTime, default=datetime.utcnow)
+    timestamp = db.Column(db.DateTime, default=datetime.utcnow, index=True)
     category = db.Column(db.String(100))
     description = db.Column(db.String(255))
     status = db.Column(db.String(50))   # e.g. "Open", "In Progress", "Resolved"
+    latitude = db.Column(db.Float)
+    longitude = db.Column(db.Float)
+    zone_id = db.Column(db.Integer)     # nearest Zone to (latitude, longitude)
 
 
 # 🌬️ Air Quality
 class AirQualityData(db.Model):
     id = db.Column(db.Integer, primary_key=True)
-    timestamp = db.Column(db.DateTime, default=datetime.utcnow)
+    timestamp = db.Column(db.DateTime, default=datetime.utcnow, index=True)
     aqi = db.Column(db.Integer)  # 1–5 scale
     description = db.Column(db.String(50))  # "Good 🌿", "Poor 😷", etc.
+    zone_id = db.Column(db.Integer)  # nearest Zone to the sampled coordinates
+    source = db.Column(db.String(10))  # "zone" for the per-zone sweep, NULL for the city-centre reading
+
+# 📉 Downsampled metric history (hourly / daily tiers, written by retention.compact)
+class MetricRollup(db.Model):
+    __table_args__ = (
+        db.Index("ix_metric_rollup_lookup", "metric", "tier", "bucket_start"),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    metric = db.Column(db.String(50), nullable=False)   # "water", "traffic", ...
+    zone_id = db.Column(db.Integer)                      # None for city-wide metrics
+    tier = db.Column(db.String(10), nullable=False)      # "hour" or "day"
+    bucket_start = db.Column(db.DateTime, nullable=False)
+    min = db.Column(db.Float)
+    max = db.Column(db.Float)
+    mean = db.Column(db.Float)
+    count = db.Column(db.Integer, nullable=False)        # raw samples in the bucket
+
+# 🔮 Latest per-zone forecasts (one row, replaced by the scheduler leader on each rebuild)
+class ZoneForecast(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    built_at = db.Column(db.DateTime, nullable=False, index=True)
+    method = db.Column(db.String(20))
+    payload = db.Column(db.JSON)  # {"series": {"zone:metric": result}, "skipped": ["zone:metric", ...]}
 
 # In src/model/models.py
 
@@ -58,6 +98,11 @@ class Zone(db.Model):
         return f'<Zone {self.name}>'
     
 class Alert(db.Model):
+    __table_args__ = (
+        db.Index("ix_alert_title_status", "title", "status"),  # active-title load in AlertEngine
+        db.Index("ix_alert_timestamp_id", "timestamp", "id"),  # keyset pagination of /api/alerts
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(200), nullable=False)
     description = db.Column(db.String(500))
@@ -67,6 +112,7 @@ class Alert(db.Model):
     status = db.Column(db.String(50)) # e.g., 'active', 'investigating', 'resolved'
     assigned_to = db.Column(db.String(100))
     estimated_resolution = db.Column(db.String(100))
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, index=True)
 
     def __repr__(self):
         return f'<Alert {self.title}>'
\ No newline at end of file
@@ -0,0 +1,92 @@
+# services/payloads.py
+"""
+Typed fields extracted from upstream JSON documents.
+
+TrafficData and ElectricityData keep the few values anything reads
+(travel times, total consumption) as Float columns, filled at ingest from the
+provider payload. The full document is either kept inline in `data` or, with
+archiving on, zlib-compressed into RawPayload so the metric tables stay narrow.
+"""
+import json
+import zlib
+
+from model.models import TrafficData, ElectricityData, RawPayload
+
+
+def _number(value):
+    try:
+        return float(value) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+def traffic_fields(data):
+    fdata = (data or {}).get("flowSegmentData", {})
+    return {
+        "current_travel_time": _number(fdata.get("currentTravelTime")),
+        "free_flow_travel_time": _number(fdata.get("freeFlowTravelTime")),
+    }
+
+
+def electricity_fields(data):
+    return {"power_consumption_total": _number((data or {}).get("powerConsumptionTotal"))}
+
+
+# model -> (archive source name, extractor)
+PAYLOAD_MODELS = {
+    TrafficData: ("traffic", traffic_fields),
+    ElectricityData: ("electricity", electricity_fields),
+}
+
+
+def compress_payload(data):
+    return zlib.compress(json.dumps(data, separators=(",", ":")).encode("utf-8"))
+
+
+def decompress_payload(blob):
+    return json.loads(zlib.decompress(blob).decode("utf-8"))
+
+
+def payload_rows(model, data, timestamp, archive=False):
+    """
+    Return [(model, columns), ...] to write for one provider payload: the metric
+    row with its typed fields, plus a RawPayload row when archiving.
+    """
+    source, extract = PAYLOAD_MODELS[model]
+    row = dict(extract(data), timestamp=timestamp)
+    if not archive:
+        return [(model, dict(row, data=data))]
+    return [(model, row), (RawPayload, {"source": source, "timestamp": timestamp, "payload": compress_payload(data)})]
+
+
+def backfill_payload_fields(db, batch_size=1000, archive=False):
+    """
+    Fill the typed columns of rows written before they existed, in id order and
+    `batch_size` rows per commit. With `archive`, the inline JSON of each
+    backfilled row is also moved to RawPayload. Safe to re-run; returns rows updated.
+    """
+    updated = 0
+    for model, (source, extract) in PAYLOAD_MODELS.items():
+        typed = [getattr(model, name) for name in extract(None)]
+        last_id = 0
+        while True:
+            rows = (db.session.query(model.id, model.timestamp, model.data)
+                    .filter(model.id > last_id, model.data.isnot(None), *[c.is_(None) for c in typed])
+                    .order_by(model.id).limit(batch_size).all())
+            if not rows:
+                break
+            mappings = []
+            archived = []
+            for row_id, timestamp, data in rows:
+                values = dict(extract(data), id=row_id)
+                if archive:
+                    values["data"] = None
+                    archived.append({"source": source, "timestamp": timestamp, "payload": compress_payload(data)})
+                mappings.append(values)
+            db.session.bulk_update_mappings(model, mappings)
+            if archived:
+                db.session.bulk_insert_mappings(RawPayload, archived)
+            db.session.commit()
+            updated += len(rows)
+            last_id = rows[-1][0]
+    return updated
@@ -1,25 +1,140 @@
 # backend/preprocess.py
+import argparse
+import json
+import os
 import re
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
 import pandas as pd
-from nltk.corpus import stopwords
-import nltk
 
-nltk.download("stopwords")
-stop_words = set(stopwords.words("english"))
+import stopwords
+
+# URLs first, then anything that is not a letter or whitespace, in one pass
+STRIP_RE = re.compile(r"http\S+|[^a-zA-Z\s]")
+
+
+def clean_text(text, stop_words=None):
+    stop_words = stopwords.get() if stop_words is None else stop_words
+    tokens = STRIP_RE.sub("", text).lower().split()
+    return " ".join([w for w in tokens if w not in stop_words])
+
+
+def clean_series(texts):
+    """clean_text over a Series (missing text becomes "")."""
+    stop_words = stopwords.get()
+    return pd.Series([clean_text(t, stop_words) for t in texts.fillna("").astype(str)], index=texts.index, dtype=object)
 
-def clean_text(text):
-    text = re.sub(r"http\S+", "", text)       # remove URLs
-    text = re.sub(r"[^a-zA-Z\s]", "", text)   # keep letters only
-    text = text.lower()
-    tokens = [w for w in text.split() if w not in stop_words]
-    return " ".join(tokens)
 
 def preprocess(df):
-    df["clean_text"] = df["text"].apply(clean_text)
+    df["clean_text"] = clean_series(df["text"])
     return df
 
+
+# ----------------- Streaming mode -----------------
+def _source_signature(path):
+    st = os.stat(path)
+    return [st.st_size, st.st_mtime_ns]
+
+
+def _load_checkpoint(path, src):
+    try:
+        with open(path) as f:
+            checkpoint = json.load(f)
+    except (FileNotFoundError, ValueError):
+        return None
+    return checkpoint if checkpoint.get("source") == _source_signature(src) else None
+
+
+def _save_checkpoint(path, checkpoint):
+    with open(path + ".tmp", "w") as f:
+        json.dump(checkpoint, f)
+    os.replace(path + ".tmp", path)
+
+
+def _clean_chunk(chunk):
+    return preprocess(chunk).to_csv(index=False, header=False, lineterminator="\n")
+
+
+def _chunks(src, chunksize, skip):
+    """read_csv chunks, minus the first `skip` records (counted in records, so quoted newlines are safe)."""
+    reader = pd.read_csv(src, chunksize=chunksize, dtype=str, keep_default_na=False)
+    for chunk in reader:
+        if skip >= len(chunk):
+            skip -= len(chunk)
+            continue
+        yield chunk.iloc[skip:].copy() if skip else chunk
+        skip = 0
+
+
+def preprocess_file(src, dst, chunksize=100_000, workers=0, checkpoint=None, resume=True):
+    """
+    Clean `src` into `dst` chunk by chunk; peak memory is bounded by
+    chunksize x (chunks in flight). Columns pass through as read (strings).
+
+    After each chunk is appended and fsynced, `checkpoint` (default
+    `dst + ".checkpoint"`) records the rows and bytes written. A rerun on the
+    same, unchanged source truncates `dst` to that size and carries on from the
+    next row; the checkpoint is removed once the file is complete. With
+    `workers` > 0 chunks are cleaned in a process pool, written in input order.
+    Returns the number of rows written by this call.
+    """
+    checkpoint = checkpoint or dst + ".checkpoint"
+    state = _load_checkpoint(checkpoint, src) if resume else None
+    if state is None or not os.path.exists(dst):
+        state = {"source": _source_signature(src), "rows": 0, "bytes": 0}
+
+    columns = pd.read_csv(src, nrows=0).columns.tolist()
+    if "clean_text" not in columns:
+        columns.append("clean_text")
+    reader = _chunks(src, chunksize, state["rows"])
+    written = 0
+
+    with open(dst, "r+b" if state["bytes"] else "wb") as out:
+        out.truncate(state["bytes"])  # drop a chunk that was written after the last checkpoint
+        out.seek(state["bytes"])
+        if not state["bytes"]:
+            out.write(pd.DataFrame(columns=columns).to_csv(index=False, lineterminator="\n").encode("utf-8"))
+
+        def commit(rows, text):
+            nonlocal written
+            out.write(text.encode("utf-8"))
+            out.flush()
+            os.fsync(out.fileno())
+            state["rows"] += rows
+            state["bytes"] = out.tell()
+            _save_checkpoint(checkpoint, state)
+            written += rows
+
+        if workers:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                pending = deque()
+                for chunk in reader:
+                    pending.append((len(chunk), pool.submit(_clean_chunk, chunk)))
+                    if len(pending) > workers:  # bounded read-ahead
+                        rows, future = pending.popleft()
+                        commit(rows, future.result())
+                while pending:
+                    rows, future = pending.popleft()
+                    commit(rows, future.result())
+        else:
+            for chunk in reader:
+                commit(len(chunk), _clean_chunk(chunk))
+
+    if os.path.exists(checkpoint):
+        os.remove(checkpoint)
+    return written
+
+
 if __name__ == "__main__":
-    df = pd.read_csv("feedback.csv")
-    df = preprocess(df)
-    df.to_csv("feedback_clean.csv", index=False)
-    print("✅ feedback_clean.csv created")
+    parser = argparse.ArgumentParser(description="Add a clean_text column to a feedback CSV.")
+    parser.add_argument("src", nargs="?", default="feedback.csv")
+    parser.add_argument("dst", nargs="?", default="feedback_clean.csv")
+    parser.add_argument("--chunksize", type=int, default=100_000)
+    parser.add_argument("--workers", type=int, default=0, help="processes for cleaning (0 = in-process)")
+    parser.add_argument("--checkpoint", help="checkpoint path (default: <dst>.checkpoint)")
+    parser.add_argument("--restart", action="store_true", help="ignore any checkpoint and start from row zero")
+    args = parser.parse_args()
+
+    rows = preprocess_file(args.src, args.dst, args.chunksize, args.workers, args.checkpoint, resume=not args.restart)
+    print(f"✅ {args.dst} written ({rows} rows this run)")
@@ -0,0 +1,104 @@
+# services/response_cache.py
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+
+
+class _Entry:
+    __slots__ = ("value", "fresh_until", "stale_until")
+
+    def __init__(self, value, ttl, stale_ttl):
+        now = time.monotonic()
+        self.value = value
+        self.fresh_until = now + ttl
+        self.stale_until = now + ttl + stale_ttl
+
+
+class ResponseCache:
+    """
+    Keyed TTL cache with stale-while-revalidate and request coalescing.
+
+    - fresh entries are returned as-is;
+    - entries past their TTL but inside the stale window are returned immediately
+      while one background reload refreshes them;
+    - on a miss, concurrent callers for the same key wait on a single loader call.
+    Loader exceptions are never cached; they propagate to every waiting caller.
+    Entries are evicted least-recently-used beyond `max_entries`.
+    """
+
+    def __init__(self, max_entries=1024, refresh_workers=4):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._inflight = {}  # key -> Future of the running loader call
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=refresh_workers, thread_name_prefix="cache-refresh")
+        self.counters = {"hits": 0, "stale_hits": 0, "misses": 0, "coalesced": 0,
+                         "refreshes": 0, "evictions": 0, "errors": 0}
+
+    def get(self, key, loader, ttl, stale_ttl=None):
+        stale_ttl = ttl if stale_ttl is None else stale_ttl
+        with self._lock:
+            entry = self._entries.get(key)
+            now = time.monotonic()
+            if entry is not None and now < entry.stale_until:
+                self._entries.move_to_end(key)
+                if now < entry.fresh_until:
+                    self.counters["hits"] += 1
+                else:
+                    self.counters["stale_hits"] += 1
+                    self._start_load(key, loader, ttl, stale_ttl, background=True)
+                return entry.value
+
+            self.counters["misses"] += 1
+            future, leader = self._start_load(key, loader, ttl, stale_ttl)
+            if not leader:
+                self.counters["coalesced"] += 1
+
+        if leader:
+            self._run_load(key, loader, ttl, stale_ttl, future)
+        return future.result()
+
+    def refresh(self, key, loader, ttl, stale_ttl=None):
+        """Load unconditionally (e.g. from a scheduler job) and store the result."""
+        stale_ttl = ttl if stale_ttl is None else stale_ttl
+        with self._lock:
+            future, leader = self._start_load(key, loader, ttl, stale_ttl)
+        if leader:
+            self._run_load(key, loader, ttl, stale_ttl, future)
+        return future.result()
+
+    def stats(self):
+        with self._lock:
+            return dict(self.counters, entries=len(self._entries))
+
+    # ----------------- internals (call with self._lock held) -----------------
+    def _start_load(self, key, loader, ttl, stale_ttl, background=False):
+        """Return (future, is_leader); joins an in-flight load for `key` if there is one."""
+        future = self._inflight.get(key)
+        if future is not None:
+            return future, False
+        future = self._inflight[key] = Future()
+        if background:
+            self.counters["refreshes"] += 1
+            self._executor.submit(self._run_load, key, loader, ttl, stale_ttl, future)
+        return future, True
+
+    def _run_load(self, key, loader, ttl, stale_ttl, future):
+        try:
+            value = loader()
+        except Exception as e:
+            with self._lock:
+                self.counters["errors"] += 1
+                self._inflight.pop(key, None)
+            future.set_exception(e)
+            return
+
+        with self._lock:
+            self._entries[key] = _Entry(value, ttl, stale_ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.counters["evictions"] += 1
+            self._inflight.pop(key, None)
+        future.set_result(value)
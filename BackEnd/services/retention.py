@@ -0,0 +1,257 @@
+# services/retention.py
+import os
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import func
+
+from columnar import PartitionedArchive
+from model.models import (TrafficData, ElectricityData, WaterData, ComplaintData,
+                          AirQualityData, RawPayload, MetricRollup)
+
+# metric -> (raw model, value expression or None for count-only, zone column or None for city-wide)
+# Buckets are kept per zone where rows carry one; rows ingested before zone_id existed stay city-wide.
+METRICS = {
+    "traffic": (TrafficData, TrafficData.current_travel_time * 100.0 / func.nullif(TrafficData.free_flow_travel_time, 0), None),
+    "electricity": (ElectricityData, ElectricityData.power_consumption_total, None),
+    "air": (AirQualityData, AirQualityData.aqi, AirQualityData.zone_id),
+    "water": (WaterData, WaterData.usage, WaterData.zone_id),
+    "complaints": (ComplaintData, None, ComplaintData.zone_id),
+}
+
+TIERS = ["raw", "hour", "day"]
+TIER_FREQ = {"hour": "h", "day": "D"}
+TIER_SOURCE = {"hour": "raw", "day": "hour"}
+BUCKET_COLUMNS = ["bucket_start", "zone_id", "min", "max", "mean", "count"]
+
+
+def _empty():
+    return pd.DataFrame({c: pd.Series(dtype="datetime64[ns]" if c == "bucket_start" else "float64") for c in BUCKET_COLUMNS})
+
+
+def combine(frame, freq):
+    """
+    Merge buckets (raw samples are 1-count buckets) into coarser `freq` buckets:
+    min of mins, max of maxes, count-weighted mean, summed counts.
+    """
+    if frame.empty:
+        return _empty()
+    weight = frame["count"].where(frame["mean"].notna(), 0)
+    f = pd.DataFrame({
+        "bucket_start": frame["bucket_start"].dt.floor(freq),
+        "zone_id": frame["zone_id"],
+        "min": frame["min"], "max": frame["max"],
+        "weighted": frame["mean"].fillna(0) * weight, "weight": weight,
+        "count": frame["count"],
+    })
+    out = f.groupby(["bucket_start", "zone_id"], dropna=False, sort=True).agg(
+        min=("min", "min"), max=("max", "max"), weighted=("weighted", "sum"),
+        weight=("weight", "sum"), count=("count", "sum"),
+    ).reset_index()
+    out["mean"] = out["weighted"] / out["weight"].replace(0, np.nan)
+    return out[BUCKET_COLUMNS]
+
+
+class RetentionManager:
+    """
+    Tiered metric history: raw rows for `raw_days`, hourly rollups for
+    `hourly_days`, daily rollups kept indefinitely.
+
+    `compact()` (a scheduler job) rolls every complete bucket past a tier's
+    watermark (the end of its newest stored bucket) up from the tier below, then
+    deletes raw rows / hourly rollups that are both past retention and already
+    rolled up. Every step commits in chunks so the write lock is never held long.
+    With `archive_root`, expired raw rows are first exported, a day at a time, to
+    per-metric Parquet partitions (<archive_root>/<metric>/date=...).
+    `series()` answers a window from the stored rollups plus, after the
+    watermark, buckets computed on the fly from the tier below.
+    """
+
+    def __init__(self, db, raw_days=7, hourly_days=90, archive_days=30,
+                 raw_read_days=2, hourly_read_days=31, grace_minutes=5, delete_chunk=5000, archive_root=None):
+        self.db = db
+        self.archive_root = archive_root
+        self.raw_days = raw_days
+        self.hourly_days = hourly_days
+        self.archive_days = archive_days
+        self.raw_read_days = raw_read_days
+        self.hourly_read_days = hourly_read_days
+        self.grace = timedelta(minutes=grace_minutes)  # ingestion is written behind, in batches
+        self.delete_chunk = delete_chunk
+        self.chunk = {"hour": timedelta(hours=24), "day": timedelta(days=7)}
+        self.last_run = {}
+
+    # ----------------- reads -----------------
+    def pick_tier(self, start, end, now=None):
+        """Finest tier that still holds `start` and keeps the response small for the window."""
+        now = now or datetime.utcnow()
+        span = end - start
+        if span <= timedelta(days=self.raw_read_days) and start >= now - timedelta(days=self.raw_days):
+            return "raw"
+        if span <= timedelta(days=self.hourly_read_days) and start >= now - timedelta(days=self.hourly_days):
+            return "hour"
+        return "day"
+
+    def series(self, metric, start, end, tier=None):
+        """DataFrame of BUCKET_COLUMNS for [start, end), sorted by bucket_start."""
+        tier = tier or self.pick_tier(start, end)
+        if tier == "raw":
+            return self._raw(metric, start, end)
+
+        freq = TIER_FREQ[tier]
+        start = pd.Timestamp(start).floor(freq).to_pydatetime()
+        mark = self.watermark(metric, tier)
+        parts = []
+        if mark is not None and start < mark:
+            parts.append(self._stored(metric, tier, start, min(end, mark)))
+        tail_start = start if mark is None else max(start, mark)
+        if tail_start < end:
+            parts.append(combine(self.series(metric, tail_start, end, TIER_SOURCE[tier]), freq))
+        parts = [p for p in parts if not p.empty]
+        return pd.concat(parts, ignore_index=True) if parts else _empty()
+
+    def watermark(self, metric, tier):
+        """End of the newest stored bucket for (metric, tier), or None."""
+        last = (self.db.session.query(func.max(MetricRollup.bucket_start))
+                .filter(MetricRollup.metric == metric, MetricRollup.tier == tier).scalar())
+        return None if last is None else (pd.Timestamp(last) + pd.tseries.frequencies.to_offset(TIER_FREQ[tier])).to_pydatetime()
+
+    def _raw(self, metric, start, end):
+        model, value, zone = METRICS[metric]
+        columns = [model.timestamp] + [c for c in (value, zone) if c is not None]
+        rows = (self.db.session.query(*columns)
+                .filter(model.timestamp >= start, model.timestamp < end)
+                .order_by(model.timestamp).all())
+        if not rows:
+            return _empty()
+        data = list(zip(*rows))
+        values = pd.to_numeric(pd.Series(data[1] if value is not None else [None] * len(rows), dtype="object"))
+        frame = pd.DataFrame({
+            "bucket_start": pd.to_datetime(pd.Series(data[0])),
+            "zone_id": pd.Series(data[-1] if zone is not None else [np.nan] * len(rows), dtype="float64"),
+            "min": values.astype("float64"), "max": values.astype("float64"), "mean": values.astype("float64"),
+            "count": 1.0,
+        })
+        return frame[BUCKET_COLUMNS]
+
+    def _stored(self, metric, tier, start, end):
+        rows = (self.db.session.query(MetricRollup.bucket_start, MetricRollup.zone_id, MetricRollup.min,
+                                      MetricRollup.max, MetricRollup.mean, MetricRollup.count)
+                .filter(MetricRollup.metric == metric, MetricRollup.tier == tier,
+                        MetricRollup.bucket_start >= start, MetricRollup.bucket_start < end)
+                .order_by(MetricRollup.bucket_start).all())
+        if not rows:
+            return _empty()
+        frame = pd.DataFrame(rows, columns=BUCKET_COLUMNS)
+        frame["bucket_start"] = pd.to_datetime(frame["bucket_start"])
+        return frame.astype({c: "float64" for c in BUCKET_COLUMNS[1:]})
+
+    def _earliest(self, metric, tier):
+        if tier == "raw":
+            model = METRICS[metric][0]
+            return self.db.session.query(func.min(model.timestamp)).scalar()
+        first = (self.db.session.query(func.min(MetricRollup.bucket_start))
+                 .filter(MetricRollup.metric == metric, MetricRollup.tier == tier).scalar())
+        return first if first is not None else self._earliest(metric, TIER_SOURCE[tier])
+
+    # ----------------- compaction -----------------
+    def compact(self, now=None):
+        """Roll up complete buckets, then prune expired data. Returns {"rolled": n, "deleted": n}."""
+        now = now or datetime.utcnow()
+        rolled = 0
+        for tier in ("hour", "day"):
+            horizon = pd.Timestamp(now - self.grace).floor(TIER_FREQ[tier]).to_pydatetime()
+            for metric in METRICS:
+                rolled += self._roll_up(metric, tier, horizon)
+
+        deleted = 0
+        for metric, (model, _, _) in METRICS.items():
+            cutoff = self._prune_cutoff(metric, "hour", now - timedelta(days=self.raw_days))
+            if cutoff is not None:
+                deleted += self._expire_raw(metric, model, cutoff)
+            cutoff = self._prune_cutoff(metric, "day", now - timedelta(days=self.hourly_days))
+            if cutoff is not None:
+                deleted += self._delete_before(MetricRollup, MetricRollup.bucket_start, cutoff,
+                                               MetricRollup.metric == metric, MetricRollup.tier == "hour")
+        deleted += self._delete_before(RawPayload, RawPayload.timestamp, now - timedelta(days=self.archive_days))
+
+        self.last_run = {"at": now.isoformat(), "rolled": rolled, "deleted": deleted}
+        return {"rolled": rolled, "deleted": deleted}
+
+    def _roll_up(self, metric, tier, horizon):
+        start = self.watermark(metric, tier)
+        if start is None:
+            first = self._earliest(metric, TIER_SOURCE[tier])
+            if first is None:
+                return 0
+            start = pd.Timestamp(first).floor(TIER_FREQ[tier]).to_pydatetime()
+
+        written = 0
+        while start < horizon:
+            end = min(start + self.chunk[tier], horizon)
+            frame = self.series(metric, start, end, TIER_SOURCE[tier])
+            buckets = combine(frame, TIER_FREQ[tier])
+            if not buckets.empty:
+                self.db.session.bulk_insert_mappings(MetricRollup, [
+                    {"metric": metric, "tier": tier, "bucket_start": b.bucket_start.to_pydatetime(),
+                     "zone_id": None if pd.isna(b.zone_id) else int(b.zone_id),
+                     "min": None if pd.isna(b.min) else float(b.min),
+                     "max": None if pd.isna(b.max) else float(b.max),
+                     "mean": None if pd.isna(b.mean) else float(b.mean),
+                     "count": int(b.count)}
+                    for b in buckets.itertuples(index=False)
+                ])
+                self.db.session.commit()
+                written += len(buckets)
+            start = end
+        return written
+
+    def archive(self, metric):
+        return None if self.archive_root is None else PartitionedArchive(os.path.join(self.archive_root, metric), fmt="parquet")
+
+    def archived(self, metric, start=None, end=None):
+        """Raw samples exported from the DB by earlier compactions (timestamp, zone_id, value)."""
+        archive = self.archive(metric)
+        df = archive.read(["timestamp", "zone_id", "value"], start, end) if archive else pd.DataFrame()
+        if df.empty:
+            return df
+        mask = pd.Series(True, index=df.index)
+        if start is not None:
+            mask &= df["timestamp"] >= start
+        if end is not None:
+            mask &= df["timestamp"] < end
+        return df[mask].sort_values("timestamp", kind="stable").reset_index(drop=True)
+
+    def _expire_raw(self, metric, model, cutoff):
+        archive = self.archive(metric)
+        if archive is None:
+            return self._delete_before(model, model.timestamp, cutoff)
+
+        # export then delete one day at a time; a crash in between re-exports that day (at-least-once)
+        deleted = 0
+        start = self._earliest(metric, "raw")
+        while start is not None and start < cutoff:
+            end = min((pd.Timestamp(start).floor("D") + pd.Timedelta(days=1)).to_pydatetime(), cutoff)
+            frame = self._raw(metric, start, end)
+            archive.write(frame[["bucket_start", "zone_id", "mean"]]
+                          .rename(columns={"bucket_start": "timestamp", "mean": "value"}), time_column="timestamp")
+            deleted += self._delete_before(model, model.timestamp, end)
+            start = end
+        return deleted
+
+    def _prune_cutoff(self, metric, covering_tier, expiry):
+        """Delete below `expiry`, but never past what `covering_tier` has rolled up."""
+        mark = self.watermark(metric, covering_tier)
+        return None if mark is None else min(expiry, mark)
+
+    def _delete_before(self, model, column, cutoff, *criteria):
+        deleted = 0
+        while True:
+            ids = [row_id for (row_id,) in self.db.session.query(model.id)
+                   .filter(column < cutoff, *criteria).limit(self.delete_chunk)]
+            if not ids:
+                return deleted
+            self.db.session.query(model).filter(model.id.in_(ids)).delete(synchronize_session=False)
+            self.db.session.commit()
+            deleted += len(ids)
@@ -0,0 +1,173 @@
+# services/sentiment_rollup.py
+import heapq
+import threading
+from bisect import bisect_right
+from collections import Counter
+
+import pandas as pd
+
+
+class _DayBucket:
+    """Pre-aggregated feedback for one calendar day."""
+
+    __slots__ = ("counts", "topic_first", "words", "rows")
+
+    def __init__(self):
+        self.counts = Counter()   # (sentiment, topic) -> rows
+        self.topic_first = {}     # topic -> first row position (value_counts input order)
+        self.words = {}           # word -> [count, (first row position, word index)] (most_common tie order)
+        self.rows = []            # row positions, only needed when this day is a partial window edge
+
+    def add_rows(self, positions, sentiments, topics, clean_texts):
+        for key, n in Counter(zip(sentiments, topics)).items():
+            self.counts[key] += n
+        for pos, topic, text in zip(positions, topics, clean_texts):
+            if topic not in self.topic_first:
+                self.topic_first[topic] = pos
+            for i, word in enumerate(text.split()):
+                entry = self.words.get(word)
+                if entry is None:
+                    self.words[word] = [1, (pos, i)]
+                else:
+                    entry[0] += 1
+        self.rows.extend(positions)
+
+
+class SentimentRollup:
+    """
+    Per-day x sentiment x topic counts and per-day word counters over a FeedbackStore.
+
+    A `days=` window is answered from the daily buckets strictly after the cutoff
+    day plus an exact scan of the cutoff day's own rows, so request cost depends
+    on the window length rather than on total history. First-appearance positions
+    are tracked per bucket so ties come out in the same order value_counts() and
+    Counter.most_common() produced on the raw frame.
+    """
+
+    def __init__(self, store):
+        self.store = store
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        self._generation = None
+        self._rows_seen = 0
+        self._df = None
+        self._buckets = {}
+        self._days = []  # sorted bucket keys
+
+    # ----------------- ingestion -----------------
+    def refresh(self):
+        """Fold any rows the store picked up since the last call into the buckets."""
+        generation, df = self.store.versioned_snapshot()
+        with self._lock:
+            if generation != self._generation or len(df) < self._rows_seen:
+                self._reset()
+                self._generation = generation
+            new_rows = df.iloc[self._rows_seen:]
+            self._df = df
+            self._rows_seen = len(df)
+            if not new_rows.empty:
+                self._ingest(new_rows)
+        return df
+
+    def _ingest(self, new_rows):
+        new_rows = new_rows[new_rows["timestamp"].notna()]
+        positions = new_rows.index.to_numpy()
+        sentiments = new_rows["sentiment"].to_numpy()
+        topics = new_rows["topic"].to_numpy()
+        clean_texts = new_rows["clean_text"].astype(str).to_numpy()
+
+        by_day = new_rows.groupby(new_rows["timestamp"].dt.date, sort=False).indices
+        for day, idx in by_day.items():
+            bucket = self._buckets.get(day)
+            if bucket is None:
+                bucket = self._buckets[day] = _DayBucket()
+                self._days.insert(bisect_right(self._days, day), day)
+            bucket.add_rows(positions[idx].tolist(), sentiments[idx].tolist(),
+                            topics[idx].tolist(), clean_texts[idx].tolist())
+
+    # ----------------- window assembly -----------------
+    def _window(self, start_date):
+        """Yield (day, bucket) for the window; the cutoff day is rebuilt from its rows >= start_date."""
+        cutoff_day = start_date.date()
+        first_full = bisect_right(self._days, cutoff_day)
+
+        edge = self._buckets.get(cutoff_day)
+        if edge is not None:
+            rows = self._df.iloc[edge.rows]
+            rows = rows[rows["timestamp"] >= start_date]
+            if not rows.empty:
+                partial = _DayBucket()
+                partial.add_rows(rows.index.tolist(), rows["sentiment"].tolist(),
+                                 rows["topic"].tolist(), rows["clean_text"].astype(str).tolist())
+                yield cutoff_day, partial
+
+        for day in self._days[first_full:]:
+            yield day, self._buckets[day]
+
+    # ----------------- queries -----------------
+    def sentiment_counts(self, start_date):
+        """Rows per sentiment since start_date."""
+        self.refresh()
+        totals = Counter()
+        with self._lock:
+            for _, bucket in self._window(start_date):
+                for (sentiment, _), n in bucket.counts.items():
+                    totals[sentiment] += n
+        return totals
+
+    def trend(self, start_date):
+        """[(day, {sentiment: rows})] for every day in the window that has feedback."""
+        self.refresh()
+        series = []
+        with self._lock:
+            for day, bucket in self._window(start_date):
+                per_sentiment = Counter()
+                for (sentiment, _), n in bucket.counts.items():
+                    per_sentiment[sentiment] += n
+                series.append((day, per_sentiment))
+        return series
+
+    def topics(self, start_date):
+        """[(topic, rows, dominant sentiment)] ordered like value_counts()."""
+        self.refresh()
+        counts, first, by_sentiment = Counter(), {}, {}
+        with self._lock:
+            for _, bucket in self._window(start_date):
+                for (sentiment, topic), n in bucket.counts.items():
+                    counts[topic] += n
+                    by_sentiment.setdefault(topic, Counter())[sentiment] += n
+                for topic, pos in bucket.topic_first.items():
+                    if pos < first.get(topic, pos + 1):
+                        first[topic] = pos
+
+        # Same construction as value_counts(): first-appearance order, then the same sort,
+        # so ties between equally common topics come out in the same order.
+        appearance = sorted(counts, key=first.get)
+        ordered = pd.Series([counts[t] for t in appearance], index=appearance, dtype="int64")
+        result = []
+        for topic in ordered.sort_values(ascending=False).index:
+            # Series.mode() returns ties sorted, so the alphabetically first one wins
+            sentiment_counts = by_sentiment[topic]
+            top = max(sentiment_counts.values())
+            dominant = min(s for s, n in sentiment_counts.items() if n == top)
+            result.append((topic, counts[topic], dominant))
+        return result
+
+    def top_words(self, start_date, n=20):
+        """[(word, count)] ordered like Counter.most_common(n) over the window's clean_text."""
+        self.refresh()
+        merged = {}
+        with self._lock:
+            for _, bucket in self._window(start_date):
+                for word, (count, pos) in bucket.words.items():
+                    entry = merged.get(word)
+                    if entry is None:
+                        merged[word] = [count, pos]
+                    else:
+                        entry[0] += count
+                        if pos < entry[1]:
+                            entry[1] = pos
+        top = heapq.nsmallest(n, merged.items(), key=lambda kv: (-kv[1][0], kv[1][1]))
+        return [(word, count) for word, (count, _) in top]
@@ -0,0 +1,66 @@
+# services/serve.py
+"""
+Production serving.
+
+  python serve.py web [--workers N] [--threads T] [--bind 0.0.0.0:5000]
+      gunicorn with N worker processes x T threads each (gthread). Every worker
+      serves requests; with SCHEDULER_MODE=auto (the default) exactly one of them
+      holds the scheduler lock and runs ingestion/alerting, the rest follow.
+
+  python serve.py scheduler
+      Only the scheduler, in this process (takes the lock, waiting for it if a
+      worker holds it). Run the web tier with SCHEDULER_MODE=off alongside it.
+
+Same as `gunicorn -w N --threads T -b ADDR wsgi:app` for the web tier.
+"""
+import argparse
+import os
+import time
+
+
+def serve_web(workers, threads, bind, timeout):
+    from gunicorn.app.base import BaseApplication
+
+    class Server(BaseApplication):
+        def load_config(self):
+            self.cfg.set("bind", bind)
+            self.cfg.set("workers", workers)
+            self.cfg.set("threads", threads)
+            self.cfg.set("worker_class", "gthread" if threads > 1 else "sync")
+            self.cfg.set("timeout", timeout)
+
+        def load(self):
+            # imported in each worker (no preload), so each one sets up its own scheduler role
+            from wsgi import app
+            return app
+
+    Server().run()
+
+
+def serve_scheduler():
+    import main
+
+    main.create_app(scheduler_mode="on")
+    try:
+        while True:
+            time.sleep(3600)
+    except (KeyboardInterrupt, SystemExit):
+        main.scheduler.shutdown()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the CityPulse API in production mode.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    web = sub.add_parser("web", help="gunicorn web workers")
+    web.add_argument("--workers", type=int, default=int(os.getenv("WEB_CONCURRENCY", str(2 * (os.cpu_count() or 1) + 1))))
+    web.add_argument("--threads", type=int, default=int(os.getenv("WEB_THREADS", "8")),
+                     help="threads per worker (each open SSE stream holds one)")
+    web.add_argument("--bind", default=os.getenv("BIND", f"0.0.0.0:{os.getenv('PORT', '5000')}"))
+    web.add_argument("--timeout", type=int, default=60)
+    sub.add_parser("scheduler", help="scheduler only (ingestion, alerts, compaction)")
+    args = parser.parse_args()
+
+    if args.command == "web":
+        serve_web(args.workers, args.threads, args.bind, args.timeout)
+    else:
+        serve_scheduler()
@@ -0,0 +1,114 @@
+# services/sliding_window.py
+import threading
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+EPOCH = datetime(1970, 1, 1)  # naive, same reference as pandas' datetime64 integers
+
+
+class WindowCounter:
+    """
+    Event counts over fixed trailing windows (e.g. 1h, 24h, 7d), kept in a ring
+    buffer of per-`bucket` slots sized for the longest window.
+
+    A running total is kept per window: adding an event bumps the slot and every
+    window that covers it, and moving to a new bucket subtracts the one slot that
+    falls out of each window. Both are O(number of windows), independent of how
+    many events are held. A window covers the current bucket and the ones before
+    it, so `total(timedelta(hours=1))` is the last 60 one-minute buckets. Events
+    older than the longest window are dropped (counted in `dropped`).
+    """
+
+    def __init__(self, windows, bucket=timedelta(minutes=1)):
+        self.bucket = bucket
+        self._bucket_seconds = bucket.total_seconds()
+        self._widths = {}  # window -> width in buckets
+        for window in windows:
+            width = window // bucket
+            if width < 1 or window % bucket:
+                raise ValueError(f"Window {window} is not a whole number of {bucket} buckets")
+            self._widths[window] = width
+        self.size = max(self._widths.values())
+        self._slots = [0] * self.size
+        self._sums = dict.fromkeys(self._widths, 0)
+        self._head = None  # newest bucket index seen
+        self._lock = threading.Lock()
+        self.dropped = 0
+
+    @property
+    def windows(self):
+        return list(self._widths)
+
+    def add(self, at, n=1):
+        with self._lock:
+            self._add(self._index(at), n)
+
+    def add_many(self, timestamps):
+        """Count a batch of event timestamps (any iterable of datetimes), grouped per bucket first."""
+        stamps = pd.Series(timestamps, dtype="datetime64[ns]").dropna()
+        if stamps.empty:
+            return
+        buckets = stamps.astype("int64") // int(self._bucket_seconds * 1e9)
+        with self._lock:
+            for index, n in buckets.value_counts().sort_index().items():
+                self._add(int(index), int(n))
+
+    def total(self, window, now=None):
+        """Events in the trailing `window` (one of `windows`) ending at `now`."""
+        if window not in self._sums:
+            raise ValueError(f"Window {window} is not tracked (tracked: {self.windows})")
+        with self._lock:
+            self._advance(self._index(now or datetime.now()))
+            return self._sums[window]
+
+    def totals(self, now=None):
+        """{window: events} for every tracked window."""
+        with self._lock:
+            self._advance(self._index(now or datetime.now()))
+            return dict(self._sums)
+
+    def clear(self):
+        with self._lock:
+            self._slots = [0] * self.size
+            self._sums = dict.fromkeys(self._widths, 0)
+            self._head = None
+
+    # ----------------- internals -----------------
+    def _index(self, at):
+        if not isinstance(at, datetime):
+            at = pd.Timestamp(at).to_pydatetime()
+        if at.tzinfo is not None:
+            at = at.replace(tzinfo=None)
+        return int((at - EPOCH).total_seconds() // self._bucket_seconds)
+
+    def _add(self, index, n):
+        self._advance(index)
+        age = self._head - index
+        if age >= self.size:
+            self.dropped += n
+            return
+        self._slots[index % self.size] += n
+        for window, width in self._widths.items():
+            if age < width:
+                self._sums[window] += n
+
+    def _advance(self, index):
+        """Move the head to bucket `index`, expiring what falls out of each window."""
+        if self._head is None:
+            self._head = index
+            return
+        steps = index - self._head
+        if steps <= 0:
+            return
+        if steps >= self.size:  # idle for longer than the ring: everything expired
+            self._slots = [0] * self.size
+            self._sums = dict.fromkeys(self._widths, 0)
+            self._head = index
+            return
+        slots, size = self._slots, self.size
+        for head in range(self._head + 1, index + 1):
+            for window, width in self._widths.items():
+                self._sums[window] -= slots[(head - width) % size]  # the bucket that just left this window
+            slots[head % size] = 0  # reused for the new bucket (for the longest window, the one it just dropped)
+        self._head = index
@@ -0,0 +1,62 @@
+# services/snapshots.py
+import threading
+import time
+
+
+class SnapshotStore:
+    """
+    Latest value per metric, written by ingestion jobs and read by GET handlers.
+
+    Reads are a dict lookup. A metric that has not been ingested yet since start-up
+    is hydrated once through its registered `hydrate` callable (typically a
+    read of the newest DB row); ingestion remains the only writer.
+    Subscribers are called with (metric, payload) after every publish.
+    """
+
+    def __init__(self):
+        self._snapshots = {}   # metric -> (payload, published_at)
+        self._hydrators = {}
+        self._subscribers = []
+        self._lock = threading.Lock()
+        self.version = 0
+
+    def register(self, metric, hydrate):
+        self._hydrators[metric] = hydrate
+
+    def subscribe(self, callback):
+        self._subscribers.append(callback)
+
+    def publish(self, metric, payload):
+        with self._lock:
+            self._snapshots[metric] = (payload, time.time())
+            self.version += 1
+        for callback in self._subscribers:
+            callback(metric, payload)
+
+    def rehydrate(self):
+        """Re-read every metric through its hydrator and publish the ones that changed.
+        For processes that serve reads but don't run the ingestion jobs."""
+        changed = []
+        for metric, hydrate in list(self._hydrators.items()):
+            payload = hydrate()
+            current = self._snapshots.get(metric)
+            if payload is not None and (current is None or current[0] != payload):
+                self.publish(metric, payload)
+                changed.append(metric)
+        return changed
+
+    def get(self, metric):
+        snapshot = self._snapshots.get(metric)
+        if snapshot is None:
+            hydrate = self._hydrators.get(metric)
+            payload = hydrate() if hydrate else None
+            if payload is None:
+                return None
+            with self._lock:
+                # an ingestion job may have published meanwhile; it wins
+                snapshot = self._snapshots.setdefault(metric, (payload, time.time()))
+        return snapshot[0]
+
+    def age(self, metric):
+        snapshot = self._snapshots.get(metric)
+        return None if snapshot is None else time.time() - snapshot[1]
@@ -0,0 +1,79 @@
+# services/spatial_index.py
+import numpy as np
+from scipy.spatial import cKDTree
+
+EARTH_RADIUS_KM = 6371.0088
+
+
+def to_xyz(lats, lons):
+    """Unit-sphere coordinates for arrays of degrees (chord distance orders points like great-circle distance)."""
+    lat, lon = np.radians(np.asarray(lats, dtype=float)), np.radians(np.asarray(lons, dtype=float))
+    cos_lat = np.cos(lat)
+    return np.column_stack([cos_lat * np.cos(lon), cos_lat * np.sin(lon), np.sin(lat)])
+
+
+def chord_to_km(chord):
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.clip(chord / 2, 0, 1))
+
+
+def km_to_chord(km):
+    return 2 * np.sin(np.minimum(np.asarray(km, dtype=float), np.pi * EARTH_RADIUS_KM) / (2 * EARTH_RADIUS_KM))
+
+
+class ZoneIndex:
+    """
+    KD-tree over zone centres for point -> zone lookups.
+
+    Points are placed on the unit sphere, so results are exact great-circle
+    nearest/within-radius answers anywhere (no per-city projection), and every
+    query takes scalar or NumPy array coordinates and runs in C. Built once per
+    zone list; rebuild (a new ZoneIndex) when zones change. Distances are km.
+    """
+
+    def __init__(self, ids, lats, lons):
+        self.ids = np.asarray(ids, dtype=np.int64)
+        self._tree = cKDTree(to_xyz(lats, lons)) if len(self.ids) else None
+
+    def __len__(self):
+        return len(self.ids)
+
+    def nearest(self, lats, lons, max_km=None):
+        """(zone ids, distances) for each point; -1 / inf where no zone is within `max_km`."""
+        lats, lons = np.atleast_1d(lats), np.atleast_1d(lons)
+        if self._tree is None:
+            return np.full(len(lats), -1, dtype=np.int64), np.full(len(lats), np.inf)
+        bound = np.inf if max_km is None else float(km_to_chord(max_km))
+        chord, idx = self._tree.query(to_xyz(lats, lons), distance_upper_bound=bound)
+        found = idx < len(self.ids)
+        ids = np.where(found, self.ids[np.minimum(idx, len(self.ids) - 1)], -1)
+        return ids, np.where(found, chord_to_km(chord), np.inf)
+
+    def nearest_one(self, lat, lon, max_km=None):
+        """Zone id closest to one point, or None."""
+        ids, _ = self.nearest(lat, lon, max_km)
+        return None if ids[0] < 0 else int(ids[0])
+
+    def assign(self, lats, lons, max_km=None, chunk=1_000_000):
+        """Nearest zone id per point for large batches (-1 beyond `max_km`), in bounded-memory chunks."""
+        lats, lons = np.asarray(lats, dtype=float), np.asarray(lons, dtype=float)
+        out = np.empty(len(lats), dtype=np.int64)
+        for start in range(0, len(lats), chunk):
+            out[start:start + chunk] = self.nearest(lats[start:start + chunk], lons[start:start + chunk], max_km)[0]
+        return out
+
+    def within(self, lat, lon, radius_km):
+        """(zone ids, distances) within `radius_km` of one point, nearest first."""
+        if self._tree is None:
+            return np.array([], dtype=np.int64), np.array([])
+        centre = to_xyz(lat, lon)[0]
+        idx = np.asarray(self._tree.query_ball_point(centre, float(km_to_chord(radius_km))), dtype=np.int64)
+        km = chord_to_km(np.linalg.norm(self._tree.data[idx] - centre, axis=1))
+        order = np.argsort(km, kind="stable")
+        return self.ids[idx[order]], km[order]
+
+    def within_many(self, lats, lons, radius_km):
+        """Zone ids within `radius_km` of each point (list of arrays, unordered)."""
+        if self._tree is None:
+            return [np.array([], dtype=np.int64) for _ in np.atleast_1d(lats)]
+        hits = self._tree.query_ball_point(to_xyz(lats, lons), float(km_to_chord(radius_km)))
+        return [self.ids[np.asarray(h, dtype=np.int64)] for h in hits]
@@ -0,0 +1,46 @@
+# services/stopwords.py
+"""
+Offline English stopword list for text preprocessing.
+
+ENGLISH is the NLTK "english" corpus (179 words), vendored so importing the
+preprocessing code needs no download. Later corpus revisions only add
+apostrophe forms ("i'm", "we've", ...), which cannot match once clean_text
+has stripped non-letters. `get()` builds the set on first use;
+setting STOPWORDS_FILE (one word per line, `#` comments allowed) replaces it
+with a local list.
+"""
+import os
+import threading
+
+ENGLISH = (
+    "i me my myself we our ours ourselves you you're you've you'll you'd your yours yourself "
+    "yourselves he him his himself she she's her hers herself it it's its itself they them their "
+    "theirs themselves what which who whom this that that'll these those am is are was were be been "
+    "being have has had having do does did doing a an the and but if or because as until while of "
+    "at by for with about against between into through during before after above below to from up "
+    "down in out on off over under again further then once here there when where why how all any "
+    "both each few more most other some such no nor not only own same so than too very s t can will "
+    "just don don't should should've now d ll m o re ve y ain aren aren't couldn couldn't didn "
+    "didn't doesn doesn't hadn hadn't hasn hasn't haven haven't isn isn't ma mightn mightn't mustn "
+    "mustn't needn needn't shan shan't shouldn shouldn't wasn wasn't weren weren't won won't wouldn "
+    "wouldn't"
+)
+
+_words = None
+_lock = threading.Lock()
+
+
+def load_file(path):
+    with open(path, encoding="utf-8") as f:
+        return frozenset(w for w in (line.split("#", 1)[0].strip().lower() for line in f) if w)
+
+
+def get():
+    """The active stopword frozenset (vendored list, or STOPWORDS_FILE when set)."""
+    global _words
+    if _words is None:
+        with _lock:
+            if _words is None:
+                path = os.getenv("STOPWORDS_FILE")
+                _words = load_file(path) if path else frozenset(ENGLISH.split())
+    return _words
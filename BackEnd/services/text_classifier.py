@@ -0,0 +1,80 @@
+# services/text_classifier.py
+import re
+import threading
+
+import numpy as np
+import pandas as pd
+
+POSITIVE_WORDS = ["good", "great", "excellent", "improved", "efficient", "smooth", "clean", "green", "responsive", "resolved"]
+NEGATIVE_WORDS = ["nightmare", "terrible", "needs improvement", "slow", "delays", "potholes", "leakage", "cuts", "congestion", "garbage", "broken"]
+
+TOPIC_KEYWORDS = {
+    "Traffic & Roads": ["traffic", "roads", "congestion", "commuting", "parking", "pothole", "potholes"],
+    "Public Services": ["waste", "garbage", "service", "lights", "street lights"],
+    "Environment": ["clean", "green", "pollution", "air", "aqi"],
+    "Public Transport": ["transport", "bus", "metro", "train"],
+    "Water & Sanitation": ["water", "leakage", "sewer"],
+}
+
+
+class KeywordClassifier:
+    """
+    Labels text by case-insensitive substring keywords, first matching label wins.
+
+    Each label's keyword list is compiled into a single alternation regex, so a
+    whole column is labelled with one vectorized scan per label. Labelling is
+    done on the distinct texts only and remembered, which pays off because
+    citizen feedback repeats heavily.
+    """
+
+    def __init__(self, rules, default, max_cache=100_000):
+        self.labels = list(rules)
+        self.default = default
+        self.max_cache = max_cache
+        self._keywords = [[kw.lower() for kw in rules[label]] for label in self.labels]
+        self._patterns = [re.compile("|".join(re.escape(kw) for kw in kws)) for kws in self._keywords]
+        self._cache = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def label(self, text):
+        """Label a single text (same result as `classify` on a one-row column)."""
+        text_lower = str(text).lower()
+        for label, keywords in zip(self.labels, self._keywords):
+            if any(keyword in text_lower for keyword in keywords):
+                return label
+        return self.default
+
+    def classify(self, texts):
+        """Label a whole Series of texts; returns an object Series aligned to its index."""
+        texts = pd.Series(texts)
+        if texts.empty:
+            return pd.Series([], index=texts.index, dtype=object)
+
+        codes, uniques = pd.factorize(texts, use_na_sentinel=False)
+        keys = [str(u) for u in uniques]
+
+        with self._lock:
+            cache = self._cache
+            missing = [k for k in keys if k not in cache]
+            self.misses += len(missing)
+            self.hits += len(keys) - len(missing)
+            if missing:
+                if len(cache) + len(missing) > self.max_cache:
+                    cache.clear()
+                cache.update(zip(missing, self._classify_distinct(missing)))
+            unique_labels = np.array([cache[k] for k in keys], dtype=object)
+
+        return pd.Series(unique_labels.take(codes), index=texts.index, dtype=object)
+
+    def _classify_distinct(self, keys):
+        lowered = pd.Series(keys, dtype=object).str.lower()
+        conditions = [lowered.str.contains(pattern).to_numpy(dtype=bool) for pattern in self._patterns]
+        return np.select(conditions, self.labels, default=self.default).tolist()
+
+
+sentiment_classifier = KeywordClassifier(
+    {"positive": POSITIVE_WORDS, "negative": NEGATIVE_WORDS}, default="neutral"
+)
+topic_classifier = KeywordClassifier(TOPIC_KEYWORDS, default="General")
@@ -0,0 +1,135 @@
+# services/upstream.py
+import asyncio
+import threading
+import time
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from metrics import REGISTRY
+
+UPSTREAM_SECONDS = REGISTRY.histogram("upstream_request_duration_seconds", "Provider HTTP call latency", ("provider",))
+UPSTREAM_REQUESTS = REGISTRY.counter("upstream_requests_total", "Provider HTTP calls by outcome", ("provider", "outcome"))
+
+
+def _observe(host, started, outcome):
+    UPSTREAM_SECONDS.observe(time.perf_counter() - started, host)
+    UPSTREAM_REQUESTS.inc(host, outcome)
+
+
+class HostRateLimiter:
+    """Token bucket per host: at most `rate` requests/second with bursts of `burst`."""
+
+    def __init__(self, rate, burst=None):
+        self.rate = rate
+        self.burst = burst or max(1, int(rate))
+        self._buckets = {}  # host -> [tokens, last refill]
+        self._lock = threading.Lock()
+
+    def acquire(self, host):
+        while True:
+            wait = self._take(host)
+            if not wait:
+                return
+            time.sleep(wait)
+
+    async def acquire_async(self, host):
+        """`acquire` for coroutines: waits on the event loop instead of blocking the thread."""
+        while True:
+            wait = self._take(host)
+            if not wait:
+                return
+            await asyncio.sleep(wait)
+
+    def _take(self, host):
+        """Take a token if one is available (returns 0), else return the seconds until one is."""
+        if not self.rate:
+            return 0
+        with self._lock:
+            tokens, last = self._buckets.get(host, (self.burst, time.monotonic()))
+            now = time.monotonic()
+            tokens = min(self.burst, tokens + (now - last) * self.rate)
+            if tokens >= 1:
+                self._buckets[host] = (tokens - 1, now)
+                return 0
+            self._buckets[host] = (tokens, now)
+            return (1 - tokens) / self.rate
+
+
+class UpstreamClient:
+    """
+    Shared HTTP layer for the city-data providers.
+
+    One pooled requests.Session keeps up to `max_connections` keep-alive
+    connections per provider for request-path lookups, and every request first
+    takes a token from its host's rate limiter (shared with AsyncUpstreamClient,
+    which does the scheduled ingestion).
+    """
+
+    def __init__(self, max_connections=8, rate_per_host=10, timeout=10):
+        self.timeout = timeout
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=8, pool_maxsize=max_connections)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.limiter = HostRateLimiter(rate_per_host)
+
+    def get_json(self, url, headers=None, timeout=None):
+        host = urlsplit(url).netloc
+        self.limiter.acquire(host)
+        started = time.perf_counter()  # after the rate-limit wait: provider latency only
+        try:
+            r = self.session.get(url, headers=headers, timeout=timeout or self.timeout)
+            r.raise_for_status()
+            data = r.json()
+        except Exception:
+            if REGISTRY.enabled:
+                _observe(host, started, "error")
+            raise
+        if REGISTRY.enabled:
+            _observe(host, started, "ok")
+        return data
+
+
+class AsyncUpstreamClient:
+    """
+    Non-blocking counterpart of UpstreamClient for the ingestion event loop.
+
+    One httpx.AsyncClient keeps up to `max_connections` pooled keep-alive
+    connections; pass the synchronous client's `limiter` so both paths share
+    one rate limit per host. Create, use and `aclose()` it on a single loop.
+    """
+
+    def __init__(self, max_connections=8, limiter=None, rate_per_host=10, timeout=10):
+        import httpx
+
+        self.timeout = timeout
+        self.limiter = limiter or HostRateLimiter(rate_per_host)
+        self._client = httpx.AsyncClient(
+            timeout=timeout,
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+        )
+
+    async def get_json(self, url, headers=None, timeout=None):
+        host = urlsplit(url).netloc
+        await self.limiter.acquire_async(host)
+        started = time.perf_counter()
+        try:
+            r = await self._client.get(url, headers=headers, timeout=timeout or self.timeout)
+            r.raise_for_status()
+            data = r.json()
+        except Exception:
+            if REGISTRY.enabled:
+                _observe(host, started, "error")
+            raise
+        if REGISTRY.enabled:
+            _observe(host, started, "ok")
+        return data
+
+    async def map(self, fn, items):
+        """Await fn(item) for every item concurrently; results in input order (exceptions are returned, not raised)."""
+        return await asyncio.gather(*(fn(item) for item in items), return_exceptions=True)
+
+    async def aclose(self):
+        await self._client.aclose()
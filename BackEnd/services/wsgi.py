@@ -0,0 +1,5 @@
+# services/wsgi.py
+"""WSGI entry point:  gunicorn -w 4 --threads 8 wsgi:app  (see serve.py)."""
+from main import create_app
+
+app = create_app()
@@ -0,0 +1,191 @@
+# services/zone_metrics.py
+import threading
+import time
+
+import numpy as np
+
+from spatial_index import ZoneIndex
+
+# Recommendation rules, evaluated as boolean masks over every zone at once.
+# Each gets the dict of per-zone arrays from ZoneMetrics.frame() and the thresholds.
+ZONE_RULES = [
+    (lambda m, t: m["aqi"] >= t["aqi"], "Deploy air purifiers and monitor emissions."),
+    (lambda m, t: m["complaints"] > t["complaints"], "Prioritize complaint resolution teams in this area."),
+    (lambda m, t: m["water_usage"] > t["water_usage"], "Check for water leakages and promote conservation."),
+]
+ALL_CLEAR = "All systems operating within normal parameters."
+
+
+class ZoneRing:
+    """
+    Per-zone sums and sample counts over a trailing window, one ring of
+    `buckets` x `bucket_seconds` slots per zone (rows of two numpy arrays).
+
+    Running per-zone totals are kept alongside, so adding a sample is O(1) and
+    moving to a new bucket subtracts one column for every zone in one vector op.
+    """
+
+    def __init__(self, zones, buckets, bucket_seconds):
+        self.buckets = buckets
+        self.bucket_seconds = bucket_seconds
+        self.sums = np.zeros((zones, buckets))
+        self.counts = np.zeros((zones, buckets), dtype=np.int64)
+        self.total_sum = np.zeros(zones)
+        self.total_count = np.zeros(zones, dtype=np.int64)
+        self._head = None
+
+    def add(self, zone, at, value=1.0):
+        index = int(at // self.bucket_seconds)
+        self.advance(index)
+        if self._head - index >= self.buckets:
+            return  # older than the window
+        slot = index % self.buckets
+        self.sums[zone, slot] += value
+        self.counts[zone, slot] += 1
+        self.total_sum[zone] += value
+        self.total_count[zone] += 1
+
+    def advance(self, index):
+        if self._head is None or index - self._head >= self.buckets:
+            self.sums[:] = 0
+            self.counts[:] = 0
+            self.total_sum[:] = 0
+            self.total_count[:] = 0
+        elif index > self._head:
+            for head in range(self._head + 1, index + 1):
+                slot = head % self.buckets  # the bucket leaving the window
+                self.total_sum -= self.sums[:, slot]
+                self.total_count -= self.counts[:, slot]
+                self.sums[:, slot] = 0
+                self.counts[:, slot] = 0
+        else:
+            return
+        self._head = index
+
+    def resized(self, keep):
+        """Copy for a new zone list: `keep[i]` is the old row of new zone i, or -1 for a new zone."""
+        ring = ZoneRing(len(keep), self.buckets, self.bucket_seconds)
+        ring._head = self._head
+        old = keep >= 0
+        for name in ("sums", "counts", "total_sum", "total_count"):
+            getattr(ring, name)[old] = getattr(self, name)[keep[old]]
+        return ring
+
+
+class ZoneMetrics:
+    """
+    Rolling per-zone aggregates built from ingested samples, plus the /api/zones
+    payload derived from them.
+
+    Ingestion resolves a sample's coordinates to the nearest zone (`nearest()`,
+    backed by the ZoneIndex KD-tree rebuilt with the zone list) and records it:
+    complaints per zone over the last hour, mean water usage over the last
+    day, latest AQI. Recommendation rules run as vector masks over all zones;
+    the resulting payload is cached and rebuilt at most every `max_age_seconds`,
+    so reads are a list lookup whatever the zone count.
+    """
+
+    def __init__(self, complaint_window_minutes=60, water_window_hours=24, water_capacity_ml=2.7,
+                 thresholds=None, max_age_seconds=5.0):
+        self.water_capacity_ml = water_capacity_ml
+        self.thresholds = {"aqi": 4, "complaints": 15, "water_usage": 100, **(thresholds or {})}
+        self.max_age_seconds = max_age_seconds
+        self._complaint_window = (complaint_window_minutes, 60)
+        self._water_window = (water_window_hours, 3600)
+        self._lock = threading.RLock()
+        self.set_zones([])
+
+    # ----------------- zones -----------------
+    def set_zones(self, zones):
+        """(Re)load the zone list: dicts with id, name, priority, position, latitude, longitude.
+        Aggregates of zones that are still present are kept."""
+        with self._lock:
+            old_ids = getattr(self, "ids", np.array([], dtype=np.int64))
+            self.zones = list(zones)
+            self.ids = np.array([z["id"] for z in self.zones], dtype=np.int64)
+            self.spatial = ZoneIndex(self.ids, [z["latitude"] for z in self.zones], [z["longitude"] for z in self.zones])
+            self.index = {zone_id: i for i, zone_id in enumerate(self.ids.tolist())}
+
+            old_index = {zone_id: i for i, zone_id in enumerate(old_ids.tolist())}
+            keep = np.array([old_index.get(zone_id, -1) for zone_id in self.ids.tolist()], dtype=np.int64)
+            if hasattr(self, "complaints"):
+                self.complaints = self.complaints.resized(keep)
+                self.water = self.water.resized(keep)
+                aqi = np.full(len(keep), np.nan)
+                aqi[keep >= 0] = self.aqi[keep[keep >= 0]]
+                self.aqi = aqi
+            else:
+                self.complaints = ZoneRing(len(self.zones), *self._complaint_window)
+                self.water = ZoneRing(len(self.zones), *self._water_window)
+                self.aqi = np.full(len(self.zones), np.nan)
+            self._payload, self._built_at = None, 0.0
+
+    def nearest(self, lat, lon):
+        """Id of the zone closest to (lat, lon), or None when no zones are loaded."""
+        return self.spatial.nearest_one(lat, lon)
+
+    # ----------------- samples -----------------
+    def add_complaint(self, zone_id, at=None):
+        self._record(self.complaints, zone_id, at, 1.0)
+
+    def add_water(self, zone_id, usage, at=None):
+        self._record(self.water, zone_id, at, usage)
+
+    def set_aqi(self, zone_id, aqi):
+        with self._lock:
+            i = self.index.get(zone_id)
+            if i is not None:
+                self.aqi[i] = np.nan if aqi is None else aqi
+
+    def _record(self, ring, zone_id, at, value):
+        with self._lock:
+            i = self.index.get(zone_id)
+            if i is not None:
+                ring.add(i, time.time() if at is None else at, value)
+
+    # ----------------- reads -----------------
+    def frame(self, now=None):
+        """Per-zone metric arrays, aligned with `zones`."""
+        now = time.time() if now is None else now
+        with self._lock:
+            self.complaints.advance(int(now // self.complaints.bucket_seconds))
+            self.water.advance(int(now // self.water.bucket_seconds))
+            counts = self.water.total_count
+            mean_usage = np.divide(self.water.total_sum, counts, out=np.zeros(len(counts)), where=counts > 0)
+            return {
+                "aqi": np.nan_to_num(self.aqi, nan=0).astype(int),
+                "complaints": self.complaints.total_count.copy(),
+                "water_usage": np.rint(mean_usage / self.water_capacity_ml * 100).astype(int),  # % of capacity
+            }
+
+    def recommendations(self, metrics):
+        """List of recommendation strings per zone, from vectorized rule masks."""
+        masks = [rule(metrics, self.thresholds) for rule, _ in ZONE_RULES]
+        texts = [[] for _ in range(len(self.zones))]
+        for mask, (_, text) in zip(masks, ZONE_RULES):
+            for i in np.flatnonzero(mask):
+                texts[i].append(text)
+        return [t or [ALL_CLEAR] for t in texts]
+
+    def payload(self):
+        """The /api/zones list, rebuilt from the aggregates once it is older than `max_age_seconds`."""
+        with self._lock:
+            if self._payload is None or time.monotonic() - self._built_at >= self.max_age_seconds:
+                metrics = self.frame()
+                recommendations = self.recommendations(metrics)
+                aqi, complaints, water = (metrics[k].tolist() for k in ("aqi", "complaints", "water_usage"))
+                self._payload = [
+                    {
+                        "id": zone["id"],
+                        "name": zone["name"],
+                        "priority": zone["priority"],
+                        "position": zone["position"],
+                        "aqi": aqi[i],
+                        "complaints": complaints[i],
+                        "waterUsage": water[i],
+                        "recommendations": recommendations[i],
+                    }
+                    for i, zone in enumerate(self.zones)
+                ]
+                self._built_at = time.monotonic()
+            return self._payload